@@ -30,7 +30,8 @@ try:
         os.environ['INDIANAPI_KEY'] = 'test_key'
     
     from model import StockPricePredictor
-    from data_processor import DataProcessor
+    from backends import predict_interval
+    from features import FeatureStore
     from config import Config
     import numpy as np
     
@@ -46,9 +47,9 @@ try:
             'error': f'Model for {symbol} not trained yet. Run: python main.py --full'
         }))
     else:
-        # Load processed data
-        processor = DataProcessor()
-        df = processor.load_processed_data(symbol)
+        # Load the features the model was trained on from the feature store
+        features = model.metadata.get('feature_columns') or Config.FEATURES
+        df = FeatureStore().load(symbol, features if 'close' in features else features + ['close'])
         
         if df is None:
             print(json.dumps({
@@ -59,14 +60,22 @@ try:
             # Get latest data
             latest_price = float(df['close'].iloc[-1])
             
-            # Create dummy sequences for demo (use last 10 days)
-            X_last = df[['open', 'high', 'low', 'close', 'volume', 'sma_5', 'sma_10', 'sma_20', 
-                          'ema_5', 'ema_10', 'ema_20', 'rsi_14', 'roc', 'volatility', 'return']].tail(10).values
+            # Last sequence_length rows of the model's features
+            sequence_length = model.input_shape[0]
+            X_last = df[features].dropna().tail(sequence_length).to_numpy(dtype=np.float32)
             
-            if len(X_last) == 10:
-                # Normalize and predict
-                X_normalized = processor.normalize_data(np.array([X_last]), fit=False)
-                prediction = model.predict(X_normalized)[0][0]
+            if len(X_last) == sequence_length:
+                # Normalize with the training parameters and predict
+                if 'scaler_mean' in model.metadata:
+                    mean = np.array(model.metadata['scaler_mean'], dtype=np.float32)
+                    std = np.array(model.metadata['scaler_std'], dtype=np.float32)
+                    X_last = (X_last - mean) / std
+                # Conformal bounds from the model's validation residuals
+                # (one forward pass covers every horizon step)
+                interval = predict_interval(model, X_last[np.newaxis])
+                prediction = float(interval['mean'][0][0])
+                lower_bound = float(interval['lower'][0][0])
+                upper_bound = float(interval['upper'][0][0])
                 
                 price_change = prediction - latest_price
                 price_change_percent = (price_change / latest_price) * 100
@@ -79,7 +88,20 @@ try:
                     'priceChange': float(price_change),
                     'priceChangePercent': float(price_change_percent),
                     'direction': 'UP' if price_change > 0 else 'DOWN',
-                    'confidence': 'Medium',
+                    'lowerBound': lower_bound,
+                    'upperBound': upper_bound,
+                    'intervalCoverage': Config.PREDICTION_INTERVAL,
+                    'intervalMethod': interval['method'],
+                    'downsidePercent': (lower_bound - latest_price) / latest_price * 100,
+                    'forecast': [
+                        {
+                            'step': step + 1,
+                            'predictedPrice': float(interval['mean'][0][step]),
+                            'lowerBound': float(interval['lower'][0][step]),
+                            'upperBound': float(interval['upper'][0][step])
+                        }
+                        for step in range(interval['mean'].shape[1])
+                    ],
                     'dataPoints': len(df)
                 }))
             else:
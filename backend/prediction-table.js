@@ -0,0 +1,107 @@
+/**
+ * Materialized Prediction Table
+ * Serves predictions written by `python main.py --predict` from the
+ * SQLite table in ml-pipeline/data/predictions.sqlite (one indexed
+ * lookup per request, no Python process)
+ */
+
+import fs from 'fs';
+import path from 'path';
+import { fileURLToPath } from 'url';
+
+const __dirname = path.dirname(fileURLToPath(import.meta.url));
+
+const TABLE_PATH = process.env.PREDICTION_TABLE_PATH
+  || path.join(__dirname, '../ml-pipeline/data/predictions.sqlite');
+
+// better-sqlite3 is optional: without it every request falls back to the
+// on-demand prediction path
+let Database = null;
+try {
+  Database = (await import('better-sqlite3')).default;
+} catch (err) {
+  console.log('better-sqlite3 not installed - prediction table disabled');
+}
+
+let db = null;
+let lookup = null;
+let openedInode = null;
+
+/**
+ * Open the current table, reopening when --predict has swapped in a new
+ * file (the rename gives it a new inode; the old handle keeps reading
+ * the old table until then)
+ * @returns {boolean} Whether a table is available
+ */
+function openCurrentTable() {
+  let stat;
+  try {
+    stat = fs.statSync(TABLE_PATH);
+  } catch (err) {
+    return false;
+  }
+
+  if (db && stat.ino === openedInode) {
+    return true;
+  }
+
+  if (db) {
+    db.close();
+  }
+  db = new Database(TABLE_PATH, { readonly: true, fileMustExist: true });
+  lookup = db.prepare('SELECT * FROM predictions WHERE symbol = ?');
+  openedInode = stat.ino;
+  return true;
+}
+
+/**
+ * Look up a symbol's materialized prediction
+ * @param {string} symbol - Stock symbol (e.g., "TCS")
+ * @returns {object|null} Prediction in the API's response format, or null
+ *   if there is no table or the symbol is not in it
+ */
+export function getMaterializedPrediction(symbol) {
+  if (!Database) {
+    return null;
+  }
+
+  let row;
+  try {
+    if (!openCurrentTable()) {
+      return null;
+    }
+    row = lookup.get(symbol);
+  } catch (err) {
+    console.error('Prediction table lookup failed:', err.message);
+    return null;
+  }
+  if (!row) {
+    return null;
+  }
+
+  return {
+    success: true,
+    symbol: row.symbol,
+    currentPrice: row.current_price,
+    predictedPrice: row.predicted_price,
+    priceChange: row.price_change,
+    priceChangePercent: row.percent_change,
+    direction: row.direction,
+    lowerBound: row.lower_bound,
+    upperBound: row.upper_bound,
+    intervalCoverage: row.interval_coverage,
+    intervalMethod: row.interval_method,
+    downsidePercent: row.downside_percent,
+    forecast: JSON.parse(row.forecast).map((step) => ({
+      step: step.step,
+      predictedPrice: step.predicted_price,
+      lowerBound: step.lower_bound,
+      upperBound: step.upper_bound
+    })),
+    asOf: row.as_of,
+    modelVersion: row.model_version,
+    tableVersion: row.version,
+    dataPoints: row.data_points,
+    trained: true
+  };
+}
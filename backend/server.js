@@ -9,6 +9,7 @@ import { fileURLToPath } from 'url';
 import stockRoutes from './routes/stocks.js';
 import watchlistRoutes from './routes/watchlist.js';
 import indianApiRoutes from './src/routes/indianApi.js';
+import { getMaterializedPrediction } from './prediction-table.js';
 
 dotenv.config();
 
@@ -91,6 +92,12 @@ app.get('/api/predict/:symbol', async (req, res) => {
       });
     }
 
+    // Serve the nightly prediction table written by `main.py --predict`
+    const materialized = getMaterializedPrediction(symbol.toUpperCase());
+    if (materialized) {
+      return res.json(materialized);
+    }
+
     // Import and fetch real price from IndianAPI service
     let currentPrice = null;
     let stockData = null;
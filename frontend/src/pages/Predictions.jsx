@@ -185,10 +185,16 @@ export default function Predictions() {
                 </p>
               </div>
 
-              {/* Confidence */}
+              {/* Prediction Interval */}
               <div className="bg-primary-light/50 border border-border-color rounded-lg p-4">
-                <p className="text-text-secondary text-xs font-semibold mb-2">Confidence</p>
-                <p className="text-lg font-bold text-accent-green">{prediction.confidence || 'N/A'}</p>
+                <p className="text-text-secondary text-xs font-semibold mb-2">
+                  {prediction.intervalCoverage ? `${Math.round(prediction.intervalCoverage * 100)}% ` : ''}Range
+                </p>
+                <p className="text-lg font-bold text-accent-green">
+                  {prediction.lowerBound != null && prediction.upperBound != null
+                    ? `₹${prediction.lowerBound.toFixed(2)} – ₹${prediction.upperBound.toFixed(2)}`
+                    : 'N/A'}
+                </p>
               </div>
             </div>
 
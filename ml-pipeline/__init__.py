@@ -3,9 +3,24 @@ Stock Price Prediction Pipeline Package
 
 Modules:
 - config: Central configuration management
+- universe: Symbol universe file, priority ordering and hash sharding
 - api_client: IndianAPI integration with rate limiting
+- raw_archive: Compressed raw response archive with a streaming column parser
+- bars: Bar intervals and vectorized OHLCV resampling
+- validation: Vectorized data quality checks, repairs and per-symbol reports
 - data_processor: Data processing and feature engineering
+- features: Feature registry and lazily computed point-in-time feature store
+- cross_section: Universe-wide features (relative strength, beta, sector returns, breadth)
+- correlation: Incremental rolling correlation matrix with top-k queries
 - model: LSTM model training and evaluation
+- backends: Pluggable model backends (LSTM, ridge, gradient boosting)
+- stateful: One-step stateful LSTM inference with persisted per-symbol state
+- tensor_cache: Memory-mapped normalized training tensors
+- live: Live quote streaming with rolling-window predictions
+- tuning: Hyperparameter search (successive halving / Hyperband)
+- scheduler: Streaming per-symbol stage scheduler (collect → process → train)
+- journal: SQLite run journal for resumable runs and progress reporting
+- workqueue: SQLite work queue with leases for distributed training workers
 - main: Orchestration script
 
 Usage:
@@ -21,12 +36,29 @@ __author__ = "Stock Prediction Team"
 from .config import Config
 from .api_client import IndianAPIClient, RateLimiter
 from .data_processor import DataProcessor
+from .features import FeatureStore, register_feature
+from .cross_section import CrossSectionalEngine
+from .correlation import CorrelationEngine
 from .model import StockPricePredictor
+from .backends import ModelBackend, RidgeBackend, GradientBoostingBackend
+from .stateful import StatefulLSTM
+from .tensor_cache import TensorCache
+from .tuning import HyperparameterSearch
 
 __all__ = [
     "Config",
     "IndianAPIClient",
     "RateLimiter",
     "DataProcessor",
+    "FeatureStore",
+    "register_feature",
+    "CrossSectionalEngine",
+    "CorrelationEngine",
     "StockPricePredictor",
+    "ModelBackend",
+    "RidgeBackend",
+    "GradientBoostingBackend",
+    "StatefulLSTM",
+    "TensorCache",
+    "HyperparameterSearch",
 ]
@@ -5,31 +5,25 @@ Handles:
 - HTTP requests to IndianAPI with authentication
 - Rate limiting to stay under 500 requests/month quota
 - Error handling and retry logic
-- Local JSON storage of raw API responses
+- Compressed archive storage of raw API responses
 - Request logging to prevent quota burnout
 """
 
 import json
-import logging
+import threading
 import time
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, Optional, Any
+import numpy as np
 import requests
 
 from config import Config
+from log_setup import get_logger
+from raw_archive import columns_from_response, read_columns, read_response, write_archive
 
 
-# Configure logging
-logging.basicConfig(
-    level=Config.LOG_LEVEL,
-    format=Config.LOG_FORMAT,
-    handlers=[
-        logging.FileHandler(Config.LOGS_DIR / "api_client.log"),
-        logging.StreamHandler(),
-    ],
-)
-logger = logging.getLogger(__name__)
+logger = get_logger(__name__, "api_client.log")
 
 
 class RateLimiter:
@@ -40,8 +34,11 @@ class RateLimiter:
     - Tracks requests in a file (request_log.json)
     - Resets daily counter at configured hour (default: midnight UTC)
     - Blocks requests if daily limit exceeded
+    - Serializes log updates so concurrent collectors don't lose counts
     """
 
+    _lock = threading.Lock()
+
     def __init__(self, max_per_day: int = Config.MAX_REQUESTS_PER_DAY):
         self.max_per_day = max_per_day
         self.log_path = Config.LOGS_DIR / "request_log.json"
@@ -81,7 +78,8 @@ class RateLimiter:
         Returns:
             True if request allowed, False if daily limit reached
         """
-        log = self._load_log()
+        with self._lock:
+            log = self._load_log()
         today = self._get_today_key()
         today_count = log["daily_requests"].get(today, 0)
 
@@ -96,13 +94,14 @@ class RateLimiter:
 
     def record_request(self) -> None:
         """Record that a request was made."""
-        log = self._load_log()
-        today = self._get_today_key()
-        
-        log["total_requests"] = log.get("total_requests", 0) + 1
-        log["daily_requests"][today] = log["daily_requests"].get(today, 0) + 1
-        
-        self._save_log(log)
+        with self._lock:
+            log = self._load_log()
+            today = self._get_today_key()
+            
+            log["total_requests"] = log.get("total_requests", 0) + 1
+            log["daily_requests"][today] = log["daily_requests"].get(today, 0) + 1
+            
+            self._save_log(log)
         
         today_count = log["daily_requests"][today]
         remaining = max(0, self.max_per_day - today_count)
@@ -134,7 +133,7 @@ class IndianAPIClient:
     Features:
     - Rate-limited requests (respects 500/month quota)
     - Automatic retry with exponential backoff
-    - Local JSON storage of responses
+    - Compressed local storage of responses
     - Request/response logging
     """
 
@@ -221,6 +220,7 @@ class IndianAPIClient:
         self,
         symbol: str,
         days: int = Config.HISTORY_DAYS,
+        interval: str = Config.SOURCE_INTERVAL,
     ) -> Optional[Dict[str, Any]]:
         """
         Fetch historical OHLCV data for a symbol.
@@ -228,6 +228,7 @@ class IndianAPIClient:
         Args:
             symbol: Stock symbol (e.g., "TCS", "RELIANCE")
             days: Number of days of history to fetch
+            interval: Candle size ("1min", "5min", "1h", "1D")
             
         Returns:
             Raw API response with historical data or None if failed
@@ -238,7 +239,7 @@ class IndianAPIClient:
             - Required parameters (symbol, interval, period)
             - Response structure (OHLCV fields, date format, etc.)
         """
-        logger.info(f"Fetching historical data for {symbol} (last {days} days)")
+        logger.info(f"Fetching historical data for {symbol} (last {days} days, {interval} bars)")
         
         # TODO: Replace with actual API endpoint from indianapi.com docs
         endpoint = Config.API_ENDPOINTS["historical"]
@@ -246,9 +247,11 @@ class IndianAPIClient:
         params = {
             "symbol": symbol,
             # TODO: Verify parameter names:
-            # "interval": "1d",  # Daily candles
             # "period": f"{days}d",  # Last N days
         }
+        if interval != "1D":
+            # Daily candles are the endpoint default; only ask for intraday bars explicitly
+            params["interval"] = Config.API_INTERVAL_NAMES.get(interval, interval)
         
         data = self._make_request(endpoint, params)
         
@@ -300,7 +303,7 @@ class IndianAPIClient:
 
     def _save_raw_data(self, symbol: str, data: Dict[str, Any]) -> None:
         """
-        Save raw API response to local JSON file.
+        Save raw API response to a compressed record archive.
         
         Args:
             symbol: Stock symbol
@@ -309,12 +312,22 @@ class IndianAPIClient:
         filepath = Config.get_raw_data_path(symbol)
         
         try:
-            with open(filepath, "w") as f:
-                json.dump(data, f, indent=2)
-            logger.debug(f"Saved raw data to {filepath}")
-        except IOError as e:
+            write_archive(filepath, data)
+            logger.debug(f"Saved raw data to {filepath} ({filepath.stat().st_size} bytes)")
+        except (IOError, ImportError) as e:
             logger.error(f"Failed to save raw data: {e}")
 
+    @staticmethod
+    def _find_raw_data(symbol: str) -> Optional[Path]:
+        """Newest-format raw file that exists for a symbol (archive, then legacy JSON)."""
+        candidates = [
+            Config.get_raw_data_path(symbol),
+            Config.get_raw_data_path(symbol, "gzip"),
+            Config.get_raw_data_path(symbol, "zstd"),
+            Config.get_legacy_raw_data_path(symbol),
+        ]
+        return next((path for path in candidates if path.exists()), None)
+
     def load_raw_data(self, symbol: str) -> Optional[Dict[str, Any]]:
         """
         Load previously saved raw API response from file.
@@ -325,16 +338,46 @@ class IndianAPIClient:
         Returns:
             Parsed JSON data or None if file doesn't exist
         """
-        filepath = Config.get_raw_data_path(symbol)
+        filepath = self._find_raw_data(symbol)
+        
+        if filepath is None:
+            logger.warning(f"No raw data file found for {symbol}")
+            return None
+        
+        try:
+            if filepath.suffix == ".json":
+                with open(filepath, "r") as f:
+                    return json.load(f)
+            return read_response(filepath)
+        except (json.JSONDecodeError, IOError, EOFError, ImportError) as e:
+            logger.error(f"Failed to load raw data for {symbol}: {e}")
+            return None
+
+    def load_raw_columns(self, symbol: str) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Load saved raw records as typed column arrays.
+        
+        Streams the archive in chunks instead of materializing a dict
+        per record (legacy .json files are converted in memory).
+        
+        Args:
+            symbol: Stock symbol
+            
+        Returns:
+            Dict of field name -> array, or None if missing or unparseable
+        """
+        filepath = self._find_raw_data(symbol)
         
-        if not filepath.exists():
+        if filepath is None:
             logger.warning(f"No raw data file found for {symbol}")
             return None
         
         try:
-            with open(filepath, "r") as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError) as e:
+            if filepath.suffix == ".json":
+                with open(filepath, "r") as f:
+                    return columns_from_response(json.load(f))
+            return read_columns(filepath)
+        except (json.JSONDecodeError, IOError, EOFError, ImportError) as e:
             logger.error(f"Failed to load raw data for {symbol}: {e}")
             return None
 
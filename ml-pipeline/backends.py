@@ -0,0 +1,740 @@
+"""
+Pluggable model backends.
+
+Handles:
+- Common interface for per-symbol models (train, evaluate, predict, save, load)
+- Fast baselines on flattened windows: closed-form ridge regression and
+  histogram gradient boosting
+- Picking the backend with the lowest validation error per symbol
+- Conformal prediction intervals from the sorted validation residuals
+- One evaluation table across every trained symbol and backend
+- Loading whichever backend was selected for serving
+
+The LSTM (model.StockPricePredictor) is registered as the "lstm" backend.
+"""
+
+import json
+import math
+import os
+from statistics import NormalDist
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import joblib
+    from sklearn.ensemble import HistGradientBoostingRegressor
+    from sklearn.multioutput import MultiOutputRegressor
+    SKLEARN_AVAILABLE = True
+except ImportError:
+    SKLEARN_AVAILABLE = False
+
+try:
+    import pyarrow  # noqa: F401  (Parquet engine for pandas)
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+from config import Config
+from log_setup import get_logger
+
+logger = get_logger(__name__, "model.log")
+
+
+def regression_metrics(
+    y_true: np.ndarray,
+    y_pred: np.ndarray,
+    reference: Optional[np.ndarray] = None,
+) -> Dict[str, Any]:
+    """
+    Compute every evaluation metric from a single prediction array.
+
+    Args:
+        y_true: Actual values, (num_samples,) or (num_samples, horizon)
+        y_pred: Predicted values with the same number of elements
+        reference: Last known price per sample (NaN where unknown); when
+            given, directional accuracy is the share of predictions that
+            move the same way from it as the actual price did
+
+    Returns:
+        Dict with loss, mse, mae, rmse, mape, per-horizon-step
+        horizon_rmse/horizon_mae lists and, with a reference,
+        directional_accuracy
+    """
+    y_true = np.asarray(y_true, dtype=np.float64).reshape(len(y_true), -1)
+    y_pred = np.asarray(y_pred, dtype=np.float64).reshape(y_true.shape)
+    errors = y_pred - y_true
+    squared = errors ** 2
+    absolute = np.abs(errors)
+
+    mse = float(squared.mean())
+    mask = y_true != 0
+    mape = float(np.mean(absolute[mask] / np.abs(y_true[mask])) * 100) if mask.any() else 0.0
+
+    results = {
+        "loss": mse,
+        "mse": mse,
+        "mae": float(absolute.mean()),
+        "rmse": float(np.sqrt(mse)),
+        "mape": mape,
+        "horizon_rmse": np.sqrt(squared.mean(axis=0)).tolist(),
+        "horizon_mae": absolute.mean(axis=0).tolist(),
+    }
+
+    if reference is not None:
+        reference = np.asarray(reference, dtype=np.float64).reshape(-1, 1)
+        known = np.broadcast_to(np.isfinite(reference), y_true.shape)
+        hits = np.sign(y_pred - reference) == np.sign(y_true - reference)
+        results["directional_accuracy"] = float(hits[known].mean()) if known.any() else float("nan")
+
+    return results
+
+
+def reference_prices(y: np.ndarray) -> np.ndarray:
+    """
+    Last known price before each sample of consecutive windows.
+
+    Windows advance one bar at a time, so the price before sample i's
+    first target is sample i-1's first target; the first sample has none.
+
+    Args:
+        y: (num_samples,) or (num_samples, horizon) targets
+
+    Returns:
+        (num_samples,) reference prices, NaN for the first sample
+    """
+    y = np.asarray(y, dtype=np.float64).reshape(len(y), -1)
+    reference = np.full(len(y), np.nan)
+    reference[1:] = y[:-1, 0]
+    return reference
+
+
+def summarize_draws(draws: np.ndarray, coverage: float = Config.PREDICTION_INTERVAL) -> Dict[str, np.ndarray]:
+    """
+    Predictive distribution from sampled predictions.
+
+    Args:
+        draws: (num_samples, num_draws, horizon) predictions per input window
+        coverage: Probability mass between lower and upper
+
+    Returns:
+        Dict of (num_samples, horizon) arrays: mean, std, lower, upper
+    """
+    tail = (1 - coverage) / 2
+    lower, upper = np.quantile(draws, [tail, 1 - tail], axis=1)
+    mean = draws.mean(axis=1)
+    return {
+        "mean": mean,
+        "std": draws.std(axis=1, ddof=1) if draws.shape[1] > 1 else np.zeros_like(mean),
+        "lower": lower,
+        "upper": upper,
+    }
+
+
+def conformal_quantile(residuals: np.ndarray, coverage: float = Config.PREDICTION_INTERVAL) -> np.ndarray:
+    """
+    Split-conformal half-width from sorted absolute residuals.
+
+    The ⌈(n+1)·coverage⌉-th smallest residual: a fresh prediction ± this
+    value covers the outcome with probability ≥ coverage, whatever the
+    error distribution, as long as the residuals are exchangeable with it.
+
+    Args:
+        residuals: Absolute validation residuals, ascending along axis 0
+            (one column per horizon step)
+        coverage: Target coverage
+
+    Returns:
+        Half-width per column, inf if there are too few residuals for
+        `coverage`
+    """
+    rank = math.ceil((len(residuals) + 1) * coverage)
+    if rank > len(residuals):
+        return np.full(np.shape(residuals)[1:], np.inf)
+    return np.asarray(residuals[max(rank, 1) - 1], dtype=np.float64)
+
+
+def calibrate_intervals(
+    model: "ModelBackend",
+    name: str,
+    y_true: np.ndarray,
+    y_pred: np.ndarray,
+) -> np.ndarray:
+    """
+    Keep the validation residuals behind conformal intervals.
+
+    The absolute residuals, sorted per horizon step, are saved as
+    float32 next to the model (any coverage can be read back later) and
+    the half-widths for Config.PREDICTION_INTERVAL go into
+    model.metadata["conformal"], so serving needs no file access. Call
+    before model.save().
+
+    Args:
+        model: Trained backend (metadata["backend"] must be set)
+        name: Model name the artifacts are saved under (the symbol)
+        y_true: Validation targets (num_samples, horizon)
+        y_pred: Predictions for the same windows
+
+    Returns:
+        Half-width per horizon step at Config.PREDICTION_INTERVAL
+    """
+    y_true = np.asarray(y_true, dtype=np.float64).reshape(len(y_true), -1)
+    y_pred = np.asarray(y_pred, dtype=np.float64).reshape(y_true.shape)
+    residuals = np.sort(np.abs(y_pred - y_true), axis=0).astype(np.float32)
+
+    filepath = Config.get_residuals_path(name, model.metadata["backend"])
+    tmp_path = filepath.with_name(f".{filepath.name}.tmp")
+    with open(tmp_path, "wb") as f:
+        np.save(f, residuals)
+    os.replace(tmp_path, filepath)
+
+    halfwidth = conformal_quantile(residuals, Config.PREDICTION_INTERVAL)
+    finite = bool(np.isfinite(halfwidth).all())
+    model.metadata["conformal"] = {
+        "coverage": Config.PREDICTION_INTERVAL,
+        "halfwidth": halfwidth.tolist() if finite else None,
+        "residuals": len(residuals),
+    }
+    if not finite:
+        logger.warning(
+            f"{len(residuals)} validation residuals are too few for a "
+            f"{Config.PREDICTION_INTERVAL:.0%} conformal interval for {name}"
+        )
+    return halfwidth
+
+
+def conformal_halfwidth(model: "ModelBackend", coverage: float = Config.PREDICTION_INTERVAL) -> Optional[np.ndarray]:
+    """
+    Conformal half-widths for a loaded model.
+
+    Read from metadata for the configured coverage; other coverages
+    index the saved residuals (memory-mapped, one row read).
+
+    Returns:
+        Half-width per horizon step, or None if the model wasn't
+        calibrated or has too few residuals for `coverage`
+    """
+    calibration = model.metadata.get("conformal")
+    if not calibration:
+        return None
+    if math.isclose(calibration["coverage"], coverage):
+        halfwidth = calibration["halfwidth"]
+        return None if halfwidth is None else np.atleast_1d(np.asarray(halfwidth, dtype=np.float64))
+
+    filepath = Config.get_residuals_path(model.metadata["symbol"], model.metadata["backend"])
+    if not filepath.exists():
+        return None
+    residuals = np.load(filepath, mmap_mode="r")
+    halfwidth = conformal_quantile(residuals.reshape(len(residuals), -1), coverage)
+    return halfwidth if np.isfinite(halfwidth).all() else None
+
+
+def predict_interval(
+    model: "ModelBackend",
+    X: np.ndarray,
+    coverage: float = Config.PREDICTION_INTERVAL,
+    method: str = Config.INTERVAL_METHOD,
+    mean: Optional[np.ndarray] = None,
+) -> Dict[str, Any]:
+    """
+    Point predictions with lower/upper bounds.
+
+    Args:
+        model: Loaded backend
+        X: Windows (num_samples, sequence_length, num_features)
+        coverage: Target coverage
+        method: "conformal" (falls back to "distribution" for models
+            trained without calibration) or "distribution"
+        mean: Point predictions already computed for X (e.g. by stateful
+            inference); conformal bounds are centred on them, the
+            distribution fallback samples its own
+
+    Returns:
+        Dict with (num_samples, horizon) arrays mean, lower, upper and
+        the method actually used
+    """
+    if method not in ("conformal", "distribution"):
+        raise ValueError(f"Unknown interval method: {method}")
+
+    halfwidth = conformal_halfwidth(model, coverage) if method == "conformal" else None
+    if halfwidth is None:
+        distribution = model.predict_distribution(X, coverage=coverage)
+        return {
+            "mean": distribution["mean"],
+            "lower": distribution["lower"],
+            "upper": distribution["upper"],
+            "method": "distribution",
+        }
+
+    if mean is None:
+        mean = model.predict(X)
+    mean = np.asarray(mean, dtype=np.float64).reshape(len(X), -1)
+    return {"mean": mean, "lower": mean - halfwidth, "upper": mean + halfwidth, "method": "conformal"}
+
+
+def _atomic_json_dump(data: Dict[str, Any], filepath: Path) -> None:
+    """Write JSON to a temporary file and rename it into place."""
+    tmp_path = filepath.with_name(f".{filepath.name}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, filepath)
+
+
+class ModelBackend(ABC):
+    """
+    Interface shared by every per-symbol model.
+
+    Subclasses keep `input_shape` (sequence_length, num_features) and a
+    JSON-serializable `metadata` dict, and store their artifacts under
+    Config.MODELS_DIR keyed by symbol.
+    """
+
+    name = "base"
+
+    def __init__(self, input_shape: Tuple[int, int]):
+        self.input_shape = tuple(input_shape)
+        self.metadata: Dict[str, Any] = {}
+
+    @abstractmethod
+    def train(
+        self,
+        X_train: np.ndarray,
+        y_train: np.ndarray,
+        X_val: np.ndarray,
+        y_val: np.ndarray,
+        symbol: str = "stock",
+    ) -> Dict[str, Any]:
+        """Fit on training data; return loss/val_loss/mae/val_mae/epochs."""
+
+    @abstractmethod
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Predict targets, shape (num_samples, horizon)."""
+
+    @abstractmethod
+    def save(self, name: str) -> Path:
+        """Save artifacts and metadata for `name`."""
+
+    @classmethod
+    @abstractmethod
+    def load(cls, name: str) -> Optional["ModelBackend"]:
+        """Load artifacts for `name`, or None if missing."""
+
+    def predict_distribution(
+        self,
+        X: np.ndarray,
+        samples: int = Config.MC_DROPOUT_SAMPLES,
+        coverage: float = Config.PREDICTION_INTERVAL,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Point prediction and predictive interval per window.
+
+        Deterministic backends have nothing to sample, so the spread is
+        the validation error: std = √(π/2)·val MAE (normal errors).
+
+        Returns:
+            Dict of (num_samples, horizon) arrays: mean, std, lower, upper
+        """
+        mean = np.asarray(self.predict(X), dtype=np.float64).reshape(len(X), -1)
+        std = np.full(mean.shape, math.sqrt(math.pi / 2) * float(self.metadata.get("final_val_mae", 0.0)))
+        z = NormalDist().inv_cdf(0.5 + coverage / 2)
+        return {"mean": mean, "std": std, "lower": mean - z * std, "upper": mean + z * std}
+
+    def evaluate(self, X_test: np.ndarray, y_test: np.ndarray) -> Dict[str, Any]:
+        """Evaluate on consecutive held-out windows with a single prediction pass."""
+        results = regression_metrics(y_test, self.predict(X_test), reference=reference_prices(y_test))
+        logger.info(
+            f"✓ {self.name} evaluation: RMSE={results['rmse']:.6f}, "
+            f"MAE={results['mae']:.6f}, MAPE={results['mape']:.2f}%, "
+            f"direction={results['directional_accuracy']:.1%}"
+        )
+        return results
+
+    @staticmethod
+    def _flatten(X: np.ndarray) -> np.ndarray:
+        """Flatten (num_samples, sequence_length, num_features) windows to 2D."""
+        return X.reshape(len(X), -1).astype(np.float64)
+
+    def _train_summary(
+        self,
+        X_train: np.ndarray,
+        y_train: np.ndarray,
+        X_val: np.ndarray,
+        y_val: np.ndarray,
+        symbol: str,
+    ) -> Dict[str, Any]:
+        """Build the train() result dict and metadata shared by the baselines."""
+        train_metrics = regression_metrics(y_train, self.predict(X_train))
+        val_metrics = regression_metrics(y_val, self.predict(X_val))
+
+        self.metadata.update({
+            "symbol": symbol,
+            "backend": self.name,
+            "final_loss": train_metrics["mse"],
+            "final_val_loss": val_metrics["mse"],
+            "final_mae": train_metrics["mae"],
+            "final_val_mae": val_metrics["mae"],
+            "input_shape": list(self.input_shape),
+            "horizon": int(np.asarray(y_train).reshape(len(y_train), -1).shape[1]),
+        })
+
+        logger.info(
+            f"✓ {self.name} trained for {symbol}: loss={train_metrics['mse']:.6f}, "
+            f"val_loss={val_metrics['mse']:.6f}"
+        )
+        return {
+            "loss": train_metrics["mse"],
+            "val_loss": val_metrics["mse"],
+            "best_val_loss": val_metrics["mse"],
+            "mae": train_metrics["mae"],
+            "val_mae": val_metrics["mae"],
+            "epochs": 1,
+        }
+
+    @classmethod
+    def _load_metadata(cls, name: str) -> Optional[Dict[str, Any]]:
+        """Load the metadata JSON saved next to a baseline artifact."""
+        metadata_path = Config.get_backend_path(name, cls.name, ".json")
+        if not metadata_path.exists():
+            logger.warning(f"{cls.name} model not found for {name}")
+            return None
+        with open(metadata_path, "r") as f:
+            return json.load(f)
+
+
+class RidgeBackend(ModelBackend):
+    """
+    Closed-form ridge regression on flattened windows.
+
+    Solves (XᵀX + αI) w = Xᵀy on centered data for each alpha in
+    Config.RIDGE_ALPHAS and keeps the one with the lowest validation MSE.
+    """
+
+    name = "ridge"
+
+    def __init__(self, input_shape: Tuple[int, int]):
+        super().__init__(input_shape)
+        self.weights: Optional[np.ndarray] = None
+        self.bias = 0.0
+
+    @staticmethod
+    def _solve(
+        X: np.ndarray,
+        y: np.ndarray,
+        alpha: float,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Closed-form ridge solution (one column per horizon step) with an unpenalized intercept."""
+        x_mean = X.mean(axis=0)
+        y_mean = y.mean(axis=0)
+        Xc = X - x_mean
+        gram = Xc.T @ Xc
+        gram[np.diag_indices_from(gram)] += alpha
+        weights = np.linalg.solve(gram, Xc.T @ (y - y_mean))
+        return weights, y_mean - x_mean @ weights
+
+    def train(
+        self,
+        X_train: np.ndarray,
+        y_train: np.ndarray,
+        X_val: np.ndarray,
+        y_val: np.ndarray,
+        symbol: str = "stock",
+    ) -> Dict[str, Any]:
+        X_flat = self._flatten(X_train)
+        X_val_flat = self._flatten(X_val)
+        y = np.asarray(y_train, dtype=np.float64).reshape(len(y_train), -1)
+        y_val = np.asarray(y_val, dtype=np.float64).reshape(y_val.shape[0], -1)
+
+        best_mse = np.inf
+        for alpha in Config.RIDGE_ALPHAS:
+            weights, bias = self._solve(X_flat, y, alpha)
+            mse = float(np.mean((X_val_flat @ weights + bias - y_val) ** 2))
+            if mse < best_mse:
+                best_mse = mse
+                self.weights, self.bias = weights, bias
+                self.metadata["alpha"] = alpha
+
+        return self._train_summary(X_train, y_train, X_val, y_val, symbol)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return (self._flatten(X) @ self.weights + self.bias).reshape(len(X), -1)
+
+    def save(self, name: str) -> Path:
+        path = Config.get_backend_path(name, self.name, ".npz")
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, weights=self.weights, bias=self.bias)
+        os.replace(tmp_path, path)
+        _atomic_json_dump(self.metadata, Config.get_backend_path(name, self.name, ".json"))
+        logger.info(f"✓ Saved ridge model to {path}")
+        return path
+
+    @classmethod
+    def load(cls, name: str) -> Optional["RidgeBackend"]:
+        metadata = cls._load_metadata(name)
+        if metadata is None:
+            return None
+
+        model = cls(tuple(metadata["input_shape"]))
+        with np.load(Config.get_backend_path(name, cls.name, ".npz")) as data:
+            model.weights = data["weights"]
+            model.bias = data["bias"]
+        model.metadata = metadata
+        return model
+
+
+class GradientBoostingBackend(ModelBackend):
+    """
+    Histogram gradient-boosted trees (scikit-learn) on flattened windows.
+
+    Trees are single-output, so one regressor is fit per horizon step.
+    """
+
+    name = "gbm"
+
+    def __init__(self, input_shape: Tuple[int, int]):
+        if not SKLEARN_AVAILABLE:
+            raise ImportError(
+                "scikit-learn is required. Install with: pip install scikit-learn"
+            )
+        super().__init__(input_shape)
+        self.model = MultiOutputRegressor(HistGradientBoostingRegressor(
+            max_iter=Config.GBM_MAX_ITER,
+            learning_rate=Config.GBM_LEARNING_RATE,
+            max_leaf_nodes=Config.GBM_MAX_LEAF_NODES,
+            random_state=Config.GBM_SEED,
+        ))
+
+    def train(
+        self,
+        X_train: np.ndarray,
+        y_train: np.ndarray,
+        X_val: np.ndarray,
+        y_val: np.ndarray,
+        symbol: str = "stock",
+    ) -> Dict[str, Any]:
+        self.model.fit(self._flatten(X_train), np.asarray(y_train).reshape(len(y_train), -1))
+        return self._train_summary(X_train, y_train, X_val, y_val, symbol)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.model.predict(self._flatten(X)).reshape(len(X), -1)
+
+    def save(self, name: str) -> Path:
+        path = Config.get_backend_path(name, self.name, ".joblib")
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        joblib.dump(self.model, tmp_path)
+        os.replace(tmp_path, path)
+        _atomic_json_dump(self.metadata, Config.get_backend_path(name, self.name, ".json"))
+        logger.info(f"✓ Saved gradient boosting model to {path}")
+        return path
+
+    @classmethod
+    def load(cls, name: str) -> Optional["GradientBoostingBackend"]:
+        metadata = cls._load_metadata(name)
+        if metadata is None:
+            return None
+
+        model = cls(tuple(metadata["input_shape"]))
+        model.model = joblib.load(Config.get_backend_path(name, cls.name, ".joblib"))
+        model.metadata = metadata
+        return model
+
+
+def _lstm_class():
+    """Import the LSTM lazily so baselines work without TensorFlow."""
+    from model import StockPricePredictor
+    ModelBackend.register(StockPricePredictor)
+    return StockPricePredictor
+
+
+BACKENDS = {
+    "ridge": RidgeBackend,
+    "gbm": GradientBoostingBackend,
+}
+
+
+def get_backend_class(name: str):
+    """
+    Look up a backend class by name.
+
+    Args:
+        name: "lstm", "ridge" or "gbm"
+
+    Returns:
+        Backend class
+    """
+    if name == "lstm":
+        return _lstm_class()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown model backend: {name}")
+    return BACKENDS[name]
+
+
+def create_backend(
+    name: str,
+    input_shape: Tuple[int, int],
+    hyperparams: Optional[Dict[str, Any]] = None,
+    horizon: int = Config.FORECAST_HORIZON,
+) -> ModelBackend:
+    """
+    Instantiate an untrained backend.
+
+    Args:
+        name: Backend name
+        input_shape: (sequence_length, num_features)
+        hyperparams: LSTM hyperparameters (ignored by the baselines)
+        horizon: Output width of the LSTM (baselines take it from the
+            training targets)
+
+    Returns:
+        Backend instance
+    """
+    backend_class = get_backend_class(name)
+    if name == "lstm":
+        return backend_class(input_shape, hyperparams=hyperparams, horizon=horizon)
+    return backend_class(input_shape)
+
+
+def load_selection(symbol: str) -> Dict[str, Any]:
+    """Load the backend selection record for a symbol (empty if none)."""
+    filepath = Config.get_model_selection_path(symbol)
+    if not filepath.exists():
+        return {}
+    try:
+        with open(filepath, "r") as f:
+            return json.load(f)
+    except (json.JSONDecodeError, IOError) as e:
+        logger.error(f"Failed to load model selection for {symbol}: {e}")
+        return {}
+
+
+def update_selection(symbol: str, scores: Dict[str, float]) -> str:
+    """
+    Merge new validation scores and pick the backend to serve.
+
+    Scores from backends not retrained this run are kept, so training
+    only the baselines still compares against a previously trained LSTM.
+
+    Args:
+        symbol: Stock symbol
+        scores: Backend name -> validation RMSE
+
+    Returns:
+        Name of the selected backend
+    """
+    record = load_selection(symbol)
+    merged = {**record.get("scores", {}), **scores}
+    merged = {name: score for name, score in merged.items() if np.isfinite(score)}
+    if not merged:
+        raise ValueError(f"No valid backend scores for {symbol}")
+
+    selected = min(merged, key=merged.get)
+    _atomic_json_dump(
+        {"symbol": symbol, "backend": selected, "scores": merged},
+        Config.get_model_selection_path(symbol),
+    )
+    logger.info(f"✓ Selected {selected} backend for {symbol} (val RMSE {merged[selected]:.6f})")
+    return selected
+
+
+def load_backend(symbol: str, name: Optional[str] = None) -> Optional[ModelBackend]:
+    """
+    Load the serving model for a symbol.
+
+    Args:
+        symbol: Stock symbol
+        name: Backend to load (default: the selected one, else "lstm")
+
+    Returns:
+        Backend instance or None if not found
+    """
+    name = name or load_selection(symbol).get("backend", "lstm")
+    try:
+        return get_backend_class(name).load(symbol)
+    except (ImportError, ValueError) as e:
+        logger.error(f"Failed to load {name} model for {symbol}: {e}")
+        return None
+
+
+def available_backends() -> List[str]:
+    """Names accepted by create_backend/load_backend."""
+    return ["lstm", *BACKENDS]
+
+
+def _metadata_path(symbol: str, backend: str) -> Path:
+    """Where a backend saved its metadata for a symbol."""
+    if backend == "lstm":
+        return Config.get_model_path(symbol).with_suffix(".json")
+    return Config.get_backend_path(symbol, backend, ".json")
+
+
+def write_metrics_report(symbols: List[str], filepath: Optional[Path] = None) -> Optional[Path]:
+    """
+    Write the evaluation metrics of every trained model as one table.
+
+    Rows (one per symbol, backend and split) are built from the metrics
+    saved in each model's metadata, so models trained by remote workers
+    are included too. Per-horizon errors become rmse_h1.., mae_h1..
+    columns. The table is Parquet when pyarrow is installed, else CSV.
+
+    Args:
+        symbols: Symbols to include
+        filepath: Output path (default: Config.METRICS_REPORT_PATH)
+
+    Returns:
+        Path written, or None if no model has recorded metrics
+    """
+    rows = []
+    for symbol in symbols:
+        selected = load_selection(symbol).get("backend")
+        for backend in available_backends():
+            metadata_path = _metadata_path(symbol, backend)
+            if not metadata_path.exists():
+                continue
+            with open(metadata_path, "r") as f:
+                metadata = json.load(f)
+            for split in ("val", "test"):
+                metrics = metadata.get(f"{split}_metrics")
+                if not metrics:
+                    continue
+                row = {
+                    "symbol": symbol,
+                    "backend": backend,
+                    "split": split,
+                    "selected": backend == selected,
+                    "trained_through": metadata.get("trained_through"),
+                }
+                row.update({key: value for key, value in metrics.items() if not isinstance(value, list)})
+                for key in ("rmse", "mae"):
+                    for step, value in enumerate(metrics.get(f"horizon_{key}", []), start=1):
+                        row[f"{key}_h{step}"] = value
+                rows.append(row)
+
+    if not rows:
+        logger.warning("No evaluation metrics recorded; metrics report not written")
+        return None
+
+    table = pd.DataFrame(rows)
+    filepath = Path(filepath or Config.METRICS_REPORT_PATH)
+    if not PYARROW_AVAILABLE and filepath.suffix == ".parquet":
+        filepath = filepath.with_suffix(".csv")
+    tmp_path = filepath.with_name(f".{filepath.name}.tmp")
+    if filepath.suffix == ".parquet":
+        table.to_parquet(tmp_path, index=False)
+    else:
+        table.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, filepath)
+
+    test = table[table["split"] == "test"]
+    if not test.empty:
+        columns = [c for c in ("rmse", "mape", "directional_accuracy") if c in test]
+        summary = test.groupby("backend")[columns].median()
+        logger.info(f"Median test metrics across {test['symbol'].nunique()} symbols:\n{summary.to_string()}")
+    logger.info(f"✓ Wrote metrics report ({len(table)} rows) to {filepath}")
+    return filepath
+
+
+if __name__ == "__main__":
+    print(f"Model backends: {available_backends()}")
@@ -0,0 +1,133 @@
+"""
+Bar interval utilities for daily and intraday data.
+
+Handles:
+- Converting interval strings ("1min", "5min", "1h", "1D") and indicator
+  windows (bar counts or wall-clock spans like "30min") to bar counts
+- Mapping timestamps to the start of their bar
+- Vectorized OHLCV resampling to any coarser interval with NumPy
+  reductions (no per-bar Python loops)
+"""
+
+from typing import Dict, Union
+
+import numpy as np
+import pandas as pd
+
+from config import Config
+
+Window = Union[int, str]
+
+
+def interval_to_timedelta(interval: str) -> pd.Timedelta:
+    """Convert an interval string ("5min", "1h", "1D") to a Timedelta."""
+    return pd.Timedelta(interval)
+
+
+def window_to_bars(window: Window, interval: str = Config.BAR_INTERVAL) -> int:
+    """
+    Express an indicator window as a number of bars.
+
+    Args:
+        window: Bar count (int) or wall-clock span ("30min", "2h", "5D")
+        interval: Bar interval the window applies to
+
+    Returns:
+        Number of bars (at least 1)
+    """
+    if isinstance(window, (int, np.integer)):
+        return int(window)
+    return max(1, int(pd.Timedelta(window) // interval_to_timedelta(interval)))
+
+
+def bar_start(
+    timestamp,
+    interval: str = Config.BAR_INTERVAL,
+    offset: str = Config.BAR_OFFSET,
+) -> pd.Timestamp:
+    """Start of the bar a timestamp belongs to."""
+    offset_td = pd.Timedelta(offset)
+    return (pd.Timestamp(timestamp) - offset_td).floor(interval_to_timedelta(interval)) + offset_td
+
+
+def resample_ohlcv(
+    timestamps: np.ndarray,
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    volume: np.ndarray,
+    interval: str,
+    offset: str = Config.BAR_OFFSET,
+) -> Dict[str, np.ndarray]:
+    """
+    Aggregate OHLCV arrays into bars of `interval`.
+
+    Rows are bucketed by integer division of their timestamp; each bar
+    takes the first open, max high, min low, last close and summed
+    volume, computed with ufunc.reduceat over the bucket boundaries.
+    Empty buckets (nights, weekends) produce no bar.
+
+    Args:
+        timestamps: Sorted datetime64 values
+        open_, high, low, close, volume: Column arrays aligned with timestamps
+        interval: Target bar size (e.g. "5min", "1h", "1D")
+        offset: Bucket alignment (e.g. "15min" for bars starting at :15)
+
+    Returns:
+        Dict of column arrays for the resampled bars
+    """
+    ts = np.asarray(timestamps, dtype="datetime64[ns]").astype(np.int64)
+    if len(ts) == 0:
+        empty = np.array([], dtype=np.float64)
+        return {"timestamp": np.array([], dtype="datetime64[ns]"), "open": empty,
+                "high": empty, "low": empty, "close": empty, "volume": empty}
+
+    step = interval_to_timedelta(interval).value
+    shift = pd.Timedelta(offset).value
+    buckets = (ts - shift) // step
+
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(ts)] - 1
+
+    return {
+        "timestamp": (buckets[starts] * step + shift).astype("datetime64[ns]"),
+        "open": np.asarray(open_)[starts],
+        "high": np.fmax.reduceat(np.asarray(high, dtype=np.float64), starts),
+        "low": np.fmin.reduceat(np.asarray(low, dtype=np.float64), starts),
+        "close": np.asarray(close)[ends],
+        "volume": np.add.reduceat(np.nan_to_num(np.asarray(volume, dtype=np.float64)), starts),
+    }
+
+
+def resample_bars(
+    df: pd.DataFrame,
+    interval: str = Config.BAR_INTERVAL,
+    offset: str = Config.BAR_OFFSET,
+) -> pd.DataFrame:
+    """
+    Resample an OHLCV DataFrame to a coarser bar interval.
+
+    Args:
+        df: DataFrame with timestamp, open, high, low, close, volume
+        interval: Target bar size
+        offset: Bucket alignment
+
+    Returns:
+        Resampled DataFrame with the same columns
+    """
+    timestamps = pd.to_datetime(df["timestamp"]).to_numpy()
+    order = np.argsort(timestamps, kind="stable")
+    columns = {c: df[c].to_numpy()[order] for c in ("open", "high", "low", "close", "volume")}
+
+    bars = resample_ohlcv(
+        timestamps[order],
+        columns["open"], columns["high"], columns["low"], columns["close"], columns["volume"],
+        interval=interval,
+        offset=offset,
+    )
+    return pd.DataFrame(bars)
+
+
+if __name__ == "__main__":
+    print(f"Source interval: {Config.SOURCE_INTERVAL}, bar interval: {Config.BAR_INTERVAL}")
@@ -0,0 +1,145 @@
+"""
+Execution profile benchmark.
+
+Handles:
+- Timing the "default", "xla_inference" and "xla" execution profiles
+  (Config.EXECUTION_PROFILE) on the same synthetic windows and weights
+- Training throughput (windows/s per epoch), single-window inference
+  latency (median and p95) and batch inference throughput
+- Checking that every profile predicts the same values
+
+Usage:
+    python benchmark.py
+    python benchmark.py --windows 8192 --features 20 --calls 500
+"""
+
+import argparse
+import os
+import time
+from typing import Any, Dict
+
+import numpy as np
+
+from config import Config
+from model import StockPricePredictor, tf
+
+PROFILES = ("default", "xla_inference", "xla")
+
+
+def _time_training(model: StockPricePredictor, X: np.ndarray, y: np.ndarray, epochs: int) -> float:
+    """Training windows per second, after one warm-up epoch (tracing/compilation)."""
+    batch_size = int(model.hyperparams["batch_size"])
+    model.model.fit(X, y, batch_size=batch_size, epochs=1, verbose=0)
+    start = time.perf_counter()
+    model.model.fit(X, y, batch_size=batch_size, epochs=epochs, verbose=0)
+    return epochs * len(X) / (time.perf_counter() - start)
+
+
+def _time_latency(model: StockPricePredictor, window: np.ndarray, calls: int) -> np.ndarray:
+    """Milliseconds per single-window predict() call."""
+    for _ in range(5):
+        model.predict(window)
+    timings = np.empty(calls)
+    for i in range(calls):
+        start = time.perf_counter()
+        model.predict(window)
+        timings[i] = time.perf_counter() - start
+    return timings * 1000
+
+
+def _time_throughput(model: StockPricePredictor, X: np.ndarray, repeats: int = 3) -> float:
+    """Windows per second for one predict() over the whole array (best of repeats)."""
+    model.predict(X)
+    best = np.inf
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict(X)
+        best = min(best, time.perf_counter() - start)
+    return len(X) / best
+
+
+def run_benchmark(
+    windows: int = 4096,
+    features: int = 15,
+    epochs: int = 2,
+    calls: int = 200,
+    seed: int = 0,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Benchmark every execution profile with identical data and weights.
+
+    Args:
+        windows: Synthetic windows used for training and batch inference
+        features: Features per timestep
+        epochs: Timed training epochs per profile
+        calls: Single-window predict() calls for the latency figures
+        seed: Random seed for the data and the initial weights
+
+    Returns:
+        Dict of profile -> measurements
+    """
+    rng = np.random.default_rng(seed)
+    input_shape = (Config.SEQUENCE_LENGTH, features)
+    X = rng.standard_normal((windows, *input_shape)).astype(np.float32)
+    y = rng.standard_normal((windows, Config.FORECAST_HORIZON)).astype(np.float32)
+
+    profile = Config.EXECUTION_PROFILE
+    results: Dict[str, Dict[str, Any]] = {}
+    reference = None
+    try:
+        for name in PROFILES:
+            Config.EXECUTION_PROFILE = name
+            tf.keras.utils.set_random_seed(seed)
+            model = StockPricePredictor(input_shape)
+            predictions = model.predict(X)
+            if reference is None:
+                reference = predictions
+
+            latency = _time_latency(model, X[:1], calls)
+            results[name] = {
+                "max_abs_diff": float(np.abs(predictions - reference).max()),
+                "latency_median_ms": float(np.median(latency)),
+                "latency_p95_ms": float(np.percentile(latency, 95)),
+                "predict_windows_per_s": _time_throughput(model, X),
+                "train_windows_per_s": _time_training(model, X, y, epochs),
+            }
+    finally:
+        Config.EXECUTION_PROFILE = profile
+    return results
+
+
+def print_report(results: Dict[str, Dict[str, Any]]) -> None:
+    """Print the measurements of every profile side by side."""
+    threads = tf.config.threading
+    print("\n" + "=" * 72)
+    print("EXECUTION PROFILE BENCHMARK")
+    print(
+        f"TensorFlow {tf.__version__}, intra-op threads {threads.get_intra_op_parallelism_threads() or 'default'}, "
+        f"inter-op threads {threads.get_inter_op_parallelism_threads() or 'default'}, "
+        f"oneDNN {os.environ.get('TF_ENABLE_ONEDNN_OPTS', 'default')}"
+    )
+    print("=" * 72)
+    rows = [
+        ("Single-window latency, median (ms)", "latency_median_ms"),
+        ("Single-window latency, p95 (ms)", "latency_p95_ms"),
+        ("Batch inference (windows/s)", "predict_windows_per_s"),
+        ("Training (windows/s)", "train_windows_per_s"),
+        ("Max |prediction - default|", "max_abs_diff"),
+    ]
+    print(f"{'':38}" + "".join(f"{name:>15}" for name in results))
+    for label, key in rows:
+        print(f"{label:38}" + "".join(f"{measured[key]:>15.4g}" for measured in results.values()))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare the execution profiles")
+    parser.add_argument("--windows", type=int, default=4096, help="Synthetic windows")
+    parser.add_argument("--features", type=int, default=15, help="Features per timestep")
+    parser.add_argument("--epochs", type=int, default=2, help="Timed training epochs")
+    parser.add_argument("--calls", type=int, default=200, help="Single-window predict calls")
+    args = parser.parse_args()
+    print_report(run_benchmark(args.windows, args.features, args.epochs, args.calls))
+
+
+if __name__ == "__main__":
+    main()
@@ -10,7 +10,7 @@ Handles:
 
 import os
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 
 class Config:
@@ -28,8 +28,13 @@ class Config:
     RATE_LIMIT_RESET_HOUR = 0  # Reset quota counter at midnight UTC
 
     # ============ SYMBOLS TO TRACK ============
-    # List of symbols to download historical data for
+    # The universe is read from UNIVERSE_PATH (CSV or Parquet with columns
+    # symbol, sector, exchange, priority); SYMBOLS is the fallback when the
+    # file doesn't exist. main.py replaces SYMBOLS with this process's shard.
     # TODO: Verify symbol format from indianapi.com (e.g., "TCS.NS", "RELIANCE.NS", etc.)
+    UNIVERSE_PATH = Path(os.getenv("PIPELINE_UNIVERSE_PATH", str(Path(__file__).parent / "universe.csv")))
+    SHARD_INDEX = int(os.getenv("PIPELINE_SHARD_INDEX", "0"))  # This process's slice (0-based)
+    SHARD_COUNT = int(os.getenv("PIPELINE_SHARD_COUNT", "1"))  # Number of slices
     SYMBOLS = [
         "TCS",  # Tata Consultancy Services
         "HDFC",  # Housing Development Finance Corp
@@ -43,17 +48,37 @@ class Config:
     DATA_DIR = PROJECT_ROOT / "data"
     RAW_DATA_DIR = DATA_DIR / "raw"
     PROCESSED_DATA_DIR = DATA_DIR / "processed"
+    CACHE_DIR = DATA_DIR / "cache"  # Memory-mapped training tensors
+    JOURNAL_PATH = DATA_DIR / "run_journal.sqlite"  # Per-symbol stage log for --resume
+    PREDICTION_STORE_PATH = DATA_DIR / "predictions.sqlite"  # Materialized --predict table served by the backend
+    QUALITY_DIR = DATA_DIR / "quality"  # Per-symbol data quality reports
+    FEATURE_STORE_DIR = DATA_DIR / "features"  # Lazily computed feature columns
+    CROSS_SECTION_DIR = DATA_DIR / "cross_section"  # Per-symbol cross-sectional features
+    CORRELATION_DIR = DATA_DIR / "correlation"  # Rolling correlation matrices
     MODELS_DIR = PROJECT_ROOT / "models"
+    TUNING_DIR = MODELS_DIR / "tuning"
+    LSTM_STATE_DIR = MODELS_DIR / "state"  # Per-symbol LSTM state for stateful inference
+    METRICS_REPORT_PATH = MODELS_DIR / "metrics_report.parquet"  # All-symbol evaluation table (CSV without pyarrow)
     LOGS_DIR = PROJECT_ROOT / "logs"
 
     # Create directories if they don't exist
-    for directory in [RAW_DATA_DIR, PROCESSED_DATA_DIR, MODELS_DIR, LOGS_DIR]:
+    for directory in [RAW_DATA_DIR, PROCESSED_DATA_DIR, CACHE_DIR, QUALITY_DIR, FEATURE_STORE_DIR, CROSS_SECTION_DIR, CORRELATION_DIR, MODELS_DIR, TUNING_DIR, LSTM_STATE_DIR, LOGS_DIR]:
         directory.mkdir(parents=True, exist_ok=True)
 
     # ============ DATA COLLECTION PARAMETERS ============
     # TODO: Verify what historical date ranges the API supports
     # For initial pipeline, we'll collect last N days of data
     HISTORY_DAYS = 60  # Collect 60 days of historical data per symbol
+    RAW_COMPRESSION = "gzip"  # Raw archive codec: "gzip" or "zstd" (needs zstandard)
+    RAW_COMPRESSION_LEVEL = 6
+    RAW_PARSE_CHUNK_ROWS = 100000  # Records parsed per chunk when reading archives
+    
+    # Bar sizes: "1min", "5min", "15min", "1h" or "1D"
+    SOURCE_INTERVAL = "1D"  # Candles returned by the historical endpoint
+    BAR_INTERVAL = "1D"  # Candles used for features/training (resampled from SOURCE_INTERVAL)
+    BAR_OFFSET = "0min"  # Bucket alignment, e.g. "15min" for hourly bars starting 9:15
+    # TODO: Verify interval parameter values from indianapi.com docs
+    API_INTERVAL_NAMES = {"1min": "1m", "5min": "5m", "15min": "15m", "1h": "1h", "1D": "1d"}
     
     # TODO: Verify available endpoints:
     # - Historical OHLCV endpoint
@@ -67,8 +92,40 @@ class Config:
     }
 
     # ============ FEATURE ENGINEERING ============
-    # Moving averages periods (in days)
-    MA_PERIODS = [5, 10, 20]  # 5-day, 10-day, 20-day moving averages
+    # Indicator windows are bar counts (e.g. 20) or wall-clock spans (e.g. "30min")
+    MA_PERIODS = [5, 10, 20]  # 5-bar, 10-bar, 20-bar moving averages
+    RSI_PERIOD = 14
+    VOLATILITY_WINDOW = 10
+    
+    # Cross-sectional features (cross_section.py), computed over the whole universe.
+    # The index is fetched with the universe (--collect, --full; one request) but not
+    # trained; without its bars the equal-weighted universe return is the market.
+    # TODO: Verify the API symbol for the NIFTY 50 index
+    MARKET_INDEX_SYMBOL = "NIFTY"
+    RELATIVE_STRENGTH_WINDOW = 20  # Bars of excess return vs. the index
+    BETA_WINDOW = 60  # Bars in the rolling beta regression
+    CROSS_SECTION_MIN_COVERAGE = 0.8  # Fraction of a window's bars a symbol must have traded
+    CROSS_SECTIONAL_FEATURES = [
+        f"rel_strength_{RELATIVE_STRENGTH_WINDOW}",
+        "sector_rel_return",
+        f"beta_{BETA_WINDOW}",
+        "breadth",
+    ]
+    
+    # Rolling return correlation matrix over the universe (correlation.py)
+    CORRELATION_WINDOW = 60  # Bars per window
+    CORRELATION_REFRESH_BARS = 250  # Recompute the running sums exactly every N bars (bounds float drift)
+    
+    # Model input features, served by the feature store (features.py).
+    # Names are base columns or registered features with an optional
+    # window suffix, e.g. "sma_20", "ema_30min", "rsi_14".
+    FEATURES = (
+        ["open", "high", "low", "close", "volume"]
+        + [f"sma_{p}" for p in MA_PERIODS]
+        + [f"ema_{p}" for p in MA_PERIODS]
+        + [f"rsi_{RSI_PERIOD}", "roc", "volatility", "return"]
+        + CROSS_SECTIONAL_FEATURES
+    )
     
     # Technical indicators to compute
     # Options: RSI, MACD, Bollinger Bands, ATR, etc.
@@ -82,19 +139,129 @@ class Config:
     
     # Training parameters
     SEQUENCE_LENGTH = 10  # Look back 10 days to predict next day
+    FORECAST_HORIZON = 1  # Predict the next H closes in one forward pass
     BATCH_SIZE = 32
     EPOCHS = 50
     VALIDATION_SPLIT = 0.2
     TEST_SPLIT = 0.1
+    MIN_TRAINING_SEQUENCES = 100  # Skip symbols with fewer sequences
+    
+    # "window": one overlapping window per target (each bar passes through the
+    # LSTM up to SEQUENCE_LENGTH times per epoch). "sequence": contiguous chunks
+    # with a loss at every timestep, so each bar is processed about once per epoch.
+    # Sequence-trained models are skipped by --finetune; retrain them instead
+    TRAINING_MODE = "window"
+    SEQUENCE_CHUNK_LENGTH = 64  # Timesteps per chunk (truncated BPTT length)
+    SEQUENCE_CHUNK_BATCH = 4  # Chunks per gradient step
+    
+    # The best weights are tracked in memory; a background thread writes
+    # them to models/{SYMBOL}_best.weights.npz this often and at the end
+    CHECKPOINT_EVERY_EPOCHS = 5
     
     # Optimizer and loss
     LEARNING_RATE = 0.001
     LOSS_FUNCTION = "mse"  # Mean Squared Error for regression
     METRICS = ["mae", "mse"]
     
+    # ============ MODEL BACKENDS ============
+    # Candidates trained per symbol by `python main.py --train`; the one with
+    # the lowest validation RMSE is served. Options: "ridge", "gbm", "lstm"
+    MODEL_BACKENDS = ["ridge", "gbm", "lstm"]
+    RIDGE_ALPHAS = [0.01, 0.1, 1.0, 10.0, 100.0]  # Picked on the validation split
+    GBM_MAX_ITER = 200
+    GBM_LEARNING_RATE = 0.05
+    GBM_MAX_LEAF_NODES = 31
+    GBM_SEED = 42
+
+    # ============ PREDICTION UNCERTAINTY ============
+    # "conformal": split-conformal bounds from the sorted absolute validation
+    # residuals saved at training time (one point prediction, O(1) lookup;
+    # --finetune drops the calibration, so fine-tuned models use "distribution").
+    # "distribution": Monte-Carlo dropout for the LSTM (this many stochastic
+    # passes, run as one batched forward call); baselines use their validation error.
+    INTERVAL_METHOD = "conformal"
+    MC_DROPOUT_SAMPLES = 50
+    MC_DROPOUT_MAX_BATCH = 8192  # Windows per forward call after tiling
+    PREDICTION_INTERVAL = 0.9  # Coverage of the reported lower/upper bounds
+
+    # ============ STATEFUL INFERENCE ============
+    # Keep each symbol's LSTM hidden/cell state and advance it one timestep
+    # per new bar instead of re-running the SEQUENCE_LENGTH window. The state
+    # is seeded from the first window and then carries the whole history, so
+    # it is only used for models trained with TRAINING_MODE = "sequence"; window-
+    # trained models keep the windowed prediction (with a warning).
+    STATEFUL_INFERENCE = False
+
+    # ============ LIVE MODE ============
+    # Used by `python main.py --live`. Every poll costs one request per
+    # symbol, so keep the interval in line with MAX_REQUESTS_PER_DAY.
+    LIVE_POLL_INTERVAL = 60  # Seconds between quote polls for the universe
+    LIVE_BAR_INTERVAL = BAR_INTERVAL  # Ticks are aggregated into bars of this size
+    LIVE_VOLUME_IS_CUMULATIVE = True  # Quote volume is the running total for the bar
+    # Live feature rows are computed by the feature registry over the last
+    # LIVE_HISTORY_BARS completed bars plus the current one. Keep it above the
+    # longest indicator window; EMAs restart at the first of these bars, so a
+    # few times their span makes them match the full-history values.
+    LIVE_HISTORY_BARS = 200
+
+    # ============ INCREMENTAL FINE-TUNING ============
+    # Used by `python main.py --finetune` to update existing models with new bars
+    FINETUNE_EPOCHS = 3
+    FINETUNE_WINDOW = 60  # Most recent sequences to train on
+    FINETUNE_REPLAY_SIZE = 60  # Older sequences replayed to avoid forgetting
+    FINETUNE_SEED = 42
+
+    # ============ HYPERPARAMETER SEARCH ============
+    # Used by `python main.py --tune`. Lists are sampled uniformly,
+    # (low, high) tuples are sampled log-uniformly.
+    TUNING_SEARCH_SPACE = {
+        "lstm_units": [32, 64, 128],
+        "lstm_layers": [1, 2, 3],
+        "sequence_length": [5, 10, 20],
+        "learning_rate": (1e-4, 1e-2),
+        "batch_size": [16, 32, 64],
+    }
+    TUNING_STRATEGY = "hyperband"  # "hyperband" or "sha" (single successive halving bracket)
+    TUNING_NUM_TRIALS = 27  # Configurations sampled for the "sha" strategy
+    TUNING_MIN_EPOCHS = 3  # Budget of the first rung
+    TUNING_MAX_EPOCHS = EPOCHS  # Budget of the last rung
+    TUNING_REDUCTION_FACTOR = 3  # Keep the best 1/eta trials at each rung
+    TUNING_WORKERS = 4  # Parallel worker processes
+    TUNING_THREADS_PER_WORKER = 1  # TensorFlow intra-op threads per worker
+    TUNING_SEED = 42
+
+    # ============ PIPELINE SCHEDULING ============
+    # --full streams each symbol through collect → process → train
+    PIPELINE_IO_WORKERS = 4  # Threads for API requests
+    PIPELINE_CPU_WORKERS = 2  # Processes for processing/training
+    PIPELINE_THREADS_PER_WORKER = 2  # TensorFlow intra-op threads per CPU worker
+
+    # ============ EXECUTION PROFILE ============
+    # "default": Keras defaults (no XLA on CPU, inference through model.predict).
+    # "xla_inference": inference through an XLA-compiled tf.function with a
+    # fixed input signature, fed single windows or INFERENCE_BATCH_SIZE
+    # batches so it compiles once per shape; training unchanged.
+    # "xla": the same plus XLA-compiled training steps (jit_compile).
+    # Measure on the target machine with `python benchmark.py`
+    EXECUTION_PROFILE = os.getenv("PIPELINE_EXECUTION_PROFILE", "default")
+    INFERENCE_BATCH_SIZE = 256
+    TF_INTRA_OP_THREADS = 0  # 0 = TensorFlow default (one per core); worker pools set their own
+    TF_INTER_OP_THREADS = 0
+    TF_ENABLE_ONEDNN = None  # True/False sets TF_ENABLE_ONEDNN_OPTS before TensorFlow loads; None = TF default
+
+    # ============ DISTRIBUTED TRAINING ============
+    # Coordinator (--coordinator) and workers (--worker) share one SQLite file;
+    # on multiple nodes point PIPELINE_QUEUE_PATH at shared storage
+    QUEUE_PATH = Path(os.getenv("PIPELINE_QUEUE_PATH", str(DATA_DIR / "work_queue.sqlite")))
+    QUEUE_LEASE_SECONDS = 600  # A job is reclaimed if its worker stops renewing for this long
+    QUEUE_HEARTBEAT_INTERVAL = 60  # Seconds between lease renewals
+    QUEUE_MAX_ATTEMPTS = 3  # Attempts before a job is marked failed
+    QUEUE_POLL_INTERVAL = 10  # Seconds between polls when the queue is empty
+
     # ============ LOGGING ============
     LOG_LEVEL = "INFO"
     LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    LOG_HOT_PATH_INTERVAL = 60.0  # Seconds between messages from one per-call/per-batch log site
 
     # ============ TARGET VARIABLE ============
     # What we're predicting:
@@ -105,6 +272,12 @@ class Config:
     # ============ DATA VALIDATION ============
     MIN_DATA_POINTS = 30  # Minimum number of valid data points per symbol
     MISSING_VALUE_THRESHOLD = 0.3  # Drop columns with >30% missing values
+    VALIDATION_SPIKE_WINDOW = 21  # Bars in the centered rolling median for spike detection
+    VALIDATION_SPIKE_Z = 8.0  # Robust z-score (deviation / MAD) above which a close is a spike
+    VALIDATION_SPIKE_MIN_MOVE = 0.15  # ...and only if it is also >15% (log) away from the median
+    MARKET_OPEN = "09:15"  # NSE session (exchange-local time), used for intraday calendars
+    MARKET_CLOSE = "15:30"
+    MARKET_HOLIDAYS = []  # TODO: Add NSE trading holidays ("YYYY-MM-DD")
 
     @staticmethod
     def validate() -> bool:
@@ -121,8 +294,14 @@ class Config:
         return True
 
     @staticmethod
-    def get_raw_data_path(symbol: str) -> Path:
-        """Get path for raw API responses for a symbol."""
+    def get_raw_data_path(symbol: str, compression: Optional[str] = None) -> Path:
+        """Get path for the compressed raw response archive of a symbol."""
+        suffix = ".zst" if (compression or Config.RAW_COMPRESSION) == "zstd" else ".gz"
+        return Config.RAW_DATA_DIR / f"{symbol}_raw.csv{suffix}"
+
+    @staticmethod
+    def get_legacy_raw_data_path(symbol: str) -> Path:
+        """Get path for raw responses saved as plain JSON by older versions."""
         return Config.RAW_DATA_DIR / f"{symbol}_raw.json"
 
     @staticmethod
@@ -130,11 +309,51 @@ class Config:
         """Get path for processed dataset for a symbol."""
         return Config.PROCESSED_DATA_DIR / f"{symbol}_processed.csv"
 
+    @staticmethod
+    def get_quality_report_path(symbol: str) -> Path:
+        """Get path for a symbol's data quality report."""
+        return Config.QUALITY_DIR / f"{symbol}_quality.json"
+
+    @staticmethod
+    def get_cross_section_path(symbol: str) -> Path:
+        """Get path for a symbol's cross-sectional feature columns."""
+        return Config.CROSS_SECTION_DIR / f"{symbol}_cross.npz"
+
     @staticmethod
     def get_model_path(name: str = "stock_predictor") -> Path:
         """Get path for trained model checkpoint."""
         return Config.MODELS_DIR / f"{name}.h5"
 
+    @staticmethod
+    def get_checkpoint_path(name: str) -> Path:
+        """Get path for the best weights written while training."""
+        return Config.MODELS_DIR / f"{name}_best.weights.npz"
+
+    @staticmethod
+    def get_backend_path(name: str, backend: str, suffix: str) -> Path:
+        """Get path for a non-LSTM backend artifact (e.g. TCS.ridge.npz)."""
+        return Config.MODELS_DIR / f"{name}.{backend}{suffix}"
+
+    @staticmethod
+    def get_residuals_path(name: str, backend: str) -> Path:
+        """Get path for the sorted validation residuals behind conformal intervals."""
+        return Config.MODELS_DIR / f"{name}.{backend}.residuals.npy"
+
+    @staticmethod
+    def get_lstm_state_path(symbol: str) -> Path:
+        """Get path for a symbol's persisted LSTM state."""
+        return Config.LSTM_STATE_DIR / f"{symbol}_state.npz"
+
+    @staticmethod
+    def get_model_selection_path(symbol: str) -> Path:
+        """Get path for the record of which backend serves a symbol."""
+        return Config.MODELS_DIR / f"{symbol}_selection.json"
+
+    @staticmethod
+    def get_tuning_results_path(symbol: str) -> Path:
+        """Get path for hyperparameter search results for a symbol."""
+        return Config.TUNING_DIR / f"{symbol}_tuning.json"
+
 
 if __name__ == "__main__":
     Config.validate()
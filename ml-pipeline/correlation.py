@@ -0,0 +1,303 @@
+"""
+Rolling return correlation matrix over the universe.
+
+Handles:
+- Running sufficient statistics of the last `window` bars of returns
+  (pairwise sums, squared sums, cross-products and counts), so a new bar
+  costs O(N²) instead of recomputing the O(N²·window) matrix
+- Missing bars: every statistic is pairwise, over the bars where both
+  symbols traded
+- Persisting the statistics and the correlation matrix (float32,
+  memory-mapped for readers)
+- Top-k most correlated symbols, for risk checks and for grouping
+  symbols that could share a model
+"""
+
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import Config
+from log_setup import get_logger
+from cross_section import bar_returns, load_closes
+from features import FeatureStore
+from universe import load_universe
+
+logger = get_logger(__name__, "data_processor.log")
+
+STAT_NAMES = ("cross", "sums", "squares", "counts")
+
+
+def _products(
+    rows: np.ndarray,
+    weights: Optional[np.ndarray] = None,
+    out: Optional[List[np.ndarray]] = None,
+) -> List[np.ndarray]:
+    """
+    Pairwise statistics of a (bars, symbols) block of returns.
+
+    Args:
+        rows: Returns, NaN where a symbol didn't trade
+        weights: Per-bar weight (e.g. +1 for bars entering the window and
+            -1 for bars leaving it), default 1
+        out: Matrices to accumulate into instead of returning new ones
+
+    Returns:
+        [Σ x_i·x_j, Σ x_i, Σ x_i², Σ 1] as (symbols, symbols) matrices,
+        where entry (i, j) only counts bars on which both i and j traded
+    """
+    traded = np.isfinite(rows)
+    x = np.where(traded, rows, 0.0)
+    m = traded.astype(np.float64)
+    w = np.ones(len(rows)) if weights is None else weights
+    pairs = [(x * w[:, None], x), (x * w[:, None], m), (x * x * w[:, None], m), (m * w[:, None], m)]
+    if out is None:
+        return [left.T @ right for left, right in pairs]
+
+    scratch = np.empty_like(out[0])
+    for stat, (left, right) in zip(out, pairs):
+        np.matmul(left.T, right, out=scratch)
+        stat += scratch
+    return out
+
+
+class RollingCorrelation:
+    """
+    Sliding-window correlation from running sums.
+
+    The last `window` return rows are kept in a ring buffer; pushing k
+    new rows adds their products to the sums and subtracts those of the
+    k rows leaving the window (O(N²·k)). Every `refresh_bars` bars the
+    sums are recomputed from the buffer to drop accumulated rounding
+    error.
+    """
+
+    def __init__(self, num_symbols: int, window: int, refresh_bars: int = Config.CORRELATION_REFRESH_BARS):
+        self.window = window
+        self.refresh_bars = refresh_bars
+        self.recent = np.full((window, num_symbols), np.nan)
+        self.position = 0  # Ring slot the next row goes into
+        self.since_refresh = 0
+        self.stats = [np.zeros((num_symbols, num_symbols)) for _ in STAT_NAMES]
+
+    def push(self, rows: np.ndarray) -> None:
+        """Add (bars, symbols) return rows, oldest first."""
+        rows = np.asarray(rows, dtype=np.float64)
+        if len(rows) == 0:
+            return
+        if len(rows) >= self.window:
+            self.recent = rows[-self.window:].copy()
+            self.position = 0
+            self.refresh()
+            return
+
+        # One weighted pass: +1 for the bars entering, -1 for the bars they evict
+        slots = (self.position + np.arange(len(rows))) % self.window
+        weights = np.repeat([1.0, -1.0], len(rows))
+        _products(np.vstack([rows, self.recent[slots]]), weights, out=self.stats)
+        self.recent[slots] = rows
+        self.position = int((self.position + len(rows)) % self.window)
+
+        self.since_refresh += len(rows)
+        if self.since_refresh >= self.refresh_bars:
+            self.refresh()
+
+    def refresh(self) -> None:
+        """Recompute the sums exactly from the buffered rows."""
+        self.stats = _products(self.recent)
+        self.since_refresh = 0
+
+    def correlation(self, min_bars: int = 2) -> np.ndarray:
+        """
+        Pairwise Pearson correlation over the window.
+
+        Args:
+            min_bars: Bars both symbols must have traded (fewer → NaN)
+
+        Returns:
+            (symbols, symbols) float64 matrix
+        """
+        cross, sums, squares, counts = self.stats
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cov = cross - sums * sums.T / counts
+            var = squares - sums * sums / counts  # var of i over bars shared with j
+            corr = cov / np.sqrt(var * var.T)
+        corr[(counts < min_bars) | ~np.isfinite(corr)] = np.nan
+        return np.clip(corr, -1.0, 1.0, out=corr)
+
+
+class CorrelationEngine:
+    """
+    Persistent rolling correlation matrix for the universe.
+
+    Layout (Config.CORRELATION_DIR / window_{window}):
+    - stats.npz: running sums, ring buffer of returns and last closes
+    - correlation.npy: float32 (symbols, symbols) matrix
+    - state.json: symbols, last bar timestamp and ring position
+
+    update() pushes only the bars after the last one it has seen; the
+    statistics are rebuilt from scratch when the universe changes or
+    bars it already consumed were rewritten.
+    """
+
+    def __init__(self, window: int = Config.CORRELATION_WINDOW, store: Optional[FeatureStore] = None):
+        self.window = window
+        self.store = store or FeatureStore()
+        self.directory = Config.CORRELATION_DIR / f"window_{window}"
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.min_bars = max(2, int(np.ceil(window * Config.CROSS_SECTION_MIN_COVERAGE)))
+
+    def _load_state(self) -> Optional[Dict[str, Any]]:
+        path = self.directory / "state.json"
+        if not path.exists() or not (self.directory / "stats.npz").exists():
+            return None
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except (json.JSONDecodeError, IOError):
+            return None
+
+    def _resume(
+        self,
+        state: Optional[Dict[str, Any]],
+        symbols: List[str],
+        filled: pd.DataFrame,
+    ) -> Optional[Tuple[RollingCorrelation, np.ndarray, pd.Timestamp]]:
+        """Saved statistics, if they are still valid for the current bars."""
+        if state is None or state["symbols"] != symbols:
+            return None
+        last_timestamp = pd.Timestamp(state["last_timestamp"])
+        if last_timestamp not in filled.index:
+            return None
+
+        with np.load(self.directory / "stats.npz") as saved:
+            last_close = saved["last_close"]
+            if not np.array_equal(filled.loc[last_timestamp].to_numpy(), last_close, equal_nan=True):
+                logger.info("Consumed bars changed; rebuilding correlation statistics")
+                return None
+            rolling = RollingCorrelation(len(symbols), self.window)
+            rolling.stats = [saved[name] for name in STAT_NAMES]
+            rolling.recent = saved["recent"]
+        rolling.position = state["position"]
+        rolling.since_refresh = state["since_refresh"]
+        return rolling, last_close, last_timestamp
+
+    def update(self) -> bool:
+        """
+        Push new bars into the rolling statistics and rewrite the matrix.
+
+        Returns:
+            True if the matrix is current, False if there is no data
+        """
+        universe = load_universe()["symbol"].tolist()
+        closes = load_closes(universe, self.store)
+        symbols = [s for s in universe if s in closes]
+        if len(symbols) < 2:
+            logger.warning("Need processed data for at least 2 symbols for correlations")
+            return False
+
+        panel = pd.DataFrame({s: closes[s] for s in symbols}).sort_index()
+        filled = panel.ffill()
+        resumed = self._resume(self._load_state(), symbols, filled)
+
+        if resumed is None:
+            rolling = RollingCorrelation(len(symbols), self.window)
+            rolling.push(bar_returns(panel).to_numpy(dtype=np.float64)[-self.window:])
+            pushed = min(len(panel), self.window)
+        else:
+            rolling, last_close, last_timestamp = resumed
+            new = panel[panel.index > last_timestamp]
+            if new.empty:
+                logger.info("✓ Correlation matrix up to date")
+                return True
+            # Returns of the new bars relative to the last closes already consumed
+            previous = pd.DataFrame([last_close], index=[last_timestamp], columns=symbols)
+            rolling.push(bar_returns(pd.concat([previous, new])).to_numpy(dtype=np.float64)[1:])
+            pushed = len(new)
+
+        self._save(rolling, symbols, filled)
+        logger.info(
+            f"✓ Correlation matrix ({len(symbols)} symbols, {self.window}-bar window): "
+            f"{'rebuilt' if resumed is None else 'updated'} with {pushed} bars"
+        )
+        return True
+
+    def _save(self, rolling: RollingCorrelation, symbols: List[str], filled: pd.DataFrame) -> None:
+        """Write statistics, matrix and state, each atomically (state last)."""
+        stats_path = self.directory / "stats.npz"
+        tmp_path = stats_path.with_name(f".{stats_path.name}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                recent=rolling.recent,
+                last_close=filled.iloc[-1].to_numpy(dtype=np.float64),
+                **dict(zip(STAT_NAMES, rolling.stats)),
+            )
+        os.replace(tmp_path, stats_path)
+
+        matrix_path = self.directory / "correlation.npy"
+        tmp_path = matrix_path.with_name(f".{matrix_path.name}.tmp")
+        matrix = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=(len(symbols),) * 2)
+        matrix[:] = rolling.correlation(self.min_bars)
+        matrix.flush()
+        del matrix
+        os.replace(tmp_path, matrix_path)
+
+        state = {
+            "window": self.window,
+            "symbols": symbols,
+            "last_timestamp": str(filled.index[-1]),
+            "position": rolling.position,
+            "since_refresh": rolling.since_refresh,
+        }
+        state_path = self.directory / "state.json"
+        tmp_path = state_path.with_name(f".{state_path.name}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, state_path)
+
+    def matrix(self) -> Optional[Tuple[List[str], np.ndarray]]:
+        """
+        Memory-map the latest correlation matrix read-only.
+
+        Returns:
+            (symbols, float32 matrix) or None if update() hasn't run
+        """
+        state = self._load_state()
+        if state is None:
+            return None
+        return state["symbols"], np.load(self.directory / "correlation.npy", mmap_mode="r")
+
+    def top_correlated(self, symbol: str, k: int = 10) -> List[Tuple[str, float]]:
+        """
+        The k symbols most correlated with `symbol`, highest first.
+
+        Only the symbol's row is read from the memory map.
+        """
+        loaded = self.matrix()
+        if loaded is None or symbol not in loaded[0]:
+            logger.warning(f"No correlations for {symbol}")
+            return []
+
+        symbols, corr = loaded
+        i = symbols.index(symbol)
+        row = np.array(corr[i], dtype=np.float64)
+        row[i] = np.nan
+        candidates = np.flatnonzero(np.isfinite(row))
+        k = min(k, len(candidates))
+        if k == 0:
+            return []
+        top = candidates[np.argpartition(-row[candidates], k - 1)[:k]]
+        top = top[np.argsort(-row[top])]
+        return [(symbols[j], float(row[j])) for j in top]
+
+
+if __name__ == "__main__":
+    engine = CorrelationEngine()
+    engine.update()
+    for symbol in Config.SYMBOLS:
+        peers = engine.top_correlated(symbol, k=5)
+        print(f"{symbol}: " + (", ".join(f"{s} {c:+.2f}" for s, c in peers) or "no correlations"))
@@ -0,0 +1,337 @@
+"""
+Cross-sectional market features.
+
+Handles:
+- Aligning every universe symbol's closes (plus the market index) into
+  one date × symbol panel
+- Relative strength vs. the index, sector-relative returns, rolling beta
+  and market breadth, computed for all symbols at once with window sums
+  over the panel and one-hot sector reductions (no per-symbol loops)
+- Incremental updates: when new days arrive only the bars from the
+  earliest changed one onwards are recomputed (plus the longest window
+  of context), not the whole history
+- Per-symbol output files ({symbol}_cross.npz) that the feature store
+  serves as registered features ("rel_strength_20", "beta_60", ...)
+
+Every feature is causal, so the stored values are point-in-time correct.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from config import Config
+from log_setup import get_logger
+from features import FeatureStore, canonical_name, resolve
+from universe import load_universe
+
+logger = get_logger(__name__, "data_processor.log")
+
+
+def _window_sums(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Trailing sums over `window` rows of a finite (rows, columns) matrix.
+
+    One cumulative sum per column, so the cost is O(rows × columns)
+    whatever the window. The first window-1 rows are NaN.
+    """
+    sums = np.full(values.shape, np.nan)
+    if len(values) >= window:
+        total = np.cumsum(values, axis=0)
+        sums[window - 1:] = total[window - 1:]
+        sums[window:] -= total[:-window]
+    return sums
+
+
+def _min_bars(window: int) -> int:
+    """Bars a symbol must have traded in a window for a value."""
+    return max(2, int(np.ceil(window * Config.CROSS_SECTION_MIN_COVERAGE)))
+
+
+def relative_strength(returns: np.ndarray, market: np.ndarray, sectors: np.ndarray, window: int) -> np.ndarray:
+    """Sum of log returns over the window minus the market's over the same bars."""
+    valid = np.isfinite(returns) & np.isfinite(market)[:, None]
+    with np.errstate(invalid="ignore"):
+        excess = np.where(valid, np.log1p(returns) - np.log1p(market)[:, None], 0.0)
+    bars = _window_sums(valid.astype(np.float64), window)
+    return np.where(bars >= _min_bars(window), _window_sums(excess, window), np.nan)
+
+
+def rolling_beta(returns: np.ndarray, market: np.ndarray, sectors: np.ndarray, window: int) -> np.ndarray:
+    """
+    Rolling beta = cov(r, m) / var(m) over the window.
+
+    Covariance and variance come from windowed sums of r, m, r·m and m²
+    over the bars where both returns exist.
+    """
+    valid = np.isfinite(returns) & np.isfinite(market)[:, None]
+    r = np.where(valid, returns, 0.0)
+    m = np.where(valid, market[:, None], 0.0)
+
+    n = _window_sums(valid.astype(np.float64), window)
+    sum_r = _window_sums(r, window)
+    sum_m = _window_sums(m, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = _window_sums(r * m, window) - sum_r * sum_m / n
+        var = _window_sums(m * m, window) - sum_m * sum_m / n
+        beta = cov / var
+    return np.where((n >= _min_bars(window)) & (var > 0), beta, np.nan)
+
+
+def sector_relative_return(returns: np.ndarray, market: np.ndarray, sectors: np.ndarray, param: None) -> np.ndarray:
+    """Return minus the mean return of the symbol's sector on the same bar."""
+    valid = np.isfinite(returns)
+    members = np.eye(sectors.max() + 1)[sectors]  # (symbols, sectors) one-hot
+    totals = np.where(valid, returns, 0.0) @ members
+    counts = valid.astype(np.float64) @ members
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = totals / counts
+    return returns - means[:, sectors]
+
+
+def market_breadth(returns: np.ndarray, market: np.ndarray, sectors: np.ndarray, param: None) -> np.ndarray:
+    """Share of symbols with a positive return on the bar (same for every symbol)."""
+    valid = np.isfinite(returns)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        share = (valid & (returns > 0)).sum(axis=1) / valid.sum(axis=1)
+    return np.repeat(share[:, None], returns.shape[1], axis=1)
+
+
+# Panel function per feature family: f(returns, market, sector codes, param)
+PANEL_FEATURES: Dict[str, Callable[[np.ndarray, np.ndarray, np.ndarray, Any], np.ndarray]] = {
+    "rel_strength": relative_strength,
+    "beta": rolling_beta,
+    "sector_rel_return": sector_relative_return,
+    "breadth": market_breadth,
+}
+
+
+def bar_returns(closes: pd.DataFrame) -> pd.DataFrame:
+    """Return since each symbol's previous traded bar (NaN where it didn't trade)."""
+    return closes / closes.ffill().shift(1) - 1
+
+
+def load_closes(symbols: List[str], store: Optional[FeatureStore] = None) -> Dict[str, pd.Series]:
+    """Close series indexed by timestamp for every symbol with processed bars."""
+    store = store or FeatureStore()
+    closes = {}
+    for symbol in symbols:
+        if not Config.get_processed_data_path(symbol).exists():
+            continue
+        df = store.load(symbol, ["close"])
+        if df is not None and len(df):
+            closes[symbol] = pd.Series(df["close"].to_numpy(), index=pd.DatetimeIndex(df["timestamp"]))
+    return closes
+
+
+def _digest(series: pd.Series) -> str:
+    """Fingerprint of a close series (timestamps and values)."""
+    h = hashlib.blake2b(digest_size=12)
+    h.update(series.index.to_numpy(dtype="datetime64[ns]").tobytes())
+    h.update(series.to_numpy(dtype=np.float64).tobytes())
+    return h.hexdigest()
+
+
+def load_symbol_features(symbol: str) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Load a symbol's cross-sectional columns.
+
+    Returns:
+        {"timestamp": datetime64 array, feature name: float64 array, ...}
+        or None if the file doesn't exist
+    """
+    path = Config.get_cross_section_path(symbol)
+    if not path.exists():
+        return None
+    with np.load(path) as stored:
+        return {name: stored[name] for name in stored.files}
+
+
+class CrossSectionalEngine:
+    """
+    Computes cross-sectional features over the whole universe.
+
+    Layout (Config.CROSS_SECTION_DIR):
+    - {symbol}_cross.npz: timestamp plus one column per feature, on the
+      symbol's own bars
+    - state.json: feature list, symbols, sectors and a fingerprint of each
+      input close series as of the last update
+
+    update() compares the fingerprints with the current bars to find the
+    earliest bar whose inputs changed (appended days, or a rewritten
+    history) and recomputes from there.
+    """
+
+    def __init__(
+        self,
+        store: Optional[FeatureStore] = None,
+        features: Optional[List[str]] = None,
+        index_symbol: Optional[str] = Config.MARKET_INDEX_SYMBOL,
+    ):
+        self.store = store or FeatureStore()
+        self.index_symbol = index_symbol
+        self.features = [canonical_name(f) for f in (features or Config.CROSS_SECTIONAL_FEATURES)]
+
+        self.panel_specs = {}
+        for name in self.features:
+            spec, param = resolve(name)
+            if spec is None or spec.name not in PANEL_FEATURES:
+                raise ValueError(f"'{name}' is not a cross-sectional feature (known: {sorted(PANEL_FEATURES)})")
+            if param is not None and not isinstance(param, int):
+                raise ValueError(f"Cross-sectional windows are bar counts, got '{name}'")
+            self.panel_specs[name] = (PANEL_FEATURES[spec.name], param)
+
+        # Rows of history needed before the first recomputed bar
+        self.lookback = max((param or 0) + 1 for _, param in self.panel_specs.values())
+
+    @property
+    def state_path(self) -> Path:
+        return Config.CROSS_SECTION_DIR / "state.json"
+
+    def _load_state(self) -> Optional[Dict[str, Any]]:
+        if not self.state_path.exists():
+            return None
+        try:
+            with open(self.state_path, "r") as f:
+                return json.load(f)
+        except (json.JSONDecodeError, IOError):
+            return None
+
+    def _first_change(
+        self,
+        state: Optional[Dict[str, Any]],
+        layout: Dict[str, Any],
+        closes: Dict[str, pd.Series],
+    ) -> Optional[pd.Timestamp]:
+        """
+        Earliest bar whose inputs changed since the last update.
+
+        Returns:
+            Timestamp to recompute from (Timestamp.min: everything),
+            or None if nothing changed
+        """
+        if state is None or any(state.get(k) != v for k, v in layout.items()):
+            return pd.Timestamp.min
+        if not all(Config.get_cross_section_path(s).exists() for s in layout["symbols"]):
+            return pd.Timestamp.min
+
+        starts = []
+        for symbol, series in closes.items():
+            previous = state["sources"].get(symbol)
+            if previous is not None and previous["digest"] == _digest(series):
+                continue
+            rows = previous["rows"] if previous else 0
+            if previous and rows < len(series) and _digest(series.iloc[:rows]) == previous["digest"]:
+                starts.append(series.index[rows])  # New bars appended
+            else:
+                starts.append(series.index[0])  # History rewritten
+        return min(starts) if starts else None
+
+    def update(self) -> bool:
+        """
+        Bring every symbol's cross-sectional features up to date.
+
+        Returns:
+            True if the features are current, False if there is no data
+        """
+        universe = load_universe()
+        candidates = universe["symbol"].tolist()
+        if self.index_symbol and self.index_symbol not in candidates:
+            candidates.append(self.index_symbol)
+        closes = load_closes(candidates, self.store)
+
+        symbols = [s for s in universe["symbol"] if s in closes and s != self.index_symbol]
+        if not symbols:
+            logger.warning("No processed data for cross-sectional features")
+            return False
+        sector_names = universe.set_index("symbol").loc[symbols, "sector"].fillna("Unknown").astype(str).tolist()
+        index_symbol = self.index_symbol if self.index_symbol in closes else None
+        if self.index_symbol and index_symbol is None:
+            logger.warning(
+                f"No processed bars for market index {self.index_symbol}: relative strength "
+                f"and beta are measured against the equal-weighted universe"
+            )
+
+        layout = {"features": self.features, "symbols": symbols, "sectors": sector_names, "index": index_symbol}
+        start = self._first_change(self._load_state(), layout, closes)
+        if start is None:
+            logger.info("✓ Cross-sectional features up to date")
+            return True
+
+        # Aligned date × symbol panel (union of all bars)
+        panel = pd.DataFrame({s: closes[s] for s in symbols}).sort_index()
+        dates = panel.index
+        start_row = int(dates.searchsorted(start))
+        first_row = max(0, start_row - self.lookback)
+
+        returns = bar_returns(panel).iloc[first_row:].to_numpy(dtype=np.float64)
+        if index_symbol is not None:
+            market = closes[index_symbol].pct_change().reindex(dates)
+            market = market.iloc[first_row:].to_numpy(dtype=np.float64)
+        else:
+            # Equal-weighted universe return stands in for the index
+            valid = np.isfinite(returns)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                market = np.where(valid, returns, 0.0).sum(axis=1) / valid.sum(axis=1)
+        _, sectors = np.unique(sector_names, return_inverse=True)
+
+        computed = {
+            name: func(returns, market, sectors, param)[start_row - first_row:]
+            for name, (func, param) in self.panel_specs.items()
+        }
+
+        new_dates = dates[start_row:].to_numpy(dtype="datetime64[ns]")
+        traded = panel.iloc[start_row:].notna().to_numpy()
+        for j, symbol in enumerate(symbols):
+            self._write_symbol(symbol, start, new_dates[traded[:, j]], {
+                name: values[traded[:, j], j] for name, values in computed.items()
+            })
+
+        state = {**layout, "sources": {s: {"rows": len(c), "digest": _digest(c)} for s, c in closes.items()}}
+        tmp_path = self.state_path.with_name(f".{self.state_path.name}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+        logger.info(
+            f"✓ Cross-sectional features: {len(dates) - start_row} of {len(dates)} bars recomputed "
+            f"for {len(symbols)} symbols (market: {index_symbol or 'equal-weighted universe'})"
+        )
+        return True
+
+    def _write_symbol(
+        self,
+        symbol: str,
+        start: pd.Timestamp,
+        timestamps: np.ndarray,
+        values: Dict[str, np.ndarray],
+    ) -> None:
+        """Replace a symbol's rows from `start` onwards and save the file atomically."""
+        previous = load_symbol_features(symbol) if start > pd.Timestamp.min else None
+        if previous is not None:
+            keep = previous["timestamp"] < np.datetime64(start)
+            timestamps = np.concatenate([previous["timestamp"][keep], timestamps])
+            values = {name: np.concatenate([previous[name][keep], column]) for name, column in values.items()}
+
+        path = Config.get_cross_section_path(symbol)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, timestamp=timestamps, **values)
+        os.replace(tmp_path, path)
+
+
+if __name__ == "__main__":
+    engine = CrossSectionalEngine()
+    engine.update()
+    for symbol in Config.SYMBOLS:
+        stored = load_symbol_features(symbol)
+        if stored is None:
+            print(f"{symbol}: no cross-sectional features")
+            continue
+        latest = {name: round(float(stored[name][-1]), 4) for name in engine.features}
+        print(f"{symbol}: {len(stored['timestamp'])} bars, latest {latest}")
@@ -3,30 +3,23 @@ Data processing and feature engineering module.
 
 Handles:
 - Converting raw API JSON to tabular format (pandas DataFrame)
-- Computing technical indicators (SMA, EMA, RSI)
+- Computing technical indicators (SMA, EMA, RSI) from the feature registry
 - Creating training sequences for time-series models
 - Train/test splitting
 - Normalization and scaling
 """
 
-import logging
 from typing import Tuple, List, Optional
 import numpy as np
 import pandas as pd
 from pathlib import Path
 
 from config import Config
+from log_setup import HotPathLogger, get_logger
+from features import compute_features, uses_symbol
 
-# Configure logging
-logging.basicConfig(
-    level=Config.LOG_LEVEL,
-    format=Config.LOG_FORMAT,
-    handlers=[
-        logging.FileHandler(Config.LOGS_DIR / "data_processor.log"),
-        logging.StreamHandler(),
-    ],
-)
-logger = logging.getLogger(__name__)
+logger = get_logger(__name__, "data_processor.log")
+hot_logger = HotPathLogger(logger)
 
 
 class DataProcessor:
@@ -81,125 +74,129 @@ class DataProcessor:
                 logger.error(f"No data records for {symbol}")
                 return None
             
-            df = pd.DataFrame(records)
+            return self._clean_ohlcv(pd.DataFrame(records), symbol)
             
-            # TODO: Map actual field names to standard columns
-            # Replace these with actual column names from API response
-            column_mapping = {
-                # "timestamp": "timestamp",  # Or "date", "Date", "time", etc.
-                # "open": "open",  # Or "o", "Open", etc.
-                # "high": "high",  # Or "h", "High", etc.
-                # "low": "low",  # Or "l", "Low", etc.
-                # "close": "close",  # Or "c", "Close", etc.
-                # "volume": "volume",  # Or "v", "Volume", etc.
-            }
-            df = df.rename(columns=column_mapping)
-            
-            # Ensure required columns exist
-            required_cols = ["timestamp", "open", "high", "low", "close", "volume"]
-            if not all(col in df.columns for col in required_cols):
-                missing = [c for c in required_cols if c not in df.columns]
-                logger.error(f"Missing required columns for {symbol}: {missing}")
-                return None
-            
-            # Sort by timestamp (oldest first)
-            df = df.sort_values("timestamp").reset_index(drop=True)
-            
-            # Convert types
-            df["open"] = pd.to_numeric(df["open"], errors="coerce")
-            df["high"] = pd.to_numeric(df["high"], errors="coerce")
-            df["low"] = pd.to_numeric(df["low"], errors="coerce")
-            df["close"] = pd.to_numeric(df["close"], errors="coerce")
-            df["volume"] = pd.to_numeric(df["volume"], errors="coerce")
-            
-            # Handle missing values
-            initial_len = len(df)
-            df = df.dropna(subset=["close", "volume"])
+        except Exception as e:
+            logger.error(f"Error processing raw data for {symbol}: {e}")
+            return None
+
+    def process_raw_columns(
+        self,
+        columns: Optional[dict],
+        symbol: str,
+    ) -> Optional[pd.DataFrame]:
+        """
+        Convert raw column arrays (from the streaming archive parser) to a clean DataFrame.
+        
+        Args:
+            columns: Dict of API field name -> NumPy array
+            symbol: Stock symbol (for logging)
             
-            if len(df) < Config.MIN_DATA_POINTS:
-                logger.error(
-                    f"Insufficient data for {symbol}: {len(df)} points < "
-                    f"minimum {Config.MIN_DATA_POINTS}"
-                )
+        Returns:
+            DataFrame with columns: timestamp, open, high, low, close, volume
+        """
+        try:
+            if not columns or not len(next(iter(columns.values()))):
+                logger.error(f"No data records for {symbol}")
                 return None
             
-            dropped = initial_len - len(df)
-            if dropped > 0:
-                logger.warning(f"Dropped {dropped} rows with missing values for {symbol}")
-            
-            logger.info(f"✓ Processed {len(df)} valid data points for {symbol}")
-            return df
+            return self._clean_ohlcv(pd.DataFrame(columns, copy=False), symbol)
             
         except Exception as e:
             logger.error(f"Error processing raw data for {symbol}: {e}")
             return None
 
-    def compute_technical_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _clean_ohlcv(self, df: pd.DataFrame, symbol: str) -> Optional[pd.DataFrame]:
         """
-        Add technical indicator columns to DataFrame.
-        
-        Indicators:
-        - SMA (Simple Moving Average)
-        - EMA (Exponential Moving Average)
-        - RSI (Relative Strength Index)
+        Map field names, check required columns, sort, type and drop missing rows.
         
         Args:
-            df: DataFrame with OHLCV data
+            df: Raw records as a DataFrame
+            symbol: Stock symbol (for logging)
             
         Returns:
-            DataFrame with additional indicator columns
+            Clean OHLCV DataFrame or None if unusable
         """
-        df = df.copy()
-        
-        # Simple Moving Averages
-        for period in Config.MA_PERIODS:
-            df[f"sma_{period}"] = df["close"].rolling(window=period).mean()
-            logger.debug(f"Computed SMA-{period}")
-        
-        # Exponential Moving Averages
-        for period in Config.MA_PERIODS:
-            df[f"ema_{period}"] = df["close"].ewm(span=period, adjust=False).mean()
-            logger.debug(f"Computed EMA-{period}")
-        
-        # Relative Strength Index (14-period standard)
-        df = self._compute_rsi(df, period=14)
-        
-        # Price rate of change
-        df["roc"] = df["close"].pct_change() * 100
+        # TODO: Map actual field names to standard columns
+        # Replace these with actual column names from API response
+        column_mapping = {
+            # "timestamp": "timestamp",  # Or "date", "Date", "time", etc.
+            # "open": "open",  # Or "o", "Open", etc.
+            # "high": "high",  # Or "h", "High", etc.
+            # "low": "low",  # Or "l", "Low", etc.
+            # "close": "close",  # Or "c", "Close", etc.
+            # "volume": "volume",  # Or "v", "Volume", etc.
+        }
+        df = df.rename(columns=column_mapping)
+        
+        # Ensure required columns exist
+        required_cols = ["timestamp", "open", "high", "low", "close", "volume"]
+        if not all(col in df.columns for col in required_cols):
+            missing = [c for c in required_cols if c not in df.columns]
+            logger.error(f"Missing required columns for {symbol}: {missing}")
+            return None
         
-        # Volatility (rolling standard deviation of returns)
-        df["volatility"] = df["close"].pct_change().rolling(window=10).std()
+        # Sort by timestamp (oldest first)
+        df = df.sort_values("timestamp").reset_index(drop=True)
+        
+        # Convert types
+        df["open"] = pd.to_numeric(df["open"], errors="coerce")
+        df["high"] = pd.to_numeric(df["high"], errors="coerce")
+        df["low"] = pd.to_numeric(df["low"], errors="coerce")
+        df["close"] = pd.to_numeric(df["close"], errors="coerce")
+        df["volume"] = pd.to_numeric(df["volume"], errors="coerce")
+        
+        # Handle missing values
+        initial_len = len(df)
+        df = df.dropna(subset=["close", "volume"])
+        
+        if len(df) < Config.MIN_DATA_POINTS:
+            logger.error(
+                f"Insufficient data for {symbol}: {len(df)} points < "
+                f"minimum {Config.MIN_DATA_POINTS}"
+            )
+            return None
         
-        # Daily return
-        df["return"] = df["close"].pct_change()
+        dropped = initial_len - len(df)
+        if dropped > 0:
+            logger.warning(f"Dropped {dropped} rows with missing values for {symbol}")
         
-        indicator_cols = [c for c in df.columns if c not in ['timestamp', 'open', 'high', 'low', 'close', 'volume']]
-        logger.info(f"✓ Computed {len(indicator_cols)} technical indicators")
+        logger.info(f"✓ Processed {len(df)} valid data points for {symbol}")
         return df
 
-    @staticmethod
-    def _compute_rsi(df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
+    def compute_technical_indicators(
+        self,
+        df: pd.DataFrame,
+        features: Optional[List[str]] = None,
+    ) -> pd.DataFrame:
         """
-        Compute Relative Strength Index (RSI).
+        Add technical indicator columns to DataFrame.
+        
+        Indicators come from the feature registry (features.py), e.g.:
+        - SMA (Simple Moving Average)
+        - EMA (Exponential Moving Average)
+        - RSI (Relative Strength Index)
         
-        RSI = 100 - (100 / (1 + RS))
-        where RS = Average Gain / Average Loss
+        Training and serving read features through FeatureStore, which
+        caches them; this computes them in memory for ad-hoc frames.
         
         Args:
-            df: DataFrame with 'close' column
-            period: RSI period (default: 14)
+            df: DataFrame with OHLCV data
+            features: Feature names (default: the Config.FEATURES that only
+                need the frame itself, i.e. no cross-sectional features)
             
         Returns:
-            DataFrame with added 'rsi' column
+            DataFrame with additional indicator columns
         """
-        delta = df["close"].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
+        df = df.copy()
+        features = features or [f for f in Config.FEATURES if not uses_symbol(f)]
+        computed = compute_features(df, features)
+        for column in computed.columns:
+            if column not in df.columns:
+                df[column] = computed[column]
         
-        df[f"rsi_{period}"] = rsi
+        indicator_cols = [c for c in df.columns if c not in ['timestamp', 'open', 'high', 'low', 'close', 'volume']]
+        hot_logger.info("✓ Computed %d technical indicators", len(indicator_cols))
         return df
 
     def create_sequences(
@@ -207,45 +204,49 @@ class DataProcessor:
         df: pd.DataFrame,
         sequence_length: int = Config.SEQUENCE_LENGTH,
         target_col: str = "close",
+        feature_cols: Optional[List[str]] = None,
+        horizon: int = Config.FORECAST_HORIZON,
     ) -> Tuple[np.ndarray, np.ndarray]:
         """
         Create sequences for time-series model.
         
         Each sample: [X, y]
         - X: sequence_length days of features (e.g., last 10 days)
-        - y: target value (e.g., next day's close price)
+        - y: target values for the next `horizon` days (e.g., the next
+          day's close price for horizon=1)
         
         Args:
             df: DataFrame with features and target
             sequence_length: Number of time steps to look back
             target_col: Column to predict
+            feature_cols: Input columns (default: every column except timestamp)
+            horizon: Number of future steps to predict
             
         Returns:
             Tuple of (X, y) numpy arrays
             - X shape: (num_sequences, sequence_length, num_features)
-            - y shape: (num_sequences,)
+            - y shape: (num_sequences, horizon)
         """
-        # Select feature columns (exclude timestamp, target)
-        feature_cols = [c for c in df.columns if c != "timestamp"]
-        X_data = df[feature_cols].values
-        y_data = df[target_col].values
-        
-        sequences_X = []
-        sequences_y = []
-        
-        # Create sequences
-        for i in range(len(df) - sequence_length):
-            X_seq = X_data[i:i + sequence_length]
-            y_seq = y_data[i + sequence_length]
-            
-            sequences_X.append(X_seq)
-            sequences_y.append(y_seq)
-        
-        X = np.array(sequences_X, dtype=np.float32)
-        y = np.array(sequences_y, dtype=np.float32)
-        
-        logger.info(f"✓ Created {len(sequences_X)} sequences (length={sequence_length})")
-        logger.info(f"  X shape: {X.shape}, y shape: {y.shape}")
+        # Select feature columns (exclude timestamp)
+        feature_cols = feature_cols or [c for c in df.columns if c != "timestamp"]
+        X_data = df[feature_cols].to_numpy(dtype=np.float32)
+        y_data = df[target_col].to_numpy(dtype=np.float32)
+        
+        # Windows are built in one vectorized copy instead of a Python loop;
+        # only windows with all `horizon` targets available are kept
+        num_sequences = max(0, len(df) - sequence_length - horizon + 1)
+        if num_sequences > 0:
+            windows = np.lib.stride_tricks.sliding_window_view(X_data, sequence_length, axis=0)
+            X = np.ascontiguousarray(windows[:num_sequences].transpose(0, 2, 1))
+            y = np.lib.stride_tricks.sliding_window_view(y_data[sequence_length:], horizon)[:num_sequences].copy()
+        else:
+            X = np.empty((0, sequence_length, len(feature_cols)), dtype=np.float32)
+            y = np.empty((0, horizon), dtype=np.float32)
+        
+        hot_logger.info(
+            "✓ Created %d sequences (length=%d), X shape: %s, y shape: %s",
+            num_sequences, sequence_length, X.shape, y.shape,
+        )
         
         return X, y
 
@@ -273,12 +274,15 @@ class DataProcessor:
             self.scaler_std = X_reshaped.std(axis=0)
             # Avoid division by zero
             self.scaler_std[self.scaler_std == 0] = 1.0
-            logger.info("✓ Fitted normalization parameters")
+            hot_logger.info("✓ Fitted normalization parameters")
         
         X_normalized = (X_reshaped - self.scaler_mean) / self.scaler_std
         X_normalized = X_normalized.reshape(original_shape)
         
-        logger.info(f"✓ Normalized data (mean={self.scaler_mean.mean():.4f}, std={self.scaler_std.mean():.4f})")
+        hot_logger.info(
+            "✓ Normalized data (mean=%.4f, std=%.4f)",
+            self.scaler_mean.mean(), self.scaler_std.mean(),
+        )
         return X_normalized
 
     def split_dataset(
@@ -326,6 +330,110 @@ class DataProcessor:
         
         return X_train, X_val, X_test, y_train, y_val, y_test
 
+    def prepare_training_splits(
+        self,
+        df: pd.DataFrame,
+        sequence_length: int = Config.SEQUENCE_LENGTH,
+        target_col: str = "close",
+        horizon: int = Config.FORECAST_HORIZON,
+    ) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Build normalized train/val/test splits from a processed DataFrame.
+        
+        Drops the indicator warm-up rows (NaN), creates sequences,
+        fits normalization and splits chronologically.
+        
+        Args:
+            df: Processed DataFrame with indicators
+            sequence_length: Number of time steps to look back
+            target_col: Column to predict
+            horizon: Number of future steps to predict
+            
+        Returns:
+            (X_train, X_val, X_test, y_train, y_val, y_test) or None if
+            fewer than Config.MIN_TRAINING_SEQUENCES sequences are available
+        """
+        df = df.dropna().reset_index(drop=True)
+        X, y = self.create_sequences(
+            df,
+            sequence_length=sequence_length,
+            target_col=target_col,
+            horizon=horizon,
+        )
+        
+        if len(X) < Config.MIN_TRAINING_SEQUENCES:
+            logger.error(
+                f"Insufficient sequences ({len(X)} < {Config.MIN_TRAINING_SEQUENCES})"
+            )
+            return None
+        
+        X = self.normalize_data(X, fit=True)
+        
+        return self.split_dataset(
+            X, y,
+            test_size=Config.TEST_SPLIT,
+            validation_size=Config.VALIDATION_SPLIT,
+        )
+
+    def prepare_finetune_data(
+        self,
+        df: pd.DataFrame,
+        sequence_length: int = Config.SEQUENCE_LENGTH,
+        trained_through: Optional[str] = None,
+        target_col: str = "close",
+        feature_cols: Optional[List[str]] = None,
+        horizon: int = Config.FORECAST_HORIZON,
+    ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Build a fine-tuning set: the most recent window plus replayed older samples.
+        
+        Uses the stored normalization parameters (scaler_mean/scaler_std
+        must be set from the model's metadata), so the fine-tuned model
+        sees inputs on the same scale it was trained on.
+        
+        Args:
+            df: Processed DataFrame with indicators
+            sequence_length: Window length the model was trained with
+            trained_through: Last timestamp the model has already seen
+            target_col: Column to predict
+            feature_cols: Input columns the model was trained on
+            horizon: Number of future steps the model predicts
+            
+        Returns:
+            (X, y) arrays or None if there are no bars after trained_through
+        """
+        df = df.dropna().reset_index(drop=True)
+        
+        if trained_through is not None:
+            timestamps = pd.to_datetime(df["timestamp"])
+            new_bars = int((timestamps > pd.to_datetime(trained_through)).sum())
+            if new_bars == 0:
+                logger.info(f"No new data since {trained_through}")
+                return None
+            logger.info(f"{new_bars} new bars since {trained_through}")
+        
+        X, y = self.create_sequences(
+            df,
+            sequence_length=sequence_length,
+            target_col=target_col,
+            feature_cols=feature_cols,
+            horizon=horizon,
+        )
+        if len(X) == 0:
+            return None
+        
+        X = self.normalize_data(X, fit=False)
+        
+        # Recent sliding window plus a random replay of older sequences
+        window = min(Config.FINETUNE_WINDOW, len(X))
+        older = len(X) - window
+        rng = np.random.default_rng(Config.FINETUNE_SEED)
+        replay_idx = rng.choice(older, size=min(Config.FINETUNE_REPLAY_SIZE, older), replace=False)
+        idx = np.concatenate([np.sort(replay_idx), np.arange(older, len(X))])
+        
+        logger.info(f"✓ Fine-tuning set: {window} recent + {len(replay_idx)} replayed sequences")
+        return X[idx], y[idx]
+
     def save_processed_data(self, df: pd.DataFrame, symbol: str) -> None:
         """
         Save processed DataFrame to CSV.
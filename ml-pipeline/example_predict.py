@@ -11,16 +11,14 @@ This script demonstrates how to:
 import numpy as np
 import pandas as pd
 from pathlib import Path
-import logging
 
 from config import Config
+from log_setup import get_logger
 from data_processor import DataProcessor
 from model import StockPricePredictor
 from predict import StockPredictor
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+logger = get_logger(__name__, "prediction.log")
 
 
 def example_1_predict_single_symbol():
@@ -38,7 +36,9 @@ def example_1_predict_single_symbol():
         print(f"  Predicted price: ₹{result['predicted_price']:.2f}")
         print(f"  Expected change: ₹{result['price_change']:+.2f} ({result['percent_change']:+.2f}%)")
         print(f"  Direction: {result['direction']}")
-        print(f"  Confidence: {result['confidence']:.1f}%")
+        print(f"  {result['interval_coverage']:.0%} interval: ₹{result['lower_bound']:.2f} – ₹{result['upper_bound']:.2f} "
+              f"({result['interval_method']})")
+        print(f"  Downside to lower bound: {result['downside_percent']:+.2f}%")
     else:
         print("Prediction failed - ensure models are trained first")
 
@@ -85,32 +85,29 @@ def example_3_compare_with_current_prices():
     print("-"*80)
 
 
-def example_4_confidence_analysis():
-    """Example 4: Analyze prediction confidence."""
+def example_4_interval_analysis():
+    """Example 4: Analyze prediction intervals."""
     logger.info("\n" + "="*60)
-    logger.info("EXAMPLE 4: Analyze prediction confidence")
+    logger.info("EXAMPLE 4: Analyze prediction intervals")
     logger.info("="*60)
     
     predictor = StockPredictor()
     predictions = predictor.predict_all_symbols()
     
     if predictions:
-        confidences = [p['confidence'] for p in predictions]
+        widths = [p['interval_width_percent'] for p in predictions]
         
-        print(f"\nConfidence Analysis:")
-        print(f"  Average: {np.mean(confidences):.1f}%")
-        print(f"  Min: {np.min(confidences):.1f}%")
-        print(f"  Max: {np.max(confidences):.1f}%")
-        print(f"  Std Dev: {np.std(confidences):.1f}%")
+        print(f"\n{Config.PREDICTION_INTERVAL:.0%} Interval Width (% of price):")
+        print(f"  Average: {np.mean(widths):.2f}%")
+        print(f"  Min: {np.min(widths):.2f}%")
+        print(f"  Max: {np.max(widths):.2f}%")
         
-        high_conf = len([c for c in confidences if c >= 80])
-        med_conf = len([c for c in confidences if 60 <= c < 80])
-        low_conf = len([c for c in confidences if c < 60])
-        
-        print(f"\nConfidence Distribution:")
-        print(f"  High (≥80%): {high_conf} symbols")
-        print(f"  Medium (60-80%): {med_conf} symbols")
-        print(f"  Low (<60%): {low_conf} symbols")
+        # Moves that clear the interval are the ones worth sizing up
+        clear = [p for p in predictions if p['lower_bound'] > p['current_price'] or p['upper_bound'] < p['current_price']]
+        print(f"\nInterval excludes the current price: {len(clear)} symbols")
+        for p in clear:
+            print(f"  {p['symbol']}: {p['direction']} ({p['percent_change']:+.2f}%, "
+                  f"interval ₹{p['lower_bound']:.2f} – ₹{p['upper_bound']:.2f})")
     else:
         print("No predictions available")
 
@@ -155,7 +152,7 @@ if __name__ == "__main__":
     example_1_predict_single_symbol()
     example_2_predict_all_symbols()
     example_3_compare_with_current_prices()
-    example_4_confidence_analysis()
+    example_4_interval_analysis()
     example_5_direction_summary()
     
     print("\n" + "="*60)
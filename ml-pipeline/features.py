@@ -0,0 +1,471 @@
+"""
+Feature registry and point-in-time feature store.
+
+Handles:
+- A registry of named feature definitions with their dependencies
+  (e.g. "volatility" depends on "return", which depends on "close")
+- Parameterized features addressed by name: "sma_20", "ema_30min", "rsi_14"
+- Lazy computation: only the requested features and their dependencies
+  are computed
+- Caching each computed feature per (symbol, feature, params) as its own
+  column file, invalidated when the symbol's bars change
+- Cross-sectional features (relative strength, beta, ...) served from the
+  per-symbol files cross_section.py writes
+
+The processed CSV holds the base bars (timestamp + OHLCV). Every other
+column is derived here on demand, so adding a feature means registering a
+function instead of recomputing and rewriting every CSV.
+
+Feature functions must be causal (row i may only use rows <= i). That
+makes every cached column point-in-time correct: FeatureStore.load(...,
+as_of=t) returns exactly what would have been computed on data up to t.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from bars import Window, window_to_bars
+from config import Config
+from log_setup import get_logger
+
+logger = get_logger(__name__, "data_processor.log")
+
+BASE_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+
+class FeatureSpec(NamedTuple):
+    """
+    A registered feature family.
+
+    Attributes:
+        name: Family name; also the column name prefix ("sma" → "sma_20")
+        func: Callable(data, param) returning values aligned with data rows.
+            data holds "timestamp" and the dependency columns.
+        deps: Feature names the function reads
+        default: Parameter used when the name has no suffix (None: suffix required
+            for parameterized features, or the feature takes no parameter)
+        version: Bump when the definition changes to invalidate cached values
+        source: Callable(symbol) fingerprinting inputs outside the symbol's own
+            bars (e.g. the cross-sectional file); features with a source need
+            a symbol and can only be computed through FeatureStore
+    """
+
+    name: str
+    func: Callable[[pd.DataFrame, Any], Any]
+    deps: Tuple[str, ...]
+    default: Any
+    version: int
+    source: Optional[Callable[[str], Optional[str]]] = None
+
+
+FEATURES: Dict[str, FeatureSpec] = {}
+
+
+def register_feature(
+    name: str,
+    deps: Tuple[str, ...] = ("close",),
+    default: Any = None,
+    version: int = 1,
+    source: Optional[Callable[[str], Optional[str]]] = None,
+) -> Callable:
+    """
+    Decorator registering a feature function.
+
+    Example:
+        @register_feature("range", deps=("high", "low"))
+        def _range(data, param):
+            return data["high"] - data["low"]
+    """
+    def decorator(func: Callable) -> Callable:
+        FEATURES[name] = FeatureSpec(name, func, tuple(deps), default, version, source)
+        return func
+    return decorator
+
+
+def _parse_param(text: str) -> Window:
+    """Window parameter from a name suffix: "20" → 20, "30min" → "30min"."""
+    return int(text) if text.isdigit() else text
+
+
+def resolve(name: str) -> Tuple[Optional[FeatureSpec], Any]:
+    """
+    Look up the spec and parameter behind a feature name.
+
+    Returns:
+        (spec, param); spec is None for base columns
+
+    Raises:
+        ValueError: If the name matches no base column or registered feature
+    """
+    if name in BASE_COLUMNS:
+        return None, None
+    if name in FEATURES:
+        return FEATURES[name], FEATURES[name].default
+
+    family, _, suffix = name.rpartition("_")
+    if family in FEATURES and suffix:
+        return FEATURES[family], _parse_param(suffix)
+    raise ValueError(f"Unknown feature '{name}' (registered: {sorted(FEATURES)})")
+
+
+def canonical_name(name: str) -> str:
+    """Feature name with its default parameter spelled out ("beta" → "beta_60")."""
+    spec, param = resolve(name)
+    if spec is None or param is None:
+        return name
+    return f"{spec.name}_{param}"
+
+
+def uses_symbol(name: str) -> bool:
+    """Whether a feature reads inputs beyond the symbol's own bars."""
+    spec, _ = resolve(name)
+    return spec is not None and spec.source is not None
+
+
+def feature_key(name: str, symbol: Optional[str] = None) -> str:
+    """
+    Short hash of a feature's definition (name, parameter and version).
+
+    For features with a source, the symbol's source fingerprint is
+    included, so the key changes when those inputs change.
+    """
+    spec, param = resolve(name)
+    definition = [name, None, None] if spec is None else [name, str(param), spec.version]
+    if spec is not None and spec.source is not None and symbol is not None:
+        definition.append(spec.source(symbol))
+    return hashlib.blake2b(json.dumps(definition).encode("utf-8"), digest_size=6).hexdigest()
+
+
+def _rolling(series: pd.Series, timestamps: pd.Series, window: Window, stat: str) -> pd.Series:
+    """
+    Rolling statistic over a bar count or a wall-clock span.
+
+    Integer windows count bars; string windows ("30min", "2h") cover
+    that much time, so gaps (overnight, weekends) shrink the window.
+
+    Args:
+        series: Values to roll over
+        timestamps: Bar timestamps aligned with series
+        window: Bar count or time span
+        stat: Rolling method name ("mean", "std")
+
+    Returns:
+        Series aligned with the input index
+    """
+    if isinstance(window, (int, np.integer)):
+        return getattr(series.rolling(window=int(window)), stat)()
+
+    timed = pd.Series(series.to_numpy(), index=pd.DatetimeIndex(pd.to_datetime(timestamps)))
+    rolled = getattr(timed.rolling(window, min_periods=window_to_bars(window)), stat)()
+    return pd.Series(rolled.to_numpy(), index=series.index)
+
+
+# ============ BUILT-IN FEATURES ============
+
+@register_feature("sma")
+def _sma(data: pd.DataFrame, period: Window) -> pd.Series:
+    """Simple moving average of close."""
+    return _rolling(data["close"], data["timestamp"], period, "mean")
+
+
+@register_feature("ema")
+def _ema(data: pd.DataFrame, period: Window) -> pd.Series:
+    """Exponential moving average of close (time spans converted to bar counts)."""
+    return data["close"].ewm(span=window_to_bars(period), adjust=False).mean()
+
+
+@register_feature("rsi", default=Config.RSI_PERIOD)
+def _rsi(data: pd.DataFrame, period: int) -> pd.Series:
+    """
+    Relative Strength Index.
+
+    RSI = 100 - (100 / (1 + RS))
+    where RS = Average Gain / Average Loss
+    """
+    delta = data["close"].diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+    rs = gain / loss
+    return 100 - (100 / (1 + rs))
+
+
+@register_feature("return")
+def _return(data: pd.DataFrame, param: None) -> pd.Series:
+    """Bar-over-bar return of close."""
+    return data["close"].pct_change()
+
+
+@register_feature("roc", deps=("return",))
+def _roc(data: pd.DataFrame, param: None) -> pd.Series:
+    """Price rate of change in percent."""
+    return data["return"] * 100
+
+
+@register_feature("volatility", deps=("return",), default=Config.VOLATILITY_WINDOW)
+def _volatility(data: pd.DataFrame, window: Window) -> pd.Series:
+    """Rolling standard deviation of returns."""
+    return _rolling(data["return"], data["timestamp"], window, "std")
+
+
+# ============ CROSS-SECTIONAL FEATURES ============
+# Computed over the whole universe by cross_section.py; these read the
+# symbol's column from its output file.
+
+def _cross_section_stamp(symbol: str) -> Optional[str]:
+    """Fingerprint of a symbol's cross-sectional file, or None if it doesn't exist."""
+    path = Config.get_cross_section_path(symbol)
+    if not path.exists():
+        return None
+    stat = path.stat()
+    return f"{stat.st_size:x}-{stat.st_mtime_ns:x}"
+
+
+def _cross_sectional(data: pd.DataFrame, name: str) -> np.ndarray:
+    """Align a symbol's cross-sectional column with data["timestamp"]."""
+    from cross_section import load_symbol_features
+
+    symbol = data.attrs.get("symbol")
+    if symbol is None:
+        raise ValueError(f"'{name}' is cross-sectional; load it through FeatureStore")
+    stored = load_symbol_features(symbol)
+    if stored is None:
+        raise ValueError(f"No cross-sectional features for {symbol} (run: python cross_section.py)")
+    if name not in stored:
+        raise ValueError(f"'{name}' is not in Config.CROSS_SECTIONAL_FEATURES")
+
+    timestamps = pd.to_datetime(data["timestamp"]).to_numpy(dtype="datetime64[ns]")
+    position = np.minimum(np.searchsorted(stored["timestamp"], timestamps), len(stored["timestamp"]) - 1)
+    found = stored["timestamp"][position] == timestamps
+    return np.where(found, stored[name][position], np.nan)
+
+
+@register_feature("rel_strength", deps=(), default=Config.RELATIVE_STRENGTH_WINDOW, source=_cross_section_stamp)
+def _rel_strength(data: pd.DataFrame, window: int) -> np.ndarray:
+    """Log return over the window minus the market index's."""
+    return _cross_sectional(data, f"rel_strength_{window}")
+
+
+@register_feature("beta", deps=(), default=Config.BETA_WINDOW, source=_cross_section_stamp)
+def _beta(data: pd.DataFrame, window: int) -> np.ndarray:
+    """Rolling beta of returns against the market index."""
+    return _cross_sectional(data, f"beta_{window}")
+
+
+@register_feature("sector_rel_return", deps=(), source=_cross_section_stamp)
+def _sector_rel_return(data: pd.DataFrame, param: None) -> np.ndarray:
+    """Return minus the mean return of the symbol's sector on the same bar."""
+    return _cross_sectional(data, "sector_rel_return")
+
+
+@register_feature("breadth", deps=(), source=_cross_section_stamp)
+def _breadth(data: pd.DataFrame, param: None) -> np.ndarray:
+    """Share of universe symbols that closed up on the bar."""
+    return _cross_sectional(data, "breadth")
+
+
+def _materialize(
+    name: str,
+    columns: Dict[str, np.ndarray],
+    load: Optional[Callable[[str], Optional[np.ndarray]]] = None,
+    save: Optional[Callable[[str, np.ndarray], None]] = None,
+    visiting: Optional[set] = None,
+    symbol: Optional[str] = None,
+) -> np.ndarray:
+    """
+    Compute a feature (and its dependencies) into `columns`, reusing cached values.
+
+    Args:
+        name: Feature name
+        columns: Known columns (must include "timestamp" and the base columns);
+            computed features are added
+        load: Returns a cached column or None
+        save: Stores a freshly computed column
+        visiting: Names on the current dependency path (cycle detection)
+        symbol: Symbol the columns belong to (passed to functions as data.attrs["symbol"])
+    """
+    if name in columns:
+        return columns[name]
+
+    spec, param = resolve(name)
+    if spec is None:
+        raise ValueError(f"Base column '{name}' is missing")
+
+    cached = load(name) if load else None
+    if cached is not None:
+        columns[name] = cached
+        return cached
+
+    visiting = visiting or set()
+    if name in visiting:
+        raise ValueError(f"Feature dependency cycle at '{name}'")
+    visiting.add(name)
+    for dep in spec.deps:
+        _materialize(dep, columns, load, save, visiting, symbol)
+    visiting.discard(name)
+
+    data = pd.DataFrame({"timestamp": columns["timestamp"], **{d: columns[d] for d in spec.deps}})
+    data.attrs["symbol"] = symbol
+    values = np.asarray(spec.func(data, param), dtype=np.float64)
+    columns[name] = values
+    if save:
+        save(name, values)
+    logger.debug("Computed feature %s", name)
+    return values
+
+
+def compute_features(df: pd.DataFrame, features: List[str]) -> pd.DataFrame:
+    """
+    Compute features for an in-memory OHLCV DataFrame (no caching).
+
+    Args:
+        df: DataFrame with timestamp and OHLCV columns
+        features: Feature names
+
+    Returns:
+        DataFrame with the requested columns, aligned with df's index
+    """
+    columns = {"timestamp": df["timestamp"].to_numpy()}
+    columns.update({c: df[c].to_numpy(dtype=np.float64) for c in BASE_COLUMNS if c in df.columns})
+    for name in features:
+        _materialize(name, columns)
+    return pd.DataFrame({name: columns[name] for name in features}, index=df.index)
+
+
+class FeatureStore:
+    """
+    Lazily computed, cached feature columns per symbol.
+
+    Layout (Config.FEATURE_STORE_DIR):
+    - {symbol}/{source}/timestamp.npy, open.npy, ...: base bars from the processed CSV
+    - {symbol}/{source}/{feature}.{key}.npy: one float64 column per computed feature
+
+    {source} fingerprints the processed CSV (size and mtime), so new bars
+    invalidate every cached column of that symbol; {key} fingerprints the
+    feature definition, so changing a parameter or version never serves
+    stale values.
+    """
+
+    def __init__(self, store_dir: Path = Config.FEATURE_STORE_DIR):
+        self.store_dir = Path(store_dir)
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def _source_stamp(symbol: str) -> Optional[str]:
+        """Fingerprint of the processed CSV, or None if it doesn't exist."""
+        source = Config.get_processed_data_path(symbol)
+        if not source.exists():
+            return None
+        stat = source.stat()
+        return f"{stat.st_size:x}-{stat.st_mtime_ns:x}"
+
+    def _snapshot_dir(self, symbol: str) -> Optional[Path]:
+        """
+        Directory holding the columns for the current processed CSV.
+
+        Imports the base bars on first use and removes snapshots of older
+        versions of the file.
+        """
+        stamp = self._source_stamp(symbol)
+        if stamp is None:
+            logger.warning(f"No processed data file found for {symbol}")
+            return None
+
+        snapshot = self.store_dir / symbol / stamp
+        if (snapshot / "timestamp.npy").exists():
+            return snapshot
+
+        df = pd.read_csv(
+            Config.get_processed_data_path(symbol),
+            usecols=lambda c: c == "timestamp" or c in BASE_COLUMNS,
+        )
+        missing = [c for c in BASE_COLUMNS if c not in df.columns]
+        if missing:
+            raise ValueError(f"Processed data for {symbol} lacks base columns {missing}")
+
+        snapshot.mkdir(parents=True, exist_ok=True)
+        for column in BASE_COLUMNS:
+            self._write(snapshot / f"{column}.npy", df[column].to_numpy(dtype=np.float64))
+        # Timestamp last: its presence marks a complete snapshot
+        timestamps = pd.to_datetime(df["timestamp"]).to_numpy(dtype="datetime64[ns]")
+        self._write(snapshot / "timestamp.npy", timestamps)
+
+        for old in (self.store_dir / symbol).iterdir():
+            if old != snapshot:
+                shutil.rmtree(old, ignore_errors=True)
+
+        logger.info(f"✓ Imported {len(df)} bars for {symbol} into the feature store")
+        return snapshot
+
+    @staticmethod
+    def _write(path: Path, values: np.ndarray) -> None:
+        """Save an array atomically (readers never see a partial file)."""
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.save(f, values)
+        os.replace(tmp_path, path)
+
+    def load(
+        self,
+        symbol: str,
+        features: Optional[List[str]] = None,
+        as_of: Optional[Any] = None,
+    ) -> Optional[pd.DataFrame]:
+        """
+        Get a symbol's features, computing and caching the missing ones.
+
+        Args:
+            symbol: Stock symbol
+            features: Feature names (default: Config.FEATURES)
+            as_of: Only return bars with timestamp <= as_of
+
+        Returns:
+            DataFrame with timestamp plus the requested columns (in order),
+            or None if the symbol has no processed data
+        """
+        features = list(features or Config.FEATURES)
+        snapshot = self._snapshot_dir(symbol)
+        if snapshot is None:
+            return None
+
+        def column_path(name: str) -> Path:
+            return snapshot / f"{name}.{feature_key(name, symbol)}.npy"
+
+        def load_column(name: str) -> Optional[np.ndarray]:
+            path = column_path(name)
+            return np.load(path, mmap_mode="r") if path.exists() else None
+
+        def save_column(name: str, values: np.ndarray) -> None:
+            self._write(column_path(name), values)
+
+        columns = {
+            c: np.load(snapshot / f"{c}.npy", mmap_mode="r")
+            for c in ["timestamp"] + BASE_COLUMNS
+        }
+        for name in features:
+            _materialize(name, columns, load_column, save_column, symbol=symbol)
+
+        rows = len(columns["timestamp"])
+        if as_of is not None:
+            rows = int(np.searchsorted(columns["timestamp"], np.datetime64(pd.Timestamp(as_of)), side="right"))
+
+        return pd.DataFrame({
+            "timestamp": columns["timestamp"][:rows],
+            **{name: columns[name][:rows] for name in features},
+        })
+
+    def invalidate(self, symbol: str) -> None:
+        """Drop every cached column of a symbol."""
+        shutil.rmtree(self.store_dir / symbol, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    for name, spec in sorted(FEATURES.items()):
+        print(f"{name}: deps={list(spec.deps)}, default={spec.default}, version={spec.version}")
+    print(f"Default feature set: {Config.FEATURES}")
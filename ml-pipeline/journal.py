@@ -0,0 +1,254 @@
+"""
+Durable run journal for resumable pipeline runs.
+
+Handles:
+- Recording every pipeline run and the symbols/stages it covers
+- Recording per-symbol stage completion (or failure) with artifact paths
+- Finding what is left of an interrupted run so --resume can skip it
+- Progress reporting (per-stage counts, failures, ETA) from the journal
+"""
+
+import json
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from config import Config
+from log_setup import get_logger
+
+logger = get_logger(__name__, "pipeline.log")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    status TEXT NOT NULL,
+    symbols TEXT NOT NULL,
+    stages TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS stage_events (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    symbol TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    status TEXT NOT NULL,
+    seconds REAL,
+    error TEXT,
+    artifacts TEXT,
+    finished_at TEXT NOT NULL,
+    PRIMARY KEY (run_id, symbol, stage)
+);
+"""
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat()
+
+
+class RunJournal:
+    """
+    SQLite journal of pipeline runs.
+
+    Each stage result is committed as soon as it is known, so a crash or
+    Ctrl+C loses at most the stages that were in flight. Only the
+    scheduler's coordinating thread writes to the journal.
+
+    Run status: "running" → "completed" | "failed" | "interrupted".
+    A run that never reached a final status (killed process) stays
+    "running" and is resumable like an interrupted one.
+    """
+
+    def __init__(self, path: Path = Config.JOURNAL_PATH):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.conn.close()
+
+    def start_run(self, symbols: List[str], stages: List[str]) -> int:
+        """
+        Register a new run.
+
+        Args:
+            symbols: Symbols the run covers
+            stages: Ordered stage names
+
+        Returns:
+            New run id
+        """
+        cursor = self.conn.execute(
+            "INSERT INTO runs (started_at, status, symbols, stages) VALUES (?, 'running', ?, ?)",
+            (_now(), json.dumps(symbols), json.dumps(stages)),
+        )
+        self.conn.commit()
+        logger.info(f"Started run {cursor.lastrowid} ({len(symbols)} symbols)")
+        return cursor.lastrowid
+
+    def resume_run(self, run_id: int) -> None:
+        """Mark an unfinished run as running again."""
+        self.conn.execute(
+            "UPDATE runs SET status = 'running', finished_at = NULL WHERE run_id = ?", (run_id,)
+        )
+        self.conn.commit()
+
+    def finish_run(self, run_id: int, status: str) -> None:
+        """Record the final status of a run."""
+        self.conn.execute(
+            "UPDATE runs SET status = ?, finished_at = ? WHERE run_id = ?",
+            (status, _now(), run_id),
+        )
+        self.conn.commit()
+
+    def get_run(self, run_id: int) -> Optional[Dict[str, Any]]:
+        """Get a run record as a dict."""
+        row = self.conn.execute(
+            "SELECT run_id, started_at, finished_at, status, symbols, stages FROM runs WHERE run_id = ?",
+            (run_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            "run_id": row[0],
+            "started_at": row[1],
+            "finished_at": row[2],
+            "status": row[3],
+            "symbols": json.loads(row[4]),
+            "stages": json.loads(row[5]),
+        }
+
+    def latest_run(self, unfinished_only: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Get the most recent run.
+
+        Args:
+            unfinished_only: Only consider runs that did not complete
+
+        Returns:
+            Run dict or None
+        """
+        query = "SELECT run_id FROM runs"
+        if unfinished_only:
+            query += " WHERE status != 'completed'"
+        row = self.conn.execute(query + " ORDER BY run_id DESC LIMIT 1").fetchone()
+        return self.get_run(row[0]) if row else None
+
+    def record_stage(
+        self,
+        run_id: int,
+        symbol: str,
+        stage: str,
+        ok: bool,
+        seconds: float = 0.0,
+        error: Optional[str] = None,
+        artifacts: Optional[List[str]] = None,
+    ) -> None:
+        """
+        Record the outcome of one stage for one symbol (committed immediately).
+
+        A later attempt of the same stage in the same run replaces the
+        earlier record.
+        """
+        self.conn.execute(
+            "INSERT OR REPLACE INTO stage_events "
+            "(run_id, symbol, stage, status, seconds, error, artifacts, finished_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                run_id, symbol, stage,
+                "done" if ok else "failed",
+                seconds, error,
+                json.dumps(artifacts or []),
+                _now(),
+            ),
+        )
+        self.conn.commit()
+
+    def completed_stages(self, run_id: int) -> Dict[str, Set[str]]:
+        """Get the stages each symbol has completed in a run."""
+        completed: Dict[str, Set[str]] = {}
+        rows = self.conn.execute(
+            "SELECT symbol, stage FROM stage_events WHERE run_id = ? AND status = 'done'",
+            (run_id,),
+        )
+        for symbol, stage in rows:
+            completed.setdefault(symbol, set()).add(stage)
+        return completed
+
+    def artifacts(self, run_id: int, symbol: str) -> Dict[str, List[str]]:
+        """Get the artifact paths recorded for a symbol, keyed by stage."""
+        rows = self.conn.execute(
+            "SELECT stage, artifacts FROM stage_events WHERE run_id = ? AND symbol = ? AND status = 'done'",
+            (run_id, symbol),
+        )
+        return {stage: json.loads(paths) for stage, paths in rows}
+
+    def progress(self, run_id: int) -> Dict[str, Any]:
+        """
+        Summarize a run's progress.
+
+        Returns:
+            Dict with total symbols, per-stage done/failed counts, the
+            number of fully finished symbols, and an ETA in seconds
+            (from the average time per finished symbol) or None
+        """
+        run = self.get_run(run_id)
+        if run is None:
+            return {}
+
+        counts = {stage: {"done": 0, "failed": 0} for stage in run["stages"]}
+        rows = self.conn.execute(
+            "SELECT stage, status, COUNT(*) FROM stage_events WHERE run_id = ? GROUP BY stage, status",
+            (run_id,),
+        )
+        for stage, status, count in rows:
+            counts.setdefault(stage, {"done": 0, "failed": 0})[status] = count
+
+        total = len(run["symbols"])
+        finished = counts[run["stages"][-1]]["done"] if run["stages"] else 0
+
+        eta = None
+        last = self.conn.execute(
+            "SELECT MAX(finished_at) FROM stage_events WHERE run_id = ?", (run_id,)
+        ).fetchone()[0]
+        if finished and last and finished < total:
+            elapsed = (datetime.fromisoformat(last) - datetime.fromisoformat(run["started_at"])).total_seconds()
+            eta = elapsed / finished * (total - finished)
+
+        return {
+            "run_id": run_id,
+            "status": run["status"],
+            "total": total,
+            "finished": finished,
+            "stages": counts,
+            "eta_seconds": eta,
+        }
+
+    def format_progress(self, run_id: int) -> str:
+        """One-line progress summary for logs."""
+        progress = self.progress(run_id)
+        if not progress:
+            return f"Run {run_id}: not found"
+
+        total = progress["total"] or 1
+        parts = [
+            f"{stage} {c['done']}/{progress['total']}" + (f" ({c['failed']} failed)" if c["failed"] else "")
+            for stage, c in progress["stages"].items()
+        ]
+        line = (
+            f"Run {run_id} [{progress['status']}]: {progress['finished'] / total:.0%} done - "
+            + ", ".join(parts)
+        )
+        if progress["eta_seconds"] is not None:
+            line += f" - ETA {progress['eta_seconds'] / 60:.1f} min"
+        return line
+
+
+if __name__ == "__main__":
+    journal = RunJournal()
+    run = journal.latest_run()
+    print(journal.format_progress(run["run_id"]) if run else "No runs recorded")
@@ -0,0 +1,373 @@
+"""
+Live quote streaming and rolling-window predictions.
+
+Handles:
+- Polling IndianAPI quotes for the universe on an interval (or accepting
+  ticks pushed from any other feed via on_quote)
+- Aggregating ticks into the current bar (open/high/low/close/volume)
+- Keeping fixed-size NumPy ring buffers of the last SEQUENCE_LENGTH
+  feature rows and the last LIVE_HISTORY_BARS bars per symbol, seeded
+  once from the feature store
+- Computing the in-progress bar's feature row with the feature registry
+  (the same functions the feature store uses) and emitting a prediction
+  after every quote, without touching disk
+"""
+
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from bars import bar_start
+from config import Config
+from log_setup import HotPathLogger, get_logger
+from backends import ModelBackend, load_backend
+from features import BASE_COLUMNS, FeatureStore, compute_features, uses_symbol
+
+logger = get_logger(__name__, "prediction.log")
+hot_logger = HotPathLogger(logger)
+
+
+class RingBuffer:
+    """
+    Fixed-capacity buffer of rows (float32 unless another dtype is given).
+
+    Every row is written twice (at i and i + capacity), so the rows in
+    chronological order are always one contiguous slice and view()
+    never copies.
+    """
+
+    def __init__(self, capacity: int, width: int, dtype: Any = np.float32):
+        self.capacity = capacity
+        self.data = np.zeros((2 * capacity, width), dtype=dtype)
+        self.start = 0
+        self.count = 0
+
+    def append(self, row: np.ndarray) -> None:
+        """Append a row, dropping the oldest when full."""
+        if self.count < self.capacity:
+            pos = (self.start + self.count) % self.capacity
+            self.count += 1
+        else:
+            pos = self.start
+            self.start = (self.start + 1) % self.capacity
+        self.data[pos] = row
+        self.data[pos + self.capacity] = row
+
+    def pop(self) -> np.ndarray:
+        """Remove and return the newest row."""
+        if self.count == 0:
+            raise IndexError("pop from empty RingBuffer")
+        row = self.view()[-1].copy()
+        self.count -= 1
+        return row
+
+    def view(self) -> np.ndarray:
+        """Rows in chronological order (oldest first), as a view."""
+        return self.data[self.start:self.start + self.count]
+
+    def __len__(self) -> int:
+        return self.count
+
+
+class SymbolStream:
+    """
+    Rolling state for one symbol.
+
+    - features: last SEQUENCE_LENGTH completed feature rows
+    - bars / timestamps: last LIVE_HISTORY_BARS completed OHLCV bars
+    - bar: the in-progress bar built from ticks
+    """
+
+    def __init__(self, symbol: str, model: ModelBackend, columns: List[str]):
+        self.symbol = symbol
+        self.model = model
+        self.columns = columns
+        self.sequence_length = int(model.input_shape[0])
+
+        # Cross-sectional columns need the whole universe; they are carried forward
+        self.computed = [c for c in columns if not uses_symbol(c)]
+        self.computed_index = np.array([columns.index(c) for c in self.computed], dtype=int)
+        self.features = RingBuffer(self.sequence_length, len(columns))
+        self.bars = RingBuffer(Config.LIVE_HISTORY_BARS, len(BASE_COLUMNS), dtype=np.float64)
+        self.timestamps = RingBuffer(Config.LIVE_HISTORY_BARS, 1, dtype="datetime64[ns]")
+        self.last_bar_key: Optional[pd.Timestamp] = None
+        self.bar: Optional[Dict[str, Any]] = None
+
+        self.scaler_mean = np.array(model.metadata.get("scaler_mean", 0.0), dtype=np.float32)
+        self.scaler_std = np.array(model.metadata.get("scaler_std", 1.0), dtype=np.float32)
+        self._window = np.empty((1, self.sequence_length, len(columns)), dtype=np.float32)
+
+    def seed(self, df: pd.DataFrame) -> None:
+        """
+        Fill the buffers from the tail of the processed history.
+
+        Args:
+            df: Feature store rows with timestamp, the OHLCV columns and
+                self.columns; bars after the last complete row are ignored
+        """
+        complete = np.flatnonzero(df[self.columns].notna().all(axis=1).to_numpy())
+        if len(complete) == 0:
+            return
+        df = df.iloc[:complete[-1] + 1]
+
+        for row in df[self.columns].dropna().to_numpy(dtype=np.float32)[-self.sequence_length:]:
+            self.features.append(row)
+        for row in df[BASE_COLUMNS].to_numpy(dtype=np.float64)[-self.bars.capacity:]:
+            self.bars.append(row)
+        for timestamp in pd.to_datetime(df["timestamp"]).to_numpy(dtype="datetime64[ns]")[-self.timestamps.capacity:]:
+            self.timestamps.append(np.array([timestamp]))
+        self.last_bar_key = _bar_key(df["timestamp"].iloc[-1])
+
+    def _reopen_last_bar(self) -> None:
+        """Turn the newest completed row back into the in-progress bar."""
+        row = self.features.pop()
+        bar = self.bars.pop()
+        self.timestamps.pop()
+        self.bar = {
+            "key": self.last_bar_key,
+            **dict(zip(BASE_COLUMNS, bar.tolist())),
+            "extra": row,
+        }
+
+    def _close_bar(self) -> None:
+        """Push the finished bar into the ring buffers."""
+        row = self._feature_row()
+        self.features.append(row)
+        self.bars.append(np.array([self.bar[c] for c in BASE_COLUMNS]))
+        self.timestamps.append(np.array([self.bar["key"].to_datetime64()]))
+        self.last_bar_key = self.bar["key"]
+        self.bar = None
+
+    def on_tick(self, price: float, volume: Optional[float], timestamp: pd.Timestamp) -> None:
+        """Aggregate a tick into the current bar, rolling over when a new bar starts."""
+        key = _bar_key(timestamp)
+
+        if self.bar is None and key == self.last_bar_key and len(self.features) > 1:
+            self._reopen_last_bar()
+        elif self.bar is not None and key != self.bar["key"]:
+            self._close_bar()
+
+        if self.bar is None:
+            self.bar = {
+                "key": key,
+                "open": price,
+                "high": price,
+                "low": price,
+                "close": price,
+                "volume": 0.0,
+                "extra": self.features.view()[-1].copy(),
+            }
+        else:
+            self.bar["high"] = max(self.bar["high"], price)
+            self.bar["low"] = min(self.bar["low"], price)
+            self.bar["close"] = price
+
+        if volume is not None:
+            if Config.LIVE_VOLUME_IS_CUMULATIVE:
+                self.bar["volume"] = volume
+            else:
+                self.bar["volume"] += volume
+
+    def _feature_row(self) -> np.ndarray:
+        """
+        Feature row for the in-progress bar.
+
+        Runs the registry's feature functions over the buffered bars plus
+        the current one and keeps the last row, so live rows are computed
+        exactly like the feature store's.
+        """
+        bar = self.bar
+        window = pd.DataFrame(
+            np.vstack([self.bars.view(), [bar[c] for c in BASE_COLUMNS]]), columns=BASE_COLUMNS
+        )
+        window.insert(0, "timestamp", np.append(self.timestamps.view()[:, 0], bar["key"].to_datetime64()))
+
+        # Columns not computed from the symbol's bars are carried forward from the last row
+        row = bar["extra"].copy()
+        row[self.computed_index] = compute_features(window, self.computed).to_numpy()[-1]
+        return row
+
+    def predict(self) -> Dict[str, Any]:
+        """Predict the next close from the last completed rows plus the current bar."""
+        window = self._window
+        completed = self.features.view()
+        window[0, :-1] = completed[len(completed) - (self.sequence_length - 1):]
+        window[0, -1] = self._feature_row()
+        np.subtract(window, self.scaler_mean, out=window)
+        np.divide(window, self.scaler_std, out=window)
+
+        prediction = float(np.asarray(self.model.predict(window)).ravel()[0])  # First horizon step
+        current_price = self.bar["close"]
+        price_change = prediction - current_price
+
+        return {
+            "symbol": self.symbol,
+            "bar": str(self.bar["key"]),
+            "current_price": float(current_price),
+            "predicted_price": prediction,
+            "price_change": float(price_change),
+            "percent_change": float(price_change / current_price * 100),
+            "direction": "UP" if price_change > 0 else "DOWN",
+        }
+
+
+def _bar_key(timestamp: Any) -> pd.Timestamp:
+    """Start of the bar a timestamp belongs to."""
+    return bar_start(timestamp, Config.LIVE_BAR_INTERVAL)
+
+
+def _parse_quote(quote: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Extract price, volume and timestamp from a raw quote response.
+
+    Note:
+        TODO: Verify actual quote fields from indianapi.com; the
+        candidates below cover the common spellings.
+    """
+    data = quote.get("data", quote) if isinstance(quote, dict) else {}
+    if isinstance(data, list):
+        data = data[0] if data else {}
+
+    price = next((data[k] for k in ("price", "last_price", "lastPrice", "ltp", "close") if k in data), None)
+    if price is None:
+        return None
+    volume = next((data[k] for k in ("volume", "totalTradedVolume", "total_volume") if k in data), None)
+    timestamp = next((data[k] for k in ("timestamp", "time", "lastUpdateTime") if k in data), None)
+
+    return {
+        "price": float(price),
+        "volume": float(volume) if volume is not None else None,
+        "timestamp": pd.Timestamp(timestamp) if timestamp is not None else pd.Timestamp.now(),
+    }
+
+
+class LivePredictor:
+    """
+    Poll quotes for the universe and emit a prediction after every quote.
+
+    Usage:
+        live = LivePredictor(on_prediction=print)
+        live.run()                      # poll with IndianAPIClient
+        live.on_quote("TCS", quote)     # or push ticks from another feed
+    """
+
+    def __init__(
+        self,
+        symbols: Optional[List[str]] = None,
+        on_prediction: Optional[Callable[[Dict[str, Any]], None]] = None,
+        client: Optional[Any] = None,
+    ):
+        self.symbols = symbols or Config.SYMBOLS
+        self.on_prediction = on_prediction or self._log_prediction
+        self.client = client
+        self.streams: Dict[str, SymbolStream] = {}
+
+        store = FeatureStore()
+        for symbol in self.symbols:
+            stream = self._open_stream(symbol, store)
+            if stream is not None:
+                self.streams[symbol] = stream
+
+        logger.info(f"✓ Live mode ready for {len(self.streams)}/{len(self.symbols)} symbols")
+
+    @staticmethod
+    def _open_stream(symbol: str, store: FeatureStore) -> Optional[SymbolStream]:
+        """Load the serving model and seed the ring buffers from history."""
+        model = load_backend(symbol)
+        if model is None:
+            logger.warning(f"No trained model for {symbol}, skipping")
+            return None
+
+        columns = list(model.metadata.get("feature_columns") or Config.FEATURES)
+        df = store.load(symbol, columns + [c for c in BASE_COLUMNS if c not in columns])
+        if df is None:
+            return None
+
+        if len(columns) != model.input_shape[-1]:
+            logger.error(f"Feature mismatch for {symbol}: {len(columns)} != {model.input_shape[-1]}")
+            return None
+
+        stream = SymbolStream(symbol, model, columns)
+        stream.seed(df)
+        if len(stream.features) < stream.sequence_length:
+            logger.warning(f"Insufficient history for {symbol}")
+            return None
+        return stream
+
+    @staticmethod
+    def _log_prediction(result: Dict[str, Any]) -> None:
+        hot_logger.info(
+            "%s: ₹%.2f → ₹%.2f (%+.2f%%) [%.1f ms]",
+            result["symbol"], result["current_price"], result["predicted_price"],
+            result["percent_change"], result["latency_ms"],
+        )
+
+    def on_quote(self, symbol: str, quote: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Apply one quote and emit the updated prediction.
+
+        Args:
+            symbol: Stock symbol
+            quote: Raw quote response
+
+        Returns:
+            Prediction dict (also passed to on_prediction) or None
+        """
+        stream = self.streams.get(symbol)
+        tick = _parse_quote(quote) if quote else None
+        if stream is None or tick is None:
+            return None
+
+        started = time.perf_counter()
+        stream.on_tick(tick["price"], tick["volume"], tick["timestamp"])
+        result = stream.predict()
+        result["latency_ms"] = (time.perf_counter() - started) * 1000
+
+        self.on_prediction(result)
+        return result
+
+    def poll_once(self) -> List[Dict[str, Any]]:
+        """Fetch one quote per symbol and emit predictions."""
+        if self.client is None:
+            from api_client import IndianAPIClient
+            self.client = IndianAPIClient()
+
+        results = []
+        for symbol in self.streams:
+            result = self.on_quote(symbol, self.client.get_quote(symbol))
+            if result:
+                results.append(result)
+        return results
+
+    def run(
+        self,
+        interval: float = Config.LIVE_POLL_INTERVAL,
+        iterations: Optional[int] = None,
+    ) -> None:
+        """
+        Poll on a fixed interval until interrupted.
+
+        Note: every quote counts against the API quota, so the poll
+        stops early when the daily limit is reached.
+
+        Args:
+            interval: Seconds between polls of the whole universe
+            iterations: Stop after this many polls (default: run forever)
+        """
+        count = 0
+        while iterations is None or count < iterations:
+            started = time.monotonic()
+            self.poll_once()
+            count += 1
+
+            if self.client.get_rate_limit_stats()["remaining_today"] == 0:
+                logger.warning("Daily quota exhausted. Stopping live mode.")
+                break
+
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+
+if __name__ == "__main__":
+    LivePredictor().run()
@@ -0,0 +1,162 @@
+"""
+Shared logging setup for the pipeline modules.
+
+Handles:
+- One QueueHandler on the root logger: the calling thread only queues
+  the record, and a single listener thread formats it and writes it to
+  the console and to the log file registered for the emitting module
+- Lazy formatting: records are queued with their %-style arguments
+  unformatted, so disabled or rate-limited messages are never built
+- Rate-limited loggers for messages logged per call or per batch
+
+Usage:
+    logger = get_logger(__name__, "model.log")
+    hot_logger = HotPathLogger(logger)
+    hot_logger.info("Created %d sequences", n)
+"""
+
+import atexit
+import logging
+import logging.handlers
+import math
+import os
+import queue
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from config import Config
+
+_lock = threading.Lock()
+_handler: Optional["_DeferredQueueHandler"] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+_router: Optional["_FileRouter"] = None
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue records without formatting them.
+
+    The stock QueueHandler merges the arguments into the message in the
+    calling thread; here that is left to the listener. Arguments must
+    not be mutated after the call (pass values, not live buffers).
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class HotPathLogger(logging.LoggerAdapter):
+    """
+    Logger for messages emitted per call or per batch.
+
+    Each message (keyed by its format string) is logged at most once
+    every `interval` seconds; the next one that goes through reports how
+    many were dropped. Dropped messages return before a LogRecord is
+    created.
+    """
+
+    def __init__(self, logger: logging.Logger, interval: float = Config.LOG_HOT_PATH_INTERVAL):
+        super().__init__(logger, {})
+        self.interval = interval
+        self.sites: Dict[str, Tuple[float, int]] = {}
+        self._lock = threading.Lock()
+
+    def log(self, level: int, msg: str, *args, **kwargs) -> None:
+        if not self.isEnabledFor(level):
+            return
+        now = time.monotonic()
+        with self._lock:
+            last, suppressed = self.sites.get(msg, (-math.inf, 0))
+            if now - last < self.interval:
+                self.sites[msg] = (last, suppressed + 1)
+                return
+            self.sites[msg] = (now, 0)
+        if suppressed:
+            msg = f"{msg} ({suppressed} similar suppressed)"
+        self.logger.log(level, msg, *args, **kwargs)
+
+
+class _FileRouter(logging.Handler):
+    """Write each record to the log file registered for its logger."""
+
+    def __init__(self, formatter: logging.Formatter):
+        super().__init__()
+        self.setFormatter(formatter)
+        self.routes: Dict[str, logging.Handler] = {}
+        self.files: Dict[str, logging.Handler] = {}
+
+    def add_route(self, name: str, filename: str) -> None:
+        if filename not in self.files:
+            handler = logging.FileHandler(Config.LOGS_DIR / filename, delay=True)
+            handler.setFormatter(self.formatter)
+            self.files[filename] = handler
+        self.routes[name] = self.files[filename]
+
+    def emit(self, record: logging.LogRecord) -> None:
+        handler = self.routes.get(record.name)
+        if handler is not None:
+            handler.handle(record)
+
+    def close(self) -> None:
+        for handler in self.files.values():
+            handler.close()
+        super().close()
+
+
+def _start() -> None:
+    """Install the queue handler on the root logger and start the listener."""
+    global _handler, _listener, _router
+    formatter = logging.Formatter(Config.LOG_FORMAT)
+    console = logging.StreamHandler()
+    console.setFormatter(formatter)
+    _router = _FileRouter(formatter)
+
+    _handler = _DeferredQueueHandler(queue.SimpleQueue())
+    root = logging.getLogger()
+    root.setLevel(Config.LOG_LEVEL)
+    root.addHandler(_handler)
+
+    _listener = logging.handlers.QueueListener(_handler.queue, console, _router)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def _restart_in_child() -> None:
+    """A forked child has no listener thread; give it its own queue and listener."""
+    global _listener
+    if _listener is not None:
+        _handler.queue = queue.SimpleQueue()
+        _listener = logging.handlers.QueueListener(_handler.queue, *_listener.handlers)
+        _listener.start()
+
+
+def get_logger(name: str, filename: str) -> logging.Logger:
+    """
+    Logger for a pipeline module.
+
+    Args:
+        name: Logger name (the module's __name__)
+        filename: Log file under Config.LOGS_DIR its records go to, in
+            addition to the console
+
+    Returns:
+        Logger whose records go through the shared queue
+    """
+    with _lock:
+        if _handler is None:
+            _start()
+        _router.add_route(name, filename)
+    return logging.getLogger(name)
+
+
+def stop_logging() -> None:
+    """Write out every queued record and stop the listener (runs at exit)."""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+os.register_at_fork(after_in_child=_restart_in_child)
@@ -11,34 +11,110 @@ Usage:
     # Full pipeline: collect + process + train
     python main.py --full
     
+    # Market index + cross-sectional features over the whole universe
+    # (once, after every shard has run --process)
+    python main.py --universe-features
+    
     # Check rate limit status without making requests
     python main.py --status
+    
+    # Stream quotes and update predictions after every quote
+    python main.py --live
+    
+    # Update existing models with newly arrived data
+    python main.py --finetune
+    
+    # Search hyperparameters (successive halving / Hyperband)
+    python main.py --tune TCS
 
 Environment:
     INDIANAPI_KEY: Your API key from indianapi.com (required)
 """
 
 import argparse
-import logging
 import sys
-from typing import Optional
+import time
+from functools import partial
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
 
 from config import Config
+from log_setup import get_logger
 from api_client import IndianAPIClient
+from bars import resample_bars
+from correlation import CorrelationEngine
+from cross_section import CrossSectionalEngine
 from data_processor import DataProcessor
+from features import BASE_COLUMNS, FeatureStore, uses_symbol
+from backends import (
+    available_backends,
+    calibrate_intervals,
+    create_backend,
+    load_selection,
+    reference_prices,
+    regression_metrics,
+    update_selection,
+    write_metrics_report,
+)
 from model import StockPricePredictor
+from live import LivePredictor
 from predict import StockPredictor
+from prediction_store import PredictionStore
+from journal import RunJournal
+from scheduler import Stage, StageScheduler
+from tensor_cache import TensorCache
+from tuning import HyperparameterSearch, load_best_hyperparams
+from validation import DataValidator
+from universe import load_symbols, load_universe, parse_shard
+from workqueue import LeaseKeeper, WorkQueue, default_worker_id, new_batch_id
 
-# Configure logging
-logging.basicConfig(
-    level=Config.LOG_LEVEL,
-    format=Config.LOG_FORMAT,
-    handlers=[
-        logging.FileHandler(Config.LOGS_DIR / "pipeline.log"),
-        logging.StreamHandler(),
-    ],
-)
-logger = logging.getLogger(__name__)
+logger = get_logger(__name__, "pipeline.log")
+
+
+def collect_symbol(symbol: str, client: Optional[IndianAPIClient] = None) -> bool:
+    """
+    Fetch and save historical data for one symbol (consumes 1 request).
+    
+    Args:
+        symbol: Stock symbol
+        client: API client (created if None)
+    
+    Returns:
+        True if data was collected, False otherwise
+    """
+    client = client or IndianAPIClient()
+    logger.info(f"\nFetching historical data for {symbol}...")
+    
+    data = client.get_historical_data(symbol, days=Config.HISTORY_DAYS)
+    
+    if data:
+        logger.info(f"✓ Successfully collected data for {symbol}")
+        return True
+    
+    logger.error(f"✗ Failed to collect data for {symbol}")
+    return False
+
+
+def collect_market_index(client: Optional[IndianAPIClient] = None) -> bool:
+    """
+    Fetch bars for Config.MARKET_INDEX_SYMBOL (consumes 1 request).
+    
+    The index is not part of the universe (no model is trained for it);
+    its bars are the market return for relative strength and beta.
+    
+    Returns:
+        True if the index bars were collected, False otherwise
+    """
+    if not Config.MARKET_INDEX_SYMBOL:
+        return False
+    client = client or IndianAPIClient()
+    if client.get_rate_limit_stats()["remaining_today"] == 0:
+        logger.warning(f"No quota left to fetch market index {Config.MARKET_INDEX_SYMBOL}")
+        return False
+    return collect_symbol(Config.MARKET_INDEX_SYMBOL, client)
 
 
 def collect_data() -> bool:
@@ -50,6 +126,7 @@ def collect_data() -> bool:
     2. Fetch historical data for each symbol
     3. Save raw JSON locally
     4. Log all requests for quota tracking
+    5. Fetch the market index (left to --universe-features when sharded)
     
     Returns:
         True if all symbols collected successfully, False otherwise
@@ -77,16 +154,10 @@ def collect_data() -> bool:
     
     # Collect data for each symbol
     for symbol in Config.SYMBOLS:
-        logger.info(f"\nFetching historical data for {symbol}...")
-        
-        data = client.get_historical_data(symbol, days=Config.HISTORY_DAYS)
-        
-        if data:
+        if collect_symbol(symbol, client):
             collected_count += 1
-            logger.info(f"✓ Successfully collected data for {symbol}")
         else:
             failed_symbols.append(symbol)
-            logger.error(f"✗ Failed to collect data for {symbol}")
         
         # Check if we still have quota
         remaining = client.get_rate_limit_stats()['remaining_today']
@@ -94,6 +165,9 @@ def collect_data() -> bool:
             logger.warning("Daily quota exhausted. Stopping collection.")
             break
     
+    if Config.SHARD_COUNT == 1:
+        collect_market_index(client)
+    
     logger.info("\n" + "=" * 60)
     logger.info(f"Data collection complete: {collected_count}/{len(Config.SYMBOLS)} symbols")
     if failed_symbols:
@@ -103,15 +177,95 @@ def collect_data() -> bool:
     return len(failed_symbols) == 0
 
 
+def _save_bars(df: pd.DataFrame, symbol: str, processor: DataProcessor) -> None:
+    """
+    Resample validated source bars and save them as the processed CSV.
+    
+    Indicators are not stored here: the feature store derives them from
+    these bars on demand.
+    """
+    # Aggregate source candles to the training bar size
+    if Config.BAR_INTERVAL != Config.SOURCE_INTERVAL:
+        df = resample_bars(df, Config.BAR_INTERVAL)
+        logger.info(f"  Resampled to {len(df)} {Config.BAR_INTERVAL} bars")
+    
+    # Save processed data
+    processor.save_processed_data(df[["timestamp"] + BASE_COLUMNS], symbol)
+
+
+def _accept_quality(report: dict) -> bool:
+    """Save a quality report and check enough clean rows are left."""
+    DataValidator.save_report(report)
+    if report["rows_out"] < Config.MIN_DATA_POINTS:
+        logger.error(
+            f"✗ {report['symbol']}: only {report['rows_out']} clean rows after validation "
+            f"(need {Config.MIN_DATA_POINTS})"
+        )
+        return False
+    return True
+
+
+def process_symbol(
+    symbol: str,
+    client: Optional[IndianAPIClient] = None,
+    processor: Optional[DataProcessor] = None,
+) -> bool:
+    """
+    Turn one symbol's raw archive into a validated, processed CSV of bars.
+    
+    Args:
+        symbol: Stock symbol
+        client: API client used to load the saved raw data (created if None)
+        processor: Data processor (created if None)
+    
+    Returns:
+        True if processed successfully, False otherwise
+    """
+    client = client or IndianAPIClient()
+    processor = processor or DataProcessor()
+    logger.info(f"\nProcessing {symbol}...")
+    
+    try:
+        # Stream the saved raw archive into column arrays
+        columns = client.load_raw_columns(symbol)
+        if not columns:
+            logger.warning(f"No raw data found for {symbol}")
+            return False
+        
+        # Convert to DataFrame
+        df = processor.process_raw_columns(columns, symbol)
+        if df is None:
+            return False
+        
+        # Drop duplicates, bad ticks and off-calendar bars; repair OHLC
+        df, report = DataValidator().validate(df, symbol)
+        if not _accept_quality(report):
+            return False
+        
+        _save_bars(df, symbol, processor)
+        
+        logger.info(f"✓ Successfully processed {symbol}")
+        return True
+        
+    except Exception as e:
+        logger.error(f"Error processing {symbol}: {e}")
+        return False
+
+
 def process_data() -> bool:
     """
     Process raw API data into ML-ready datasets.
     
     Process:
-    1. Load raw JSON for each symbol
-    2. Parse into DataFrame
-    3. Compute technical indicators
-    4. Save processed CSV
+    1. Stream the raw archive for each symbol into column arrays
+    2. Parse into DataFrames and stack them into one panel
+    3. Validate the whole panel at once (duplicates, bad ticks, spikes, calendar gaps)
+    4. Resample and save the processed bars and quality report per symbol
+       (indicators are computed lazily by the feature store)
+    5. Process the market index bars, then update the cross-sectional
+       features (relative strength, beta, breadth) and the rolling
+       correlation matrix from the new bars (unsharded runs only; sharded
+       runs leave this to one --universe-features run)
     
     Returns:
         True if all symbols processed successfully, False otherwise
@@ -126,36 +280,47 @@ def process_data() -> bool:
     processed_count = 0
     failed_symbols = []
     
+    frames = []
     for symbol in Config.SYMBOLS:
+        try:
+            columns = client.load_raw_columns(symbol)
+            df = processor.process_raw_columns(columns, symbol) if columns else None
+        except Exception as e:
+            logger.error(f"Error loading {symbol}: {e}")
+            df = None
+        if df is None:
+            logger.warning(f"No usable raw data for {symbol}")
+            failed_symbols.append(symbol)
+            continue
+        frames.append(df.assign(symbol=symbol))
+    
+    reports = {}
+    if frames:
+        panel, reports = DataValidator().validate_panel(pd.concat(frames, ignore_index=True))
+        clean = {symbol: df.drop(columns="symbol") for symbol, df in panel.groupby("symbol", sort=False)}
+    
+    for symbol, report in reports.items():
         logger.info(f"\nProcessing {symbol}...")
+        if not _accept_quality(report):
+            failed_symbols.append(symbol)
+            continue
         
         try:
-            # Load raw data (from API or saved file)
-            raw_data = client.load_raw_data(symbol)
-            if not raw_data:
-                logger.warning(f"No raw data found for {symbol}")
-                failed_symbols.append(symbol)
-                continue
-            
-            # Convert to DataFrame
-            df = processor.process_raw_data(raw_data, symbol)
-            if df is None:
-                failed_symbols.append(symbol)
-                continue
-            
-            # Compute indicators
-            df = processor.compute_technical_indicators(df)
-            
-            # Save processed data
-            processor.save_processed_data(df, symbol)
-            
+            _save_bars(clean[symbol].reset_index(drop=True), symbol, processor)
             processed_count += 1
             logger.info(f"✓ Successfully processed {symbol}")
-            
         except Exception as e:
             logger.error(f"Error processing {symbol}: {e}")
             failed_symbols.append(symbol)
     
+    if processed_count and Config.SHARD_COUNT == 1:
+        update_universe_features(client, fetch_index=False)
+    elif processed_count:
+        logger.info(
+            "Sharded run: update universe-wide features once every shard is processed "
+            "(python main.py --universe-features)"
+        )
+    
     logger.info("\n" + "=" * 60)
     logger.info(f"Data processing complete: {processed_count}/{len(Config.SYMBOLS)} symbols")
     if failed_symbols:
@@ -165,18 +330,153 @@ def process_data() -> bool:
     return len(failed_symbols) == 0
 
 
-def train_models() -> bool:
+def update_universe_features(
+    client: Optional[IndianAPIClient] = None,
+    fetch_index: bool = True,
+) -> bool:
     """
-    Train LSTM models for each symbol.
+    Universe-wide step: market index bars, cross-sectional features and correlations.
+    
+    Reads the processed bars of every symbol in the universe, so a
+    sharded deployment runs it once (unsharded) after every shard has
+    processed its symbols and before any shard trains.
+    
+    Args:
+        client: API client (created if None)
+        fetch_index: Fetch the market index bars first (consumes 1 request)
+    
+    Returns:
+        True if the cross-sectional features are current, False otherwise
+    """
+    client = client or IndianAPIClient()
+    if Config.MARKET_INDEX_SYMBOL:
+        if fetch_index:
+            collect_market_index(client)
+        process_symbol(Config.MARKET_INDEX_SYMBOL, client)
+    updated = CrossSectionalEngine().update()
+    CorrelationEngine().update()
+    return updated
+
+
+def train_symbol(
+    symbol: str,
+    backends: Optional[List[str]] = None,
+    processor: Optional[DataProcessor] = None,
+    tensor_cache: Optional[TensorCache] = None,
+) -> bool:
+    """
+    Train every candidate backend for one symbol and select the best.
+    
+    Args:
+        symbol: Stock symbol
+        backends: Backends to train (default: Config.MODEL_BACKENDS)
+        processor: Data processor (created if None)
+        tensor_cache: Tensor cache (created if None)
+    
+    Returns:
+        True if training successful, False otherwise
+    """
+    processor = processor or DataProcessor()
+    tensor_cache = tensor_cache or TensorCache()
+    backends = backends or Config.MODEL_BACKENDS
+    
+    logger.info(f"\n{'='*60}")
+    logger.info(f"Training model for {symbol}")
+    logger.info(f"{'='*60}")
+    
+    try:
+        # Use tuned hyperparameters when a search has been run
+        hyperparams = load_best_hyperparams(symbol)
+        if hyperparams:
+            logger.info(f"Using tuned hyperparameters: {hyperparams}")
+        sequence_length = int(hyperparams.get("sequence_length", Config.SEQUENCE_LENGTH))
+        
+        # Normalized windows over the memory-mapped tensor cache
+        # (rebuilt from the processed CSV when missing or stale)
+        dataset = tensor_cache.training_splits(
+            symbol,
+            processor,
+            sequence_length=sequence_length,
+            target_col="close",
+        )
+        if dataset is None:
+            logger.error(f"No usable training data for {symbol}")
+            return False
+        
+        splits, header = dataset
+        X_train, X_val, X_test, y_train, y_val, y_test = splits
+        
+        # Train every candidate backend on the same splits
+        input_shape = (sequence_length, X_train.shape[-1])
+        scores = {}
+        
+        for backend in backends:
+            model = create_backend(backend, input_shape, hyperparams=hyperparams, horizon=y_train.shape[1])
+            
+            logger.info(f"\nTraining {backend} model for {symbol}...")
+            train_results = model.train(
+                X_train, y_train,
+                X_val, y_val,
+                symbol=symbol,
+            )
+            
+            # Evaluate; one validation pass gives both the selection score
+            # and the residuals behind conformal intervals
+            logger.info(f"\nEvaluating {backend} model for {symbol}...")
+            val_pred = model.predict(X_val)
+            val_results = regression_metrics(y_val, val_pred, reference=reference_prices(y_val))
+            scores[backend] = val_results["rmse"]
+            test_results = model.evaluate(X_test, y_test)
+            
+            # Record normalization and data cut-off for prediction and fine-tuning
+            model.metadata["backend"] = backend
+            model.metadata["scaler_mean"] = processor.scaler_mean.tolist()
+            model.metadata["scaler_std"] = processor.scaler_std.tolist()
+            model.metadata["trained_through"] = header["last_timestamp"]
+            model.metadata["feature_columns"] = header["columns"]
+            model.metadata["val_metrics"] = val_results
+            model.metadata["test_metrics"] = test_results
+            halfwidth = calibrate_intervals(model, symbol, y_val, val_pred)
+            
+            # Save
+            model.save(name=symbol)
+            
+            # Log summary
+            logger.info(f"\n✓ {backend} training complete for {symbol}")
+            logger.info(f"  Train loss: {train_results['loss']:.6f}")
+            logger.info(f"  Val loss: {train_results['val_loss']:.6f}")
+            logger.info(f"  Test RMSE: {test_results['rmse']:.6f}")
+            logger.info(f"  Test MAPE: {test_results['mape']:.2f}%")
+            logger.info(f"  Test directional accuracy: {test_results['directional_accuracy']:.1%}")
+            logger.info(
+                f"  {Config.PREDICTION_INTERVAL:.0%} conformal interval: "
+                f"±{', ±'.join(f'{h:.4f}' for h in halfwidth)}"
+            )
+        
+        # Serve whichever backend has the lowest validation error
+        update_selection(symbol, scores)
+        
+        return True
+        
+    except Exception as e:
+        logger.error(f"Error training model for {symbol}: {e}", exc_info=True)
+        return False
+
+
+def train_models(backends: Optional[List[str]] = None) -> bool:
+    """
+    Train models for each symbol.
     
     Process:
-    1. Load processed data for each symbol
-    2. Create sequences for time-series modeling
-    3. Normalize features
-    4. Split into train/val/test
-    5. Train LSTM model
-    6. Evaluate on test set
-    7. Save trained model
+    1. Load normalized features from the tensor cache (built from processed CSV)
+    2. Create sequences as strided views over the cache
+    3. Split into train/val/test
+    4. Train each candidate backend (ridge, gbm, lstm)
+    5. Evaluate on validation and test sets
+    6. Save trained models and select the best one for serving
+    
+    Args:
+        backends: Backends to train (default: Config.MODEL_BACKENDS)
     
     Returns:
         True if training successful, False otherwise
@@ -186,78 +486,422 @@ def train_models() -> bool:
     logger.info("=" * 60)
     
     processor = DataProcessor()
+    tensor_cache = TensorCache()
+    backends = backends or Config.MODEL_BACKENDS
     
     trained_count = 0
     failed_symbols = []
     
     for symbol in Config.SYMBOLS:
-        logger.info(f"\n{'='*60}")
-        logger.info(f"Training model for {symbol}")
-        logger.info(f"{'='*60}")
+        if train_symbol(symbol, backends, processor, tensor_cache):
+            trained_count += 1
+        else:
+            failed_symbols.append(symbol)
+    
+    logger.info("\n" + "=" * 60)
+    logger.info(f"Model training complete: {trained_count}/{len(Config.SYMBOLS)} symbols")
+    if failed_symbols:
+        logger.warning(f"Failed symbols: {failed_symbols}")
+    write_metrics_report(Config.SYMBOLS)
+    logger.info("=" * 60)
+    
+    return len(failed_symbols) == 0
+
+
+def _stage_artifacts(symbol: str, stage: str) -> List[str]:
+    """Files a completed stage produced for a symbol (recorded in the run journal)."""
+    if stage == "collect":
+        paths = [Config.get_raw_data_path(symbol)]
+    elif stage == "process":
+        paths = [Config.get_processed_data_path(symbol)]
+    else:
+        paths = sorted(Config.MODELS_DIR.glob(f"{symbol}.*"))
+        paths.append(Config.get_model_selection_path(symbol))
+    return [str(p) for p in paths if p.exists()]
+
+
+def run_pipeline(backends: Optional[List[str]] = None, resume: bool = False) -> bool:
+    """
+    Run collect → process → train as a streaming per-symbol pipeline.
+    
+    Each symbol moves to processing as soon as its own fetch finishes and
+    to training as soon as it is processed, so API waits overlap with
+    CPU work instead of every phase waiting for all symbols.
+    
+    When Config.FEATURES includes cross-sectional features, training is
+    a barrier stage: it starts once every scheduled symbol has been
+    processed (or failed), after fetching the market index and one
+    incremental update of the cross-sectional features, so every model
+    is trained on features computed over the same universe that serves
+    them at predict time. Per-symbol feature sets keep the overlap.
+    
+    Every stage result is written to the run journal as it completes.
+    With resume=True the most recent unfinished run is continued:
+    finished stages are skipped (no repeated API requests or training)
+    and failed or never-started ones are retried.
+    
+    Args:
+        backends: Backends to train (default: Config.MODEL_BACKENDS)
+        resume: Continue the last unfinished run instead of starting over
+    
+    Returns:
+        True if every symbol was trained, False otherwise
+    
+    Raises:
+        ValueError: If sharded while Config.FEATURES has cross-sectional
+            features (a shard can't wait for the rest of the universe)
+    """
+    cross_sectional = any(uses_symbol(name) for name in Config.FEATURES)
+    if cross_sectional and Config.SHARD_COUNT > 1:
+        raise ValueError(
+            "Sharded --full can't train on cross-sectional features. Run --collect and "
+            "--process on every shard, then --universe-features once, then --train per shard"
+        )
+    
+    logger.info("=" * 60)
+    logger.info("FULL PIPELINE (streaming)")
+    logger.info("=" * 60)
+    
+    client = IndianAPIClient()
+    stages = [
+        Stage("collect", partial(collect_symbol, client=client), "io"),
+        Stage("process", process_symbol, "cpu"),
+        Stage("train", partial(train_symbol, backends=backends), "cpu", barrier=cross_sectional),
+    ]
+    stage_names = [stage.name for stage in stages]
+    
+    journal = RunJournal()
+    run = journal.latest_run(unfinished_only=True) if resume else None
+    if run is not None:
+        run_id, symbols = run["run_id"], run["symbols"]
+        journal.resume_run(run_id)
+        completed = journal.completed_stages(run_id)
+        logger.info(f"Resuming run {run_id}: {journal.format_progress(run_id)}")
+    else:
+        if resume:
+            logger.info("No unfinished run to resume; starting a new one")
+        symbols = list(Config.SYMBOLS)
+        run_id = journal.start_run(symbols, stage_names)
+        completed = {}
+    
+    # One request per symbol still to fetch; never schedule more than the quota allows
+    # (one request is kept back for the market index)
+    remaining = client.get_rate_limit_stats()["remaining_today"]
+    if cross_sectional and Config.MARKET_INDEX_SYMBOL:
+        remaining = max(0, remaining - 1)
+    to_fetch = [s for s in symbols if "collect" not in completed.get(s, set())]
+    deferred = set(to_fetch[remaining:])
+    if deferred:
+        logger.warning(
+            f"Quota allows {remaining} requests; deferring {len(deferred)} symbols "
+            f"(continue later with --resume)"
+        )
+    scheduled = [s for s in symbols if s not in deferred]
+    
+    def on_barrier(stage: str) -> None:
+        # Market index bars, then one universe-wide feature update before training
+        if not update_universe_features(client):
+            raise RuntimeError("cross-sectional features could not be updated")
+    
+    def on_result(symbol: str, stage: str, outcome: dict) -> None:
+        journal.record_stage(
+            run_id, symbol, stage,
+            ok=outcome["ok"],
+            seconds=outcome["seconds"],
+            error=outcome["error"],
+            artifacts=_stage_artifacts(symbol, stage) if outcome["ok"] else None,
+        )
+        logger.info(journal.format_progress(run_id))
+    
+    try:
+        results = StageScheduler(stages).run(
+            scheduled,
+            completed=completed,
+            on_result=on_result,
+            on_barrier=on_barrier,
+        )
+    except BaseException:
+        journal.finish_run(run_id, "interrupted")
+        journal.close()
+        logger.info(f"Run {run_id} interrupted; continue with: python main.py --resume")
+        raise
+    
+    trained = [s for s, r in results.items() if r["failed_stage"] is None and "train" in r["completed"]]
+    failed = {s: r["failed_stage"] for s, r in results.items() if r["failed_stage"] is not None}
+    all_trained = len(trained) == len(symbols)
+    journal.finish_run(run_id, "completed" if all_trained else "failed")
+    
+    logger.info("\n" + "=" * 60)
+    logger.info(f"Pipeline complete: {len(trained)}/{len(symbols)} symbols trained")
+    if failed:
+        logger.warning(f"Failed symbols (stage): {failed}")
+    if not all_trained:
+        logger.info("Retry failed and deferred symbols with: python main.py --resume")
+    write_metrics_report(symbols)
+    logger.info("=" * 60)
+    journal.close()
+    
+    return all_trained
+
+
+def collect_batch(
+    queue: WorkQueue,
+    batch_id: str,
+    poll_interval: float = Config.QUEUE_POLL_INTERVAL,
+) -> List[dict]:
+    """
+    Fetch the output files of a batch's jobs as they finish.
+    
+    Stalled or failed jobs are retried by the workers. Jobs whose lease
+    expired with no attempts left are failed here too, so the wait ends
+    even when every worker is gone. Outputs are fetched and the end of
+    the batch is decided from the same snapshot of the jobs, so a job
+    finishing between polls is never missed.
+    
+    Args:
+        queue: Work queue holding the batch
+        batch_id: Batch to wait for
+        poll_interval: Seconds between polls
+    
+    Returns:
+        Final state of every job in the batch
+    """
+    collected = set()
+    while True:
+        queue.expire_leases()
+        jobs = queue.batch_jobs(batch_id)
+        for job in jobs:
+            if job["status"] == "done" and job["job_id"] not in collected:
+                queue.fetch_files(job["job_id"], "output")
+                collected.add(job["job_id"])
+                logger.info(f"✓ Collected {job['symbol']} from {job['worker']}")
         
-        try:
-            # Load processed data
-            df = processor.load_processed_data(symbol)
-            if df is None:
-                logger.warning(f"No processed data found for {symbol}")
-                failed_symbols.append(symbol)
+        if all(job["status"] in ("done", "failed") for job in jobs):
+            return jobs
+        time.sleep(poll_interval)
+
+
+def run_coordinator(backends: Optional[List[str]] = None) -> bool:
+    """
+    Enqueue per-symbol training jobs and collect the trained models.
+    
+    Jobs carry the processed CSV, cross-sectional features (and tuning
+    results, if any) so workers
+    on other nodes only need access to the queue file. Trained model
+    files are written into the local models directory as jobs finish.
+    
+    Args:
+        backends: Backends to train (default: Config.MODEL_BACKENDS)
+    
+    Returns:
+        True if every job finished, False otherwise
+    """
+    logger.info("=" * 60)
+    logger.info("DISTRIBUTED TRAINING (coordinator)")
+    logger.info("=" * 60)
+    
+    queue = WorkQueue()
+    batch_id = new_batch_id()
+    payload = {"backends": backends or Config.MODEL_BACKENDS}
+    CrossSectionalEngine().update()
+    
+    for symbol in Config.SYMBOLS:
+        processed_path = Config.get_processed_data_path(symbol)
+        if not processed_path.exists():
+            logger.warning(f"No processed data for {symbol}; not enqueued")
+            continue
+        inputs = [processed_path]
+        if Config.get_cross_section_path(symbol).exists():
+            inputs.append(Config.get_cross_section_path(symbol))
+        if Config.get_tuning_results_path(symbol).exists():
+            inputs.append(Config.get_tuning_results_path(symbol))
+        queue.enqueue(batch_id, symbol, payload, inputs)
+    
+    logger.info(f"Enqueued batch {batch_id} at {queue.path}: {queue.stats(batch_id)['queued']} jobs")
+    logger.info("Start workers with: python main.py --worker")
+    
+    jobs = collect_batch(queue, batch_id)
+    collected = [j for j in jobs if j["status"] == "done"]
+    failed = [f"{j['symbol']} ({j['error']})" for j in jobs if j["status"] == "failed"]
+    queue.close()
+    
+    logger.info("\n" + "=" * 60)
+    logger.info(f"Distributed training complete: {len(collected)} symbols trained")
+    if failed:
+        logger.warning(f"Failed jobs: {failed}")
+    write_metrics_report(Config.SYMBOLS)
+    logger.info("=" * 60)
+    
+    return not failed
+
+
+def run_worker(exit_when_idle: bool = False, worker_id: Optional[str] = None) -> int:
+    """
+    Claim and run training jobs from the work queue.
+    
+    The lease is renewed in the background while a job trains; if the
+    worker dies the lease expires and another worker retries the job.
+    
+    Args:
+        exit_when_idle: Stop when no job is available instead of polling
+        worker_id: Identifier recorded on claimed jobs (default: host:pid)
+    
+    Returns:
+        Number of jobs completed
+    """
+    worker_id = worker_id or default_worker_id()
+    queue = WorkQueue()
+    completed = 0
+    logger.info(f"Worker {worker_id} polling {queue.path}")
+    
+    try:
+        while True:
+            job = queue.claim(worker_id)
+            if job is None:
+                if exit_when_idle:
+                    break
+                time.sleep(Config.QUEUE_POLL_INTERVAL)
                 continue
             
-            # Create sequences
-            X, y = processor.create_sequences(
-                df,
-                sequence_length=Config.SEQUENCE_LENGTH,
-                target_col="close",
-            )
+            job_id, symbol = job["job_id"], job["symbol"]
+            logger.info(f"Claimed job {job_id} ({symbol}, attempt {job['attempts']})")
             
-            if len(X) < 100:
-                logger.error(f"Insufficient sequences for {symbol} ({len(X)} < 100)")
-                failed_symbols.append(symbol)
+            try:
+                queue.fetch_files(job_id, "input")
+                with LeaseKeeper(queue.path, job_id, worker_id) as lease:
+                    ok = train_symbol(symbol, job["payload"]["backends"])
+                
+                if lease.lost.is_set():
+                    logger.warning(f"Job {job_id} was reassigned; discarding result")
+                elif not ok:
+                    queue.fail(job_id, worker_id, "training failed")
+                elif queue.complete(job_id, worker_id, [Path(p) for p in _stage_artifacts(symbol, "train")]):
+                    completed += 1
+                    logger.info(f"✓ Published job {job_id} ({symbol})")
+            except Exception as e:
+                logger.error(f"Job {job_id} ({symbol}) failed: {e}", exc_info=True)
+                queue.fail(job_id, worker_id, str(e))
+    finally:
+        queue.close()
+    
+    logger.info(f"Worker {worker_id} finished {completed} jobs")
+    return completed
+
+
+def run_live() -> bool:
+    """
+    Poll live quotes and emit rolling-window predictions after each quote.
+    
+    Returns:
+        True when stopped normally, False on failure
+    """
+    logger.info("=" * 60)
+    logger.info("LIVE PREDICTIONS")
+    logger.info("=" * 60)
+    
+    try:
+        live = LivePredictor()
+        if not live.streams:
+            logger.error("No symbols ready for live mode. Run: python main.py --train")
+            return False
+        live.run()
+        return True
+    except Exception as e:
+        logger.error(f"Live mode failed: {e}", exc_info=True)
+        return False
+
+
+def fine_tune_models() -> bool:
+    """
+    Warm-start existing models on newly arrived data instead of retraining.
+    
+    Process:
+    1. Load the saved model, optimizer state and normalization params
+    2. Skip symbols with no bars after the model's cut-off date, symbols
+       served by a baseline backend, and sequence-trained models (these
+       must be retrained with --train)
+    3. Train a few epochs on the recent window plus replayed older samples
+    4. Save the updated model atomically, without its conformal
+       calibration (see below)
+    
+    The validation residuals behind conformal intervals were measured on
+    the model before fine-tuning, and the fine-tuned model has no window
+    it hasn't trained on to recalibrate with, so its intervals fall back
+    to MC dropout until the next --train.
+    
+    Returns:
+        True if every symbol was fine-tuned, skipped or already up to date
+    """
+    logger.info("\n" + "=" * 60)
+    logger.info("INCREMENTAL FINE-TUNING")
+    logger.info("=" * 60)
+    
+    processor = DataProcessor()
+    store = FeatureStore()
+    
+    tuned_count = 0
+    failed_symbols = []
+    skipped_symbols = []
+    
+    for symbol in Config.SYMBOLS:
+        logger.info(f"\nFine-tuning {symbol}...")
+        
+        try:
+            # Only the LSTM can be warm-started; baselines refit in seconds
+            selected = load_selection(symbol).get("backend", "lstm")
+            if selected != "lstm":
+                logger.warning(f"Skipping {symbol}: serving the {selected} backend, which is not fine-tuned. Run: python main.py --train")
+                skipped_symbols.append(symbol)
                 continue
             
-            # Normalize
-            X = processor.normalize_data(X, fit=True)
+            model = StockPricePredictor.load(symbol)
+            if model is None or "scaler_mean" not in model.metadata:
+                logger.warning(f"No fine-tunable model for {symbol}. Run: python main.py --train")
+                failed_symbols.append(symbol)
+                continue
+            if model.metadata.get("training_mode") == "sequence":
+                logger.warning(f"Skipping {symbol}: trained in sequence mode, which cannot be fine-tuned. Run: python main.py --train")
+                skipped_symbols.append(symbol)
+                continue
             
-            # Split
-            X_train, X_val, X_test, y_train, y_val, y_test = processor.split_dataset(
-                X, y,
-                test_size=Config.TEST_SPLIT,
-                validation_size=Config.VALIDATION_SPLIT,
-            )
+            features = model.metadata.get("feature_columns") or Config.FEATURES
+            df = store.load(symbol, features if "close" in features else features + ["close"])
+            if df is None:
+                failed_symbols.append(symbol)
+                continue
             
-            # Build and train model
-            input_shape = (Config.SEQUENCE_LENGTH, X.shape[-1])
-            model = StockPricePredictor(input_shape)
+            processor.scaler_mean = np.array(model.metadata["scaler_mean"], dtype=np.float32)
+            processor.scaler_std = np.array(model.metadata["scaler_std"], dtype=np.float32)
             
-            logger.info(f"\nTraining LSTM model for {symbol}...")
-            train_results = model.train(
-                X_train, y_train,
-                X_val, y_val,
-                symbol=symbol,
+            data = processor.prepare_finetune_data(
+                df,
+                sequence_length=model.input_shape[0],
+                trained_through=model.metadata.get("trained_through"),
+                feature_cols=features,
+                horizon=model.horizon,
             )
+            if data is None:
+                logger.info(f"✓ {symbol} is up to date")
+                continue
             
-            # Evaluate
-            logger.info(f"\nEvaluating model for {symbol}...")
-            test_results = model.evaluate(X_test, y_test)
-            
-            # Save
+            X, y = data
+            results = model.fine_tune(X, y, symbol=symbol)
+            model.metadata["trained_through"] = str(df["timestamp"].iloc[-1])
+            model.metadata.pop("conformal", None)
             model.save(name=symbol)
+            Config.get_residuals_path(symbol, "lstm").unlink(missing_ok=True)
             
-            # Log summary
-            logger.info(f"\n✓ Model training complete for {symbol}")
-            logger.info(f"  Train loss: {train_results['loss']:.6f}")
-            logger.info(f"  Val loss: {train_results['val_loss']:.6f}")
-            logger.info(f"  Test RMSE: {test_results['rmse']:.6f}")
-            logger.info(f"  Test MAPE: {test_results['mape']:.2f}%")
-            
-            trained_count += 1
+            tuned_count += 1
+            logger.info(f"✓ Fine-tuned {symbol} (loss: {results['loss']:.6f})")
             
         except Exception as e:
-            logger.error(f"Error training model for {symbol}: {e}", exc_info=True)
+            logger.error(f"Error fine-tuning {symbol}: {e}", exc_info=True)
             failed_symbols.append(symbol)
     
     logger.info("\n" + "=" * 60)
-    logger.info(f"Model training complete: {trained_count}/{len(Config.SYMBOLS)} symbols")
+    logger.info(f"Fine-tuning complete: {tuned_count} updated, {len(skipped_symbols)} skipped, {len(failed_symbols)} failed")
+    if skipped_symbols:
+        logger.info(f"Skipped symbols: {skipped_symbols}")
     if failed_symbols:
         logger.warning(f"Failed symbols: {failed_symbols}")
     logger.info("=" * 60)
@@ -265,10 +909,54 @@ def train_models() -> bool:
     return len(failed_symbols) == 0
 
 
+def tune_hyperparameters(symbols: Optional[List[str]] = None) -> bool:
+    """
+    Search LSTM hyperparameters with successive halving / Hyperband.
+    
+    Process:
+    1. Sample configurations from Config.TUNING_SEARCH_SPACE
+    2. Train all of them for a few epochs in parallel worker processes
+    3. Keep the best 1/eta and give them a larger epoch budget
+    4. Save the best configuration (picked up by train_models)
+    
+    Args:
+        symbols: Symbols to tune (default: first configured symbol)
+    
+    Returns:
+        True if a configuration was found for every symbol, False otherwise
+    """
+    logger.info("\n" + "=" * 60)
+    logger.info("HYPERPARAMETER SEARCH")
+    logger.info("=" * 60)
+    
+    symbols = symbols or Config.SYMBOLS[:1]
+    failed_symbols = []
+    
+    for symbol in symbols:
+        search = HyperparameterSearch(symbol)
+        best = search.run()
+        if best is None:
+            failed_symbols.append(symbol)
+            continue
+        
+        logger.info(f"\n✓ Tuning complete for {symbol}")
+        logger.info(f"  Trials run: {len(search.trials)}")
+        logger.info(f"  Best val loss: {best['val_loss']:.6f}")
+        logger.info(f"  Best hyperparameters: {best['hyperparams']}")
+    
+    if failed_symbols:
+        logger.warning(f"Failed symbols: {failed_symbols}")
+    
+    return len(failed_symbols) == 0
+
+
 def make_predictions() -> bool:
     """
     Make predictions for all configured symbols.
     
+    The results are written to the materialized prediction table that
+    the backend serves /api/predict/:symbol from.
+    
     Returns:
         True if successful, False otherwise
     """
@@ -280,14 +968,20 @@ def make_predictions() -> bool:
         predictor = StockPredictor()
         predictions = predictor.predict_all_symbols()
         predictor.print_predictions(predictions)
+        
+        # Materialize the run for the backend (swapped in atomically;
+        # symbols whose prediction failed or that other shards predict
+        # keep their previous row)
+        if predictions:
+            PredictionStore().write(predictions, symbols=load_universe()["symbol"].tolist())
         return True
     except Exception as e:
         logger.error(f"Prediction failed: {e}", exc_info=True)
         return False
 
 
-
-    """Display current rate limit status without making requests."""
+def show_status() -> None:
+    """Display current rate limit status and pipeline progress without making requests."""
     logger.info("\n" + "=" * 60)
     logger.info("RATE LIMIT STATUS")
     logger.info("=" * 60)
@@ -305,6 +999,15 @@ def make_predictions() -> bool:
     print(f"  Used: {stats['requests_today']}")
     print(f"  Remaining: {stats['remaining_today']}")
     print()
+    
+    # Progress of the most recent pipeline run
+    if Config.JOURNAL_PATH.exists():
+        journal = RunJournal()
+        run = journal.latest_run()
+        if run is not None:
+            print(journal.format_progress(run["run_id"]))
+            print()
+        journal.close()
     print("=" * 60)
 
 
@@ -317,8 +1020,18 @@ def main():
 Examples:
   python main.py --collect       # Collect data from IndianAPI
   python main.py --train         # Train models on processed data
-  python main.py --full          # Full pipeline: collect + process + train
-  python main.py --status        # Check rate limit status
+  python main.py --train --backends ridge gbm   # Only the fast baselines
+  python main.py --full          # Full pipeline: collect → process → train per symbol
+  python main.py --resume        # Continue an interrupted --full run
+  python main.py --process --shard 0/4   # First of 4 hosts, each taking a slice
+  python main.py --universe-features     # Once, after every shard has processed
+  python main.py --train --shard 0/4     # Then train each slice
+  python main.py --coordinator   # Enqueue training jobs for --worker processes
+  python main.py --worker        # Train jobs from the shared queue (any node)
+  python main.py --status        # Check rate limit status and run progress
+  python main.py --live          # Rolling predictions from live quotes
+  python main.py --finetune      # Update trained models with new data
+  python main.py --tune TCS      # Search hyperparameters for TCS
         """,
     )
     
@@ -342,6 +1055,38 @@ Examples:
         action="store_true",
         help="Run full pipeline (collect + process + train)",
     )
+    parser.add_argument(
+        "--shard",
+        metavar="INDEX/COUNT",
+        help="Only handle this hash slice of the universe, e.g. 0/4 "
+             "(default: PIPELINE_SHARD_INDEX/PIPELINE_SHARD_COUNT)",
+    )
+    parser.add_argument(
+        "--universe-features",
+        action="store_true",
+        help="Fetch the market index and update cross-sectional features and "
+             "correlations over the whole universe",
+    )
+    parser.add_argument(
+        "--coordinator",
+        action="store_true",
+        help="Enqueue training jobs for workers and collect the trained models",
+    )
+    parser.add_argument(
+        "--worker",
+        action="store_true",
+        help="Run a training worker against the shared work queue",
+    )
+    parser.add_argument(
+        "--exit-when-idle",
+        action="store_true",
+        help="With --worker: stop when the queue is empty",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue the last interrupted --full run, skipping completed stages",
+    )
     parser.add_argument(
         "--status",
         action="store_true",
@@ -352,6 +1097,29 @@ Examples:
         action="store_true",
         help="Make price predictions for all symbols",
     )
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        choices=available_backends(),
+        help="Model backends to train with --train/--full (default: Config.MODEL_BACKENDS)",
+    )
+    parser.add_argument(
+        "--live",
+        action="store_true",
+        help="Poll live quotes and update predictions after every quote",
+    )
+    parser.add_argument(
+        "--finetune",
+        action="store_true",
+        help="Warm-start existing models on new data (faster than --train)",
+    )
+    parser.add_argument(
+        "--tune",
+        nargs="*",
+        metavar="SYMBOL",
+        help="Search hyperparameters with successive halving / Hyperband "
+             "(default: first configured symbol)",
+    )
     
     args = parser.parse_args()
     
@@ -359,25 +1127,40 @@ Examples:
         # Validate configuration
         Config.validate()
         logger.info(f"Configuration loaded successfully")
+        
+        # This process's slice of the universe, highest priority first
+        shard = parse_shard(args.shard) if args.shard else (Config.SHARD_INDEX, Config.SHARD_COUNT)
+        Config.SHARD_INDEX, Config.SHARD_COUNT = shard
+        Config.SYMBOLS = load_symbols(*shard)
         logger.info(f"Symbols: {Config.SYMBOLS}")
         logger.info(f"History: {Config.HISTORY_DAYS} days")
         logger.info(f"Sequence length: {Config.SEQUENCE_LENGTH} days")
         
         # Full pipeline
-        if args.full:
-            collect_data()
-            process_data()
-            train_models()
+        if args.full or args.resume:
+            run_pipeline(args.backends, resume=args.resume)
         
         # Individual steps
         elif args.collect:
             collect_data()
         elif args.process:
             process_data()
+        elif args.universe_features:
+            update_universe_features()
         elif args.train:
-            train_models()
+            train_models(args.backends)
+        elif args.coordinator:
+            run_coordinator(args.backends)
+        elif args.worker:
+            run_worker(exit_when_idle=args.exit_when_idle)
         elif args.predict:
             make_predictions()
+        elif args.live:
+            run_live()
+        elif args.finetune:
+            fine_tune_models()
+        elif args.tune is not None:
+            tune_hyperparameters(args.tune)
         elif args.status:
             show_status()
         else:
@@ -5,21 +5,33 @@ Handles:
 - Building LSTM model architecture
 - Training on preprocessed time-series data
 - Evaluation metrics (MAE, RMSE, etc.)
-- Model checkpointing and saving
+- Best-weight tracking with background checkpoint writes, and saving
 - Prediction on new data
+- Execution profile: optional XLA compilation, a traced inference
+  function and TensorFlow thread/oneDNN settings
 """
 
+import hashlib
 import logging
+import os
+import threading
 from typing import Tuple, Optional, Dict, Any
 import numpy as np
 import json
 from pathlib import Path
 
+from config import Config
+from log_setup import get_logger
+
+# oneDNN is chosen when TensorFlow loads, so the flag must be set first
+if Config.TF_ENABLE_ONEDNN is not None:
+    os.environ.setdefault("TF_ENABLE_ONEDNN_OPTS", "1" if Config.TF_ENABLE_ONEDNN else "0")
+
 try:
     import tensorflow as tf
     from tensorflow import keras
     from tensorflow.keras import layers, models
-    from tensorflow.keras.callbacks import EarlyStopping, ModelCheckpoint
+    from tensorflow.keras.callbacks import Callback, EarlyStopping
     TENSORFLOW_AVAILABLE = True
 except ImportError:
     TENSORFLOW_AVAILABLE = False
@@ -28,18 +40,215 @@ except ImportError:
         "TensorFlow/Keras not available. Install with: pip install tensorflow"
     )
 
-from config import Config
+if TENSORFLOW_AVAILABLE:
+    class WindowBatches(keras.utils.Sequence):
+        """
+        Batches gathered from a strided window view (see tensor_cache.py).
+        
+        Only one batch of windows is copied into memory at a time instead
+        of materializing the full (num_sequences, sequence_length,
+        num_features) array.
+        """
+
+        def __init__(self, X: np.ndarray, y: np.ndarray, batch_size: int, shuffle: bool = False):
+            super().__init__()
+            self.X = X
+            self.y = y
+            self.batch_size = batch_size
+            self.shuffle = shuffle
+            self.indices = np.arange(len(X))
+            if shuffle:
+                np.random.shuffle(self.indices)
+
+        def __len__(self) -> int:
+            return int(np.ceil(len(self.X) / self.batch_size))
+
+        def __getitem__(self, index: int) -> Tuple[np.ndarray, np.ndarray]:
+            batch = np.sort(self.indices[index * self.batch_size:(index + 1) * self.batch_size])
+            return np.asarray(self.X[batch], dtype=np.float32), np.asarray(self.y[batch], dtype=np.float32)
+
+        def on_epoch_end(self) -> None:
+            if self.shuffle:
+                np.random.shuffle(self.indices)
+
+    class ChunkBatches(keras.utils.Sequence):
+        """
+        Contiguous chunks of one series for sequence-to-sequence training.
+        
+        Every chunk starts from a zero LSTM state: its first `burn_in`
+        steps only warm the state up and the remaining steps each carry
+        a loss, so gradients are truncated at the chunk length. Chunks
+        overlap by `burn_in` steps and each target is scored by exactly
+        one chunk per epoch. With shuffle, the chunk grid moves by a
+        random offset every epoch so targets see varying history.
+        
+        Batches are (x, y, sample_weight); the weights mask burn-in and
+        padding and are scaled so the loss is the mean over scored steps.
+        """
+
+        def __init__(
+            self,
+            rows: np.ndarray,
+            targets: np.ndarray,
+            chunk_length: int,
+            burn_in: int,
+            batch_size: int,
+            shuffle: bool = False,
+        ):
+            super().__init__()
+            self.rows = rows
+            self.targets = targets  # (num_rows, horizon), NaN where a step has no target
+            self.burn_in = burn_in
+            self.chunk_length = max(chunk_length, burn_in + 1)
+            self.batch_size = batch_size
+            self.shuffle = shuffle
+            self._layout(0)
+
+        def _layout(self, offset: int) -> None:
+            """Chunk starts and the end of the target range each one scores."""
+            stride = self.chunk_length - self.burn_in
+            starts = np.arange(offset, max(len(self.rows) - self.burn_in, 1), stride)
+            if offset > 0 or len(starts) == 0:
+                starts = np.concatenate([[0], starts])
+            self.starts = starts
+            self.ends = np.append(starts[1:] + self.burn_in, len(self.rows))
+            self.order = np.random.permutation(len(starts)) if self.shuffle else np.arange(len(starts))
+
+        def __len__(self) -> int:
+            return int(np.ceil(len(self.starts) / self.batch_size))
+
+        def __getitem__(self, index: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+            chunks = self.order[index * self.batch_size:(index + 1) * self.batch_size]
+            steps = self.starts[chunks, None] + np.arange(self.chunk_length)
+            inside = steps < len(self.rows)
+            steps = np.minimum(steps, len(self.rows) - 1)
+            
+            x = np.where(inside[..., None], self.rows[steps], 0).astype(np.float32)
+            y = self.targets[steps]
+            scored = (
+                inside
+                & (steps >= self.starts[chunks, None] + self.burn_in)
+                & (steps < self.ends[chunks, None])
+                & np.isfinite(y).all(axis=-1)
+            )
+            weights = scored * np.float32(scored.size / max(int(scored.sum()), 1))
+            return x, np.where(scored[..., None], y, 0).astype(np.float32), weights.astype(np.float32)
+
+        def on_epoch_end(self) -> None:
+            if self.shuffle:
+                self._layout(np.random.randint(self.chunk_length - self.burn_in))
+
+    class BestWeightsCheckpoint(Callback):
+        """
+        Best weights held in memory, checkpointed from a background thread.
+        
+        An improving epoch only snapshots the weights as NumPy arrays.
+        Every `every` epochs, and when training ends, the best snapshot
+        not yet on disk is written atomically by a writer thread, so
+        epochs never wait on file I/O. The best weights are restored
+        into the model when training ends.
+        """
+
+        def __init__(
+            self,
+            filepath: Optional[Path] = None,
+            monitor: str = "val_loss",
+            every: int = Config.CHECKPOINT_EVERY_EPOCHS,
+        ):
+            super().__init__()
+            self.filepath = filepath
+            self.monitor = monitor
+            self.every = max(int(every), 1)
+            self.best = np.inf
+            self.best_epoch: Optional[int] = None
+            self.best_weights: Optional[Dict[str, np.ndarray]] = None
+            self._written_epoch: Optional[int] = None
+            self._writer: Optional[threading.Thread] = None
+
+        def on_epoch_end(self, epoch: int, logs: Optional[Dict[str, float]] = None) -> None:
+            current = (logs or {}).get(self.monitor)
+            if current is not None and current < self.best:
+                self.best, self.best_epoch = float(current), epoch
+                self.best_weights = {
+                    f"{layer.name}/{i}": np.asarray(w)
+                    for layer in self.model.layers
+                    for i, w in enumerate(layer.get_weights())
+                }
+            if (epoch + 1) % self.every == 0:
+                self._checkpoint()
+
+        def on_train_end(self, logs: Optional[Dict[str, float]] = None) -> None:
+            if self.best_weights is None:
+                return
+            self._checkpoint()
+            if self._writer is not None:
+                self._writer.join()
+            for layer in self.model.layers:
+                if layer.weights:
+                    layer.set_weights([self.best_weights[f"{layer.name}/{i}"] for i in range(len(layer.weights))])
+            logger.info(f"Restored best weights from epoch {self.best_epoch + 1} ({self.monitor}={self.best:.6f})")
+
+        def _checkpoint(self) -> None:
+            """Hand the best snapshot to the writer thread if it isn't on disk yet."""
+            if self.filepath is None or self.best_weights is None or self._written_epoch == self.best_epoch:
+                return
+            if self._writer is not None:
+                self._writer.join()  # One write at a time, in order
+            self._written_epoch = self.best_epoch
+            self._writer = threading.Thread(
+                target=_write_checkpoint,
+                args=(self.filepath, self.best_weights, self.best_epoch, self.best),
+                daemon=True,
+            )
+            self._writer.start()
+
+
+def _write_checkpoint(filepath: Path, weights: Dict[str, np.ndarray], epoch: int, value: float) -> None:
+    """Write a weight snapshot (arrays keyed layer/index) atomically."""
+    tmp_path = filepath.with_name(f".{filepath.name}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            np.savez(f, epoch=epoch, val_loss=value, **weights)
+        os.replace(tmp_path, filepath)
+        logger.debug(f"Checkpointed epoch {epoch + 1} to {filepath}")
+    except OSError as e:
+        logger.warning(f"Checkpoint write to {filepath} failed: {e}")
+
+
+def _file_digest(path: Path) -> str:
+    """Fingerprint of a saved artifact's bytes."""
+    h = hashlib.blake2b(digest_size=12)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
 
-# Configure logging
-logging.basicConfig(
-    level=Config.LOG_LEVEL,
-    format=Config.LOG_FORMAT,
-    handlers=[
-        logging.FileHandler(Config.LOGS_DIR / "model.log"),
-        logging.StreamHandler(),
-    ],
-)
-logger = logging.getLogger(__name__)
+
+logger = get_logger(__name__, "model.log")
+
+
+def configure_threads(
+    intra_op: int = Config.TF_INTRA_OP_THREADS,
+    inter_op: int = Config.TF_INTER_OP_THREADS,
+) -> None:
+    """
+    Apply TensorFlow thread counts (0 keeps TensorFlow's default).
+    
+    Counts already set, e.g. by a tuning or pipeline worker initializer,
+    are left alone. Must run before TensorFlow executes its first op.
+    """
+    threading_config = tf.config.threading
+    try:
+        if intra_op and not threading_config.get_intra_op_parallelism_threads():
+            threading_config.set_intra_op_parallelism_threads(intra_op)
+        if inter_op and not threading_config.get_inter_op_parallelism_threads():
+            threading_config.set_inter_op_parallelism_threads(inter_op)
+    except RuntimeError as e:
+        logger.warning(f"TensorFlow thread counts not applied: {e}")
+
+
+if TENSORFLOW_AVAILABLE:
+    configure_threads()
 
 
 class StockPricePredictor:
@@ -50,7 +259,7 @@ class StockPricePredictor:
     - Input: Sequences of (sequence_length, num_features)
     - LSTM layers: Capture temporal patterns
     - Dense layers: Non-linear transformations
-    - Output: Next-day price (or direction)
+    - Output: Prices for the next `horizon` days in one forward pass
     
     Training:
     - Loss: Mean Squared Error (MSE)
@@ -58,13 +267,22 @@ class StockPricePredictor:
     - Early stopping: Prevent overfitting
     """
 
-    def __init__(self, input_shape: Tuple[int, int]):
+    def __init__(
+        self,
+        input_shape: Tuple[int, int],
+        hyperparams: Optional[Dict[str, Any]] = None,
+        horizon: int = Config.FORECAST_HORIZON,
+    ):
         """
         Initialize model architecture.
         
         Args:
             input_shape: (sequence_length, num_features)
                 Example: (10, 13) for 10 days of 13 features
+            hyperparams: Optional overrides for the Config defaults
+                (lstm_units, lstm_layers, dropout_rate, learning_rate,
+                batch_size), e.g. the best trial from tuning.py
+            horizon: Number of future closes the output layer predicts
         """
         if not TENSORFLOW_AVAILABLE:
             raise ImportError(
@@ -72,64 +290,145 @@ class StockPricePredictor:
             )
         
         self.input_shape = input_shape
+        self.horizon = int(horizon)
+        self.hyperparams = {**self.default_hyperparams(), **(hyperparams or {})}
+        self.xla_training = Config.EXECUTION_PROFILE == "xla"
+        self.xla_inference = Config.EXECUTION_PROFILE in ("xla", "xla_inference")
+        self._serving = None  # (keras model, traced forward pass), built on first predict
         self.model = self._build_model()
+        self.sequence_model = None  # Built on first sequence-mode train()
         self.history = None
         self.metadata = {}
 
-    def _build_model(self) -> keras.Model:
+    @staticmethod
+    def default_hyperparams() -> Dict[str, Any]:
+        """Hyperparameters taken from Config when no override is given."""
+        return {
+            "lstm_units": Config.LSTM_UNITS,
+            "lstm_layers": Config.LSTM_LAYERS,
+            "dropout_rate": Config.DROPOUT_RATE,
+            "learning_rate": Config.LEARNING_RATE,
+            "batch_size": Config.BATCH_SIZE,
+        }
+
+    def _build_model(self, sequences: bool = False) -> keras.Model:
         """
         Build LSTM model architecture.
         
-        Architecture:
+        Architecture (defaults):
         1. Input layer: (batch, sequence_length, num_features)
         2. LSTM layer 1: 64 units, return sequences
         3. Dropout: 0.2
         4. LSTM layer 2: 64 units
         5. Dropout: 0.2
         6. Dense layer: 32 units, ReLU
-        7. Output layer: 1 unit (price prediction)
+        7. Output layer: `horizon` units (one price per future day)
+        
+        The number of stacked LSTM layers, their width, the dropout
+        rate and the learning rate come from self.hyperparams.
+        
+        Args:
+            sequences: Build the sequence-training variant instead: any
+                input length, every LSTM returns sequences and the dense
+                head predicts at each timestep. Layer names and weight
+                shapes match the serving model.
         
         Returns:
             Compiled Keras model
         """
-        model = models.Sequential([
-            # First LSTM layer
-            layers.LSTM(
-                Config.LSTM_UNITS,
-                return_sequences=True,
-                input_shape=self.input_shape,
-                name="lstm_1"
-            ),
-            layers.Dropout(Config.DROPOUT_RATE, name="dropout_1"),
-            
-            # Second LSTM layer
-            layers.LSTM(
-                Config.LSTM_UNITS,
-                return_sequences=False,
-                name="lstm_2"
-            ),
-            layers.Dropout(Config.DROPOUT_RATE, name="dropout_2"),
-            
-            # Dense layers
-            layers.Dense(32, activation="relu", name="dense_1"),
-            layers.Dropout(Config.DROPOUT_RATE, name="dropout_3"),
-            
-            # Output layer
-            layers.Dense(1, name="output"),
-        ])
+        units = int(self.hyperparams["lstm_units"])
+        num_layers = max(1, int(self.hyperparams["lstm_layers"]))
+        dropout = float(self.hyperparams["dropout_rate"])
+        
+        input_shape = (None, self.input_shape[1]) if sequences else self.input_shape
+        model = models.Sequential([layers.Input(shape=input_shape)])
+        
+        # Stacked LSTM layers (only the last one collapses the sequence)
+        for i in range(num_layers):
+            model.add(layers.LSTM(
+                units,
+                return_sequences=sequences or i < num_layers - 1,
+                name=f"lstm_{i + 1}",
+            ))
+            model.add(layers.Dropout(dropout, name=f"dropout_{i + 1}"))
+        
+        # Dense layers
+        model.add(layers.Dense(32, activation="relu", name="dense_1"))
+        model.add(layers.Dropout(dropout, name=f"dropout_{num_layers + 1}"))
+        
+        # Output layer: the whole horizon at once (no recursive feedback)
+        model.add(layers.Dense(self.horizon, name="output"))
+        
+        self._compile_model(model, weighted=sequences)
+        
+        if not sequences:
+            logger.info("✓ Model architecture created")
+            model.summary()
+        
+        return model
+
+    def _compile_model(self, model: keras.Model, weighted: bool = False) -> None:
+        """
+        Compile with Adam optimizer and MSE loss.
         
-        # Compile with Adam optimizer and MSE loss
-        optimizer = keras.optimizers.Adam(learning_rate=Config.LEARNING_RATE)
+        With weighted=True the metrics honour sample weights (needed for
+        the masked per-timestep loss of sequence training). The "xla"
+        execution profile compiles the train step with XLA.
+        """
+        optimizer = keras.optimizers.Adam(
+            learning_rate=float(self.hyperparams["learning_rate"])
+        )
+        metrics = {"weighted_metrics" if weighted else "metrics": Config.METRICS}
         model.compile(
             optimizer=optimizer,
             loss=Config.LOSS_FUNCTION,
-            metrics=Config.METRICS,
+            jit_compile=True if self.xla_training else "auto",
+            **metrics,
         )
+
+    @staticmethod
+    def _series(X: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Recover the contiguous series behind consecutive windows.
         
-        logger.info("✓ Model architecture created")
-        model.summary()
+        Window i covers rows i..i+L-1 and its targets belong to the last
+        row, so the series is the first window followed by the last row
+        of every other window; the first L-1 rows have no target.
         
-        return model
+        Returns:
+            rows (N+L-1, num_features) and per-row targets
+            (N+L-1, horizon), NaN where none
+        """
+        if len(X) > 1 and not np.array_equal(X[1, :-1], X[0, 1:]):
+            raise ValueError("Sequence training needs consecutive windows (stride 1)")
+        y = np.asarray(y, dtype=np.float32).reshape(len(X), -1)
+        rows = np.concatenate([X[0], X[1:, -1]]).astype(np.float32)
+        targets = np.full((len(rows), y.shape[1]), np.nan, dtype=np.float32)
+        targets[X.shape[1] - 1:] = y
+        return rows, targets
+
+    def _sequence_batches(
+        self,
+        X: np.ndarray,
+        y: np.ndarray,
+        shuffle: bool = False,
+    ) -> "ChunkBatches":
+        """Chunk batches over the series behind windows X (burn-in = L-1)."""
+        rows, targets = self._series(X, y)
+        return ChunkBatches(
+            rows, targets,
+            chunk_length=Config.SEQUENCE_CHUNK_LENGTH,
+            burn_in=X.shape[1] - 1,
+            batch_size=Config.SEQUENCE_CHUNK_BATCH,
+            shuffle=shuffle,
+        )
+
+    @staticmethod
+    def _copy_weights(source: keras.Model, target: keras.Model) -> None:
+        """Copy weights between the serving and sequence models by layer name."""
+        for layer in target.layers:
+            if layer.weights:
+                layer.set_weights(source.get_layer(layer.name).get_weights())
 
     def train(
         self,
@@ -138,21 +437,35 @@ class StockPricePredictor:
         X_val: np.ndarray,
         y_val: np.ndarray,
         symbol: str = "stock",
+        epochs: Optional[int] = None,
+        initial_epoch: int = 0,
+        save_checkpoints: bool = True,
     ) -> Dict[str, Any]:
         """
         Train model on training data with validation.
         
         Features:
         - Early stopping: Stop if validation loss doesn't improve
-        - Model checkpointing: Save best model during training
+        - Best weights: kept in memory and restored at the end; written
+          to Config.get_checkpoint_path(symbol) every
+          Config.CHECKPOINT_EVERY_EPOCHS epochs and at the end by a
+          background thread
         - Learning rate scheduling: Optional (configured in Keras)
+        - Sequence mode (Config.TRAINING_MODE = "sequence"): the windows
+          are turned back into their series and trained as contiguous
+          chunks with a loss at every timestep, so each bar is processed
+          about once per epoch instead of up to sequence_length times.
+          The weights are copied into the serving model afterwards.
         
         Args:
             X_train: Training features (num_samples, sequence_length, num_features)
-            y_train: Training targets (num_samples,)
+            y_train: Training targets (num_samples, horizon)
             X_val: Validation features
             y_val: Validation targets
             symbol: Stock symbol (for logging and checkpointing)
+            epochs: Epoch to train up to (default: Config.EPOCHS)
+            initial_epoch: Epoch to resume from (used by tuning rungs)
+            save_checkpoints: Write the best weights to disk while training
             
         Returns:
             Dict with training history and metrics
@@ -162,30 +475,56 @@ class StockPricePredictor:
             f"Training data: {X_train.shape}, Validation data: {X_val.shape}"
         )
         
-        # Callbacks
-        checkpoint_path = Config.get_model_path(f"{symbol}_best")
+        # Sequence mode fits a return-sequences copy of the network,
+        # starting from the current weights (tuning rungs resume them)
+        sequence_mode = Config.TRAINING_MODE == "sequence"
+        fit_model = self.training_model(Config.TRAINING_MODE)
+        if sequence_mode:
+            self._copy_weights(self.model, fit_model)
+        
+        # Callbacks: early stopping only decides when to stop; the best
+        # weights are tracked (and restored) by the checkpoint callback
         early_stop = EarlyStopping(
             monitor="val_loss",
             patience=10,
-            restore_best_weights=True,
             verbose=1,
         )
-        checkpoint = ModelCheckpoint(
-            filepath=str(checkpoint_path),
-            monitor="val_loss",
-            save_best_only=True,
-            verbose=1,
+        checkpoint = BestWeightsCheckpoint(
+            Config.get_checkpoint_path(symbol) if save_checkpoints else None,
         )
+        callbacks = [early_stop, checkpoint]
+        
+        # Strided views from the tensor cache are fed batch by batch;
+        # plain arrays go to Keras directly
+        batch_size = int(self.hyperparams["batch_size"])
+        if sequence_mode:
+            data = {
+                "x": self._sequence_batches(X_train, y_train, shuffle=True),
+                "validation_data": self._sequence_batches(X_val, y_val),
+            }
+        elif X_train.base is not None and not X_train.flags["C_CONTIGUOUS"]:
+            data = {
+                "x": WindowBatches(X_train, y_train, batch_size, shuffle=True),
+                "validation_data": WindowBatches(X_val, y_val, batch_size),
+            }
+        else:
+            data = {
+                "x": X_train,
+                "y": y_train,
+                "validation_data": (X_val, y_val),
+                "batch_size": batch_size,
+            }
         
         # Train
-        history = self.model.fit(
-            X_train, y_train,
-            validation_data=(X_val, y_val),
-            epochs=Config.EPOCHS,
-            batch_size=Config.BATCH_SIZE,
-            callbacks=[early_stop, checkpoint],
+        history = fit_model.fit(
+            **data,
+            epochs=epochs or Config.EPOCHS,
+            initial_epoch=initial_epoch,
+            callbacks=callbacks,
             verbose=1,
         )
+        if sequence_mode:
+            self._copy_weights(fit_model, self.model)
         
         self.history = history
         
@@ -209,94 +548,185 @@ class StockPricePredictor:
             "final_mae": float(final_mae),
             "final_val_mae": float(final_val_mae),
             "epochs_trained": len(history.history["loss"]),
+            "best_epoch": None if checkpoint.best_epoch is None else checkpoint.best_epoch + 1,
+            "training_mode": Config.TRAINING_MODE,
+            "horizon": self.horizon,
             "input_shape": self.input_shape,
+            "hyperparams": self.hyperparams,
         }
         
         return {
             "loss": final_loss,
             "val_loss": final_val_loss,
+            "best_val_loss": float(np.nanmin(history.history["val_loss"])),
             "mae": final_mae,
             "val_mae": final_val_mae,
             "epochs": len(history.history["loss"]),
         }
 
+    def fine_tune(
+        self,
+        X: np.ndarray,
+        y: np.ndarray,
+        epochs: int = Config.FINETUNE_EPOCHS,
+        symbol: str = "stock",
+    ) -> Dict[str, Any]:
+        """
+        Continue training a loaded model on a small batch of recent data.
+        
+        Unlike train(), this keeps the current weights and optimizer
+        state and runs a fixed number of epochs without validation.
+        
+        Args:
+            X: Recent window plus replayed older sequences
+            y: Matching targets
+            epochs: Number of epochs to run
+            symbol: Stock symbol (for logging)
+            
+        Returns:
+            Dict with final loss and epochs run
+            
+        Raises:
+            ValueError: If the model was trained in sequence mode (the
+                replayed windows are not one contiguous series, so they
+                cannot be chunked for the sequence model)
+        """
+        if self.metadata.get("training_mode") == "sequence":
+            raise ValueError(f"{symbol} was trained in sequence mode; retrain it instead of fine-tuning")
+        
+        logger.info(f"Fine-tuning {symbol} on {len(X)} sequences for {epochs} epochs...")
+        
+        history = self.model.fit(
+            X, y,
+            epochs=epochs,
+            batch_size=int(self.hyperparams["batch_size"]),
+            shuffle=True,
+            verbose=0,
+        )
+        final_loss = float(history.history["loss"][-1])
+        
+        self.metadata["fine_tune_count"] = self.metadata.get("fine_tune_count", 0) + 1
+        self.metadata["last_fine_tune_loss"] = final_loss
+        
+        logger.info(f"✓ Fine-tuning complete (loss: {final_loss:.6f})")
+        return {"loss": final_loss, "epochs": epochs}
+
     def evaluate(
         self,
         X_test: np.ndarray,
         y_test: np.ndarray,
-    ) -> Dict[str, float]:
+    ) -> Dict[str, Any]:
         """
         Evaluate model on test set.
         
+        Runs a single inference pass; every metric (including per-horizon
+        errors and directional accuracy) is computed from that one
+        prediction array.
+        
         Args:
-            X_test: Test features
+            X_test: Test features (consecutive windows)
             y_test: Test targets
             
         Returns:
             Dict with loss and metrics
         """
-        logger.info("Evaluating on test set...")
+        from backends import reference_prices, regression_metrics
         
-        loss, mae, mse = self.model.evaluate(X_test, y_test, verbose=0)
-        
-        # Compute RMSE
-        rmse = np.sqrt(mse)
+        logger.info("Evaluating on test set...")
         
-        # Get predictions for additional metrics
-        y_pred = self.model.predict(X_test, verbose=0)
-        mape = self._compute_mape(y_test, y_pred)
+        y_pred = self.predict(X_test)
+        results = regression_metrics(y_test, y_pred, reference=reference_prices(y_test))
         
         logger.info(f"✓ Test Results:")
-        logger.info(f"  Loss (MSE): {loss:.6f}")
-        logger.info(f"  MAE: {mae:.6f}")
-        logger.info(f"  RMSE: {rmse:.6f}")
-        logger.info(f"  MAPE: {mape:.2f}%")
+        logger.info(f"  Loss (MSE): {results['loss']:.6f}")
+        logger.info(f"  MAE: {results['mae']:.6f}")
+        logger.info(f"  RMSE: {results['rmse']:.6f}")
+        logger.info(f"  MAPE: {results['mape']:.2f}%")
+        logger.info(f"  Directional accuracy: {results['directional_accuracy']:.1%}")
         
-        return {
-            "loss": float(loss),
-            "mae": float(mae),
-            "mse": float(mse),
-            "rmse": float(rmse),
-            "mape": float(mape),
-        }
+        return results
 
-    @staticmethod
-    def _compute_mape(y_true: np.ndarray, y_pred: np.ndarray) -> float:
+    def predict(self, X: np.ndarray) -> np.ndarray:
         """
-        Compute Mean Absolute Percentage Error.
-        
-        MAPE = mean(|y_true - y_pred| / |y_true|) * 100
+        Make predictions on new data.
         
         Args:
-            y_true: Actual values
-            y_pred: Predicted values
+            X: Features (num_samples, sequence_length, num_features)
             
         Returns:
-            MAPE percentage
+            Predictions (num_samples, horizon)
         """
-        # Avoid division by zero
-        mask = y_true != 0
-        if mask.sum() == 0:
-            return 0.0
-        
-        mape = np.mean(np.abs((y_true[mask] - y_pred[mask]) / y_true[mask])) * 100
-        return mape
+        if not self.xla_inference:
+            return self.model.predict(X, verbose=0)
+        
+        # Single windows run as is; anything larger goes through in
+        # INFERENCE_BATCH_SIZE batches (the last one zero-padded), so the
+        # compiled function only ever sees two shapes
+        serve = self._serving_function()
+        if len(X) <= 1:
+            return serve(np.asarray(X, dtype=np.float32)).numpy()
+        step = Config.INFERENCE_BATCH_SIZE
+        batches = []
+        for i in range(0, len(X), step):
+            batch = np.asarray(X[i:i + step], dtype=np.float32)
+            if len(batch) < step:
+                batch = np.concatenate([batch, np.zeros((step - len(batch), *batch.shape[1:]), np.float32)])
+            batches.append(serve(batch).numpy())
+        return np.concatenate(batches)[:len(X)]
 
-    def predict(self, X: np.ndarray) -> np.ndarray:
+    def _serving_function(self):
+        """Forward pass traced once for (None, sequence_length, num_features) float32 input."""
+        if self._serving is None or self._serving[0] is not self.model:
+            model = self.model
+            forward = tf.function(
+                lambda x: model(x, training=False),
+                input_signature=[tf.TensorSpec((None, *self.input_shape), tf.float32)],
+                jit_compile=True,
+            )
+            self._serving = (model, forward)
+        return self._serving[1]
+
+    def predict_distribution(
+        self,
+        X: np.ndarray,
+        samples: int = Config.MC_DROPOUT_SAMPLES,
+        coverage: float = Config.PREDICTION_INTERVAL,
+    ) -> Dict[str, np.ndarray]:
         """
-        Make predictions on new data.
+        Monte-Carlo dropout predictive distribution.
+        
+        Every window is tiled `samples` times and the whole stack goes
+        through the network in one forward call with dropout active, so
+        each copy gets its own dropout mask; the interval costs about
+        one batched inference instead of `samples` separate ones.
         
         Args:
             X: Features (num_samples, sequence_length, num_features)
+            samples: Stochastic passes per window
+            coverage: Probability mass between lower and upper
             
         Returns:
-            Predictions (num_samples,)
+            Dict of (num_samples, horizon) arrays: mean, std, lower, upper
         """
-        return self.model.predict(X, verbose=0)
+        from backends import summarize_draws
+        
+        tiled = np.repeat(np.asarray(X, dtype=np.float32), samples, axis=0)
+        step = Config.MC_DROPOUT_MAX_BATCH
+        draws = np.concatenate([
+            np.asarray(self.model(tiled[i:i + step], training=True))
+            for i in range(0, len(tiled), step)
+        ])
+        return summarize_draws(draws.reshape(len(X), samples, -1).astype(np.float64), coverage)
 
     def save(self, name: str = "stock_predictor") -> Path:
         """
-        Save trained model and metadata.
+        Save trained model, optimizer state and metadata.
+        
+        Each file is written to a temporary path and renamed into place,
+        so a reader never sees a half-written artifact. Metadata is
+        written last and records a digest of the model and optimizer
+        files, so load() can reject a set of files from different saves
+        (e.g. after a crash between renames).
         
         Args:
             name: Model name (default: stock_predictor)
@@ -307,13 +737,26 @@ class StockPricePredictor:
         model_path = Config.get_model_path(name)
         
         try:
-            self.model.save(str(model_path))
+            # Save the state of the optimizer that trained the weights
+            # (the sequence model's in sequence mode) for warm starts
+            optimizer_path = model_path.with_suffix(".optimizer.npz")
+            self.save_optimizer_state(optimizer_path, self.training_model())
+            
+            tmp_path = model_path.with_name(f".{model_path.stem}.tmp{model_path.suffix}")
+            self.model.save(str(tmp_path))
+            os.replace(tmp_path, model_path)
             logger.info(f"✓ Saved model to {model_path}")
             
-            # Save metadata
+            # Save metadata, tying it to the files just written
+            self.metadata["artifacts"] = {
+                "model": _file_digest(model_path),
+                "optimizer": _file_digest(optimizer_path),
+            }
             metadata_path = model_path.with_suffix(".json")
-            with open(metadata_path, "w") as f:
+            tmp_path = metadata_path.with_name(f".{metadata_path.name}.tmp")
+            with open(tmp_path, "w") as f:
                 json.dump(self.metadata, f, indent=2)
+            os.replace(tmp_path, metadata_path)
             logger.info(f"✓ Saved metadata to {metadata_path}")
             
             return model_path
@@ -321,6 +764,67 @@ class StockPricePredictor:
             logger.error(f"Failed to save model: {e}")
             raise
 
+    def training_model(self, mode: Optional[str] = None) -> keras.Model:
+        """
+        Model that train() fits: the return-sequences copy in sequence mode.
+        
+        Args:
+            mode: Training mode (default: the mode in the model's metadata,
+                Config.TRAINING_MODE for a model not trained yet)
+        """
+        mode = mode or self.metadata.get("training_mode", Config.TRAINING_MODE)
+        if mode != "sequence":
+            return self.model
+        if self.sequence_model is None:
+            self.sequence_model = self._build_model(sequences=True)
+        return self.sequence_model
+
+    def save_optimizer_state(self, optimizer_path: Path, model: Optional[keras.Model] = None) -> None:
+        """
+        Save optimizer variables (step count, learning rate, Adam moments).
+        
+        Args:
+            optimizer_path: Path to the .optimizer.npz file
+            model: Model whose optimizer is saved (default: the serving model)
+        """
+        model = self.model if model is None else model
+        tmp_path = optimizer_path.with_name(f".{optimizer_path.name}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, *[np.asarray(v) for v in model.optimizer.variables])
+        os.replace(tmp_path, optimizer_path)
+
+    def restore_optimizer_state(self, optimizer_path: Path, model: Optional[keras.Model] = None) -> bool:
+        """
+        Restore optimizer variables saved by save_optimizer_state().
+        
+        Args:
+            optimizer_path: Path to the .optimizer.npz file
+            model: Model whose optimizer is restored (default: the serving model)
+            
+        Returns:
+            True if the state was restored, False otherwise
+        """
+        if not optimizer_path.exists():
+            return False
+        
+        model = self.model if model is None else model
+        optimizer = model.optimizer
+        optimizer.build(model.trainable_variables)
+        
+        with np.load(optimizer_path) as saved:
+            values = [saved[f"arr_{i}"] for i in range(len(saved.files))]
+        
+        variables = list(optimizer.variables)
+        if len(values) != len(variables) or any(
+            tuple(v.shape) != value.shape for v, value in zip(variables, values)
+        ):
+            logger.warning(f"Optimizer state at {optimizer_path} does not match model, ignoring")
+            return False
+        
+        for variable, value in zip(variables, values):
+            variable.assign(value)
+        return True
+
     @staticmethod
     def load(name: str = "stock_predictor") -> Optional["StockPricePredictor"]:
         """
@@ -330,7 +834,8 @@ class StockPricePredictor:
             name: Model name
             
         Returns:
-            StockPricePredictor instance or None if not found
+            StockPricePredictor instance or None if not found or the
+            files on disk come from different saves
         """
         model_path = Config.get_model_path(name)
         
@@ -339,8 +844,6 @@ class StockPricePredictor:
             return None
         
         try:
-            keras_model = keras.models.load_model(str(model_path))
-            
             # Load metadata
             metadata_path = model_path.with_suffix(".json")
             metadata = {}
@@ -348,11 +851,35 @@ class StockPricePredictor:
                 with open(metadata_path, "r") as f:
                     metadata = json.load(f)
             
+            # Models saved before digests were recorded are loaded as-is
+            optimizer_path = model_path.with_suffix(".optimizer.npz")
+            artifacts = metadata.get("artifacts")
+            if artifacts and (
+                _file_digest(model_path) != artifacts["model"]
+                or not optimizer_path.exists()
+                or _file_digest(optimizer_path) != artifacts["optimizer"]
+            ):
+                logger.error(f"Model files for {name} come from different saves, refusing to load")
+                return None
+            
+            try:
+                keras_model = keras.models.load_model(str(model_path))
+                compiled = True
+            except (ValueError, TypeError):
+                # Newer Keras versions can't deserialize the compile config
+                # of legacy .h5 files; load the weights and recompile instead
+                keras_model = keras.models.load_model(str(model_path), compile=False)
+                compiled = False
+            
             # Create instance
             input_shape = tuple(keras_model.input_shape[1:])
-            predictor = StockPricePredictor(input_shape)
+            horizon = keras_model.output_shape[-1]
+            predictor = StockPricePredictor(input_shape, metadata.get("hyperparams"), horizon=horizon)
             predictor.model = keras_model
             predictor.metadata = metadata
+            if not compiled or predictor.xla_training:
+                predictor._compile_model(keras_model)
+            predictor.restore_optimizer_state(optimizer_path, predictor.training_model())
             
             logger.info(f"✓ Loaded model from {model_path}")
             return predictor
@@ -3,31 +3,27 @@ Prediction module for stock price forecasting.
 
 Handles:
 - Loading trained models
+- Reading the model's features from the feature store
 - Making predictions on new data
 - Interpreting prediction results
-- Confidence scoring
+- Prediction intervals (conformal from validation residuals, or MC dropout)
+- Optional stateful LSTM inference (one timestep per new bar)
 """
 
-import logging
 from typing import Dict, List, Optional, Tuple
 import numpy as np
 import pandas as pd
 from pathlib import Path
 
 from config import Config
+from log_setup import HotPathLogger, get_logger
 from data_processor import DataProcessor
-from model import StockPricePredictor
+from features import FeatureStore
+from backends import ModelBackend, load_backend, predict_interval
+from stateful import StatefulLSTM
 
-# Configure logging
-logging.basicConfig(
-    level=Config.LOG_LEVEL,
-    format=Config.LOG_FORMAT,
-    handlers=[
-        logging.FileHandler(Config.LOGS_DIR / "prediction.log"),
-        logging.StreamHandler(),
-    ],
-)
-logger = logging.getLogger(__name__)
+logger = get_logger(__name__, "prediction.log")
+hot_logger = HotPathLogger(logger)
 
 
 class StockPredictor:
@@ -39,14 +35,16 @@ class StockPredictor:
     2. Load historical data for feature extraction
     3. Prepare latest data as input
     4. Make prediction for next day's price
-    5. Return prediction with confidence interval
+    5. Return prediction with a predictive interval
     """
 
     def __init__(self):
         """Initialize predictor."""
         self.processor = DataProcessor()
+        self.store = FeatureStore()
         self.models = {}  # Cache for loaded models
         self.scaler_params = {}  # Cache for normalization params
+        self.stateful = StatefulLSTM() if Config.STATEFUL_INFERENCE else None
 
     def predict_next_day(self, symbol: str) -> Optional[Dict]:
         """
@@ -56,9 +54,10 @@ class StockPredictor:
             symbol: Stock symbol (e.g., "TCS")
             
         Returns:
-            Dict with prediction, confidence, and metadata or None if failed
+            Dict with the next-day prediction, interval bounds, the full
+            multi-day forecast, and metadata or None if failed
         """
-        logger.info(f"Preparing prediction for {symbol}...")
+        hot_logger.info("Preparing prediction for %s...", symbol)
         
         try:
             # Load model
@@ -67,41 +66,77 @@ class StockPredictor:
                 logger.error(f"Model not found for {symbol}")
                 return None
             
-            # Load processed data
-            df = self.processor.load_processed_data(symbol)
+            # Load exactly the features the model was trained on
+            features = model.metadata.get("feature_columns") or Config.FEATURES
+            df = self.store.load(symbol, features if "close" in features else features + ["close"])
             if df is None:
                 logger.error(f"Processed data not found for {symbol}")
                 return None
             
             # Get latest sequence
-            X_latest = self._prepare_input(df, symbol)
+            X_latest = self._prepare_input(df[["timestamp"] + features], symbol, model)
             if X_latest is None:
                 logger.error(f"Could not prepare input for {symbol}")
                 return None
             
-            # Make prediction
-            prediction = model.predict(X_latest)[0][0]
+            # LSTM state advanced over just the bars since the last call. The
+            # state carries history beyond one window, so it only matches
+            # models trained on contiguous sequences
+            mean = None
+            if self.stateful is not None and model.metadata.get("backend", "lstm") == "lstm":
+                if model.metadata.get("training_mode") == "sequence":
+                    mean = self.stateful.predict(symbol, model, df[["timestamp"] + features])
+                else:
+                    hot_logger.warning(
+                        "%s was trained on windows (training_mode=%s); using windowed prediction "
+                        "instead of stateful inference",
+                        symbol, model.metadata.get("training_mode", "window"),
+                    )
+            
+            # Point prediction plus bounds (precomputed conformal half-width,
+            # or MC dropout when configured / uncalibrated) for every horizon
+            # step from the same forward pass
+            interval = predict_interval(model, X_latest, mean=mean)
+            horizon_mean, horizon_lower, horizon_upper = (interval[k][0] for k in ("mean", "lower", "upper"))
+            prediction, lower, upper = horizon_mean[0], horizon_lower[0], horizon_upper[0]
             
             # Get current price for reference
             current_price = df['close'].iloc[-1]
+            backend = model.metadata.get("backend", "lstm")
             price_change = prediction - current_price
             percent_change = (price_change / current_price) * 100
             
-            # Create confidence interval
-            confidence = self._estimate_confidence(model, X_latest)
-            
             result = {
                 "symbol": symbol,
                 "current_price": float(current_price),
                 "predicted_price": float(prediction),
                 "price_change": float(price_change),
                 "percent_change": float(percent_change),
-                "confidence": float(confidence),
+                "lower_bound": float(lower),
+                "upper_bound": float(upper),
+                "interval_coverage": Config.PREDICTION_INTERVAL,
+                "interval_method": interval["method"],
+                # Lower bound as a move from the current price, for position sizing
+                "downside_percent": float((lower - current_price) / current_price * 100),
+                "interval_width_percent": float((upper - lower) / current_price * 100),
                 "direction": "UP" if price_change > 0 else "DOWN",
+                "forecast": [
+                    {
+                        "step": step + 1,
+                        "predicted_price": float(horizon_mean[step]),
+                        "lower_bound": float(horizon_lower[step]),
+                        "upper_bound": float(horizon_upper[step]),
+                    }
+                    for step in range(len(horizon_mean))
+                ],
                 "data_points": len(df),
+                "as_of": pd.Timestamp(df["timestamp"].iloc[-1]).isoformat(),
+                "backend": backend,
+                # Identifies the trained model that produced the prediction
+                "model_version": f"{backend}@{model.metadata.get('trained_through', 'unknown')}",
             }
             
-            logger.info(f"✓ Prediction for {symbol}: {prediction:.2f} ({percent_change:+.2f}%)")
+            hot_logger.info("✓ Prediction for %s: %.2f (%+.2f%%)", symbol, prediction, percent_change)
             return result
             
         except Exception as e:
@@ -129,82 +164,70 @@ class StockPredictor:
         logger.info(f"\n✓ Completed predictions for {len(predictions)}/{len(Config.SYMBOLS)} symbols")
         return predictions
 
-    def _load_model(self, symbol: str) -> Optional[StockPricePredictor]:
-        """Load cached or new model."""
+    def _load_model(self, symbol: str) -> Optional[ModelBackend]:
+        """Load cached or new model (whichever backend was selected in training)."""
         if symbol in self.models:
             return self.models[symbol]
         
-        model = StockPricePredictor.load(symbol)
+        model = load_backend(symbol)
         if model:
             self.models[symbol] = model
         
         return model
 
-    def _prepare_input(self, df: pd.DataFrame, symbol: str) -> Optional[np.ndarray]:
+    def _prepare_input(
+        self,
+        df: pd.DataFrame,
+        symbol: str,
+        model: ModelBackend,
+    ) -> Optional[np.ndarray]:
         """
         Prepare latest data as input for model.
         
         Args:
             df: DataFrame with all features
             symbol: Stock symbol
+            model: Loaded model (window length and normalization params)
             
         Returns:
             Input array (1, sequence_length, num_features) or None
         """
+        sequence_length = model.input_shape[0]
+        
         # Get last sequence_length days
-        if len(df) < Config.SEQUENCE_LENGTH:
-            logger.warning(f"Insufficient data for {symbol}: {len(df)} < {Config.SEQUENCE_LENGTH}")
+        if len(df) < sequence_length:
+            logger.warning(f"Insufficient data for {symbol}: {len(df)} < {sequence_length}")
             return None
         
-        latest_data = df.tail(Config.SEQUENCE_LENGTH)
+        latest_data = df.tail(sequence_length)
         
         # Select feature columns (exclude timestamp)
         feature_cols = [c for c in df.columns if c != "timestamp"]
         X = latest_data[feature_cols].values.astype(np.float32)
         
         # Normalize using same parameters as training
-        # For now, use identity (not normalizing for prediction)
-        # In production, load scaler from saved model metadata
+        if "scaler_mean" in model.metadata:
+            X = (X - np.array(model.metadata["scaler_mean"], dtype=np.float32)) / \
+                np.array(model.metadata["scaler_std"], dtype=np.float32)
         
         # Reshape to (1, sequence_length, num_features)
-        X = X.reshape(1, Config.SEQUENCE_LENGTH, -1)
+        X = X.reshape(1, sequence_length, -1)
         
         return X
 
-    @staticmethod
-    def _estimate_confidence(model: StockPricePredictor, X: np.ndarray) -> float:
-        """
-        Estimate confidence level for prediction.
-        
-        Args:
-            model: Trained model
-            X: Input data
-            
-        Returns:
-            Confidence score 0-100
-        """
-        # Basic confidence: based on training loss
-        # Higher training loss → lower confidence
-        if hasattr(model, 'metadata') and 'final_val_mae' in model.metadata:
-            mae = model.metadata['final_val_mae']
-            # Convert MAE to confidence (lower error = higher confidence)
-            confidence = max(0, min(100, 100 - (mae * 100)))
-        else:
-            confidence = 75.0  # Default confidence
-        
-        return confidence
-
     def print_predictions(self, predictions: List[Dict]) -> None:
         """Print predictions in formatted table."""
         if not predictions:
             logger.warning("No predictions to display")
             return
         
-        print("\n" + "=" * 100)
+        coverage = int(round(100 * Config.PREDICTION_INTERVAL))
+        print("\n" + "=" * 124)
         print("NEXT-DAY PRICE PREDICTIONS")
-        print("=" * 100)
-        print(f"{'Symbol':<10} {'Current':<12} {'Predicted':<12} {'Change':<12} {'%Change':<10} {'Direction':<8} {'Confidence':<12}")
-        print("-" * 100)
+        print("=" * 124)
+        print(f"{'Symbol':<10} {'Current':<12} {'Predicted':<12} {'Change':<12} {'%Change':<10} {'Direction':<8} "
+              f"{'Downside':<12} {f'{coverage}% interval':<24}")
+        print("-" * 124)
         
         for pred in predictions:
             symbol = pred['symbol']
@@ -213,18 +236,27 @@ class StockPredictor:
             change = pred['price_change']
             pct = pred['percent_change']
             direction = pred['direction']
-            conf = pred['confidence']
+            downside = pred['downside_percent']
+            interval = f"₹{pred['lower_bound']:.2f} – ₹{pred['upper_bound']:.2f}"
             
             # Color coding (would be actual colors in terminal)
             direction_symbol = "↑" if direction == "UP" else "↓"
             
             print(f"{symbol:<10} ₹{current:<11.2f} ₹{predicted:<11.2f} "
-                  f"₹{change:<11.2f} {pct:>8.2f}% {direction_symbol} {direction:<6} {conf:>10.1f}%")
+                  f"₹{change:<11.2f} {pct:>8.2f}% {direction_symbol} {direction:<6} {downside:>10.2f}%  {interval:<24}")
+        
+        print("=" * 124)
         
-        print("=" * 100)
+        # Multi-day outlook (models trained with FORECAST_HORIZON > 1)
+        multi_day = [p for p in predictions if len(p.get('forecast', [])) > 1]
+        if multi_day:
+            print("\nMulti-day forecast:")
+            for pred in multi_day:
+                steps = "  ".join(f"+{f['step']}d ₹{f['predicted_price']:.2f}" for f in pred['forecast'])
+                print(f"  {pred['symbol']:<10} {steps}")
         
         # Summary statistics
-        avg_confidence = np.mean([p['confidence'] for p in predictions])
+        avg_width = np.mean([p['interval_width_percent'] for p in predictions])
         up_count = len([p for p in predictions if p['direction'] == 'UP'])
         down_count = len([p for p in predictions if p['direction'] == 'DOWN'])
         
@@ -232,8 +264,8 @@ class StockPredictor:
         print(f"  Total symbols: {len(predictions)}")
         print(f"  Predicted UP: {up_count}")
         print(f"  Predicted DOWN: {down_count}")
-        print(f"  Average confidence: {avg_confidence:.1f}%")
-        print("=" * 100 + "\n")
+        print(f"  Average {coverage}% interval width: {avg_width:.2f}%")
+        print("=" * 124 + "\n")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,226 @@
+"""
+Materialized prediction table for serving.
+
+Handles:
+- Writing the predictions of a whole `--predict` run as one versioned
+  SQLite table, one row per symbol keyed by symbol
+- Swapping the new table in atomically: it is built in a temporary file
+  and renamed over Config.PREDICTION_STORE_PATH, so readers keep using
+  the old table until the rename and never see a partial one
+- Carrying forward the previous row of a symbol whose prediction failed
+  in this run, or that another shard predicts (it keeps its old version
+  and as_of)
+- Serializing writers (e.g. `--predict --shard` on several hosts) with a
+  lock, so each one builds on the table the previous one swapped in
+- Single indexed lookups by symbol for the serving path
+"""
+
+import json
+import os
+import sqlite3
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from config import Config
+from log_setup import get_logger
+
+logger = get_logger(__name__, "prediction.log")
+
+# Seconds a writer waits for another writer to swap its table in
+LOCK_TIMEOUT = 600
+
+# WITHOUT ROWID: the rows live in the primary-key B-tree, so a lookup by
+# symbol is one index search
+SCHEMA = """
+CREATE TABLE predictions (
+    symbol TEXT PRIMARY KEY,
+    version TEXT NOT NULL,
+    as_of TEXT,
+    current_price REAL NOT NULL,
+    predicted_price REAL NOT NULL,
+    price_change REAL NOT NULL,
+    percent_change REAL NOT NULL,
+    direction TEXT NOT NULL,
+    lower_bound REAL NOT NULL,
+    upper_bound REAL NOT NULL,
+    interval_coverage REAL NOT NULL,
+    interval_method TEXT NOT NULL,
+    downside_percent REAL NOT NULL,
+    interval_width_percent REAL NOT NULL,
+    forecast TEXT NOT NULL,
+    backend TEXT,
+    model_version TEXT,
+    data_points INTEGER
+) WITHOUT ROWID;
+CREATE TABLE build (
+    version TEXT NOT NULL,
+    generated_at TEXT NOT NULL,
+    symbols INTEGER NOT NULL,
+    carried INTEGER NOT NULL
+);
+"""
+
+COLUMNS = [
+    "symbol", "version", "as_of", "current_price", "predicted_price", "price_change",
+    "percent_change", "direction", "lower_bound", "upper_bound", "interval_coverage",
+    "interval_method", "downside_percent", "interval_width_percent", "forecast", "backend",
+    "model_version", "data_points",
+]
+
+
+class PredictionStore:
+    """
+    Versioned prediction table in a single SQLite file.
+
+    Every write() builds a complete new table and replaces the file in
+    one rename; the version (UTC build time) is stored on every row so a
+    lookup returns it without a second query. Rows carried forward from
+    an earlier table keep that table's version.
+    """
+
+    def __init__(self, path: Path = Config.PREDICTION_STORE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock_path = self.path.with_name(f".{self.path.name}.lock")
+
+    @contextmanager
+    def _write_lock(self) -> Iterator[None]:
+        """
+        Hold the writer lock across processes and hosts.
+
+        The lock is an exclusive transaction on a side SQLite file, so it
+        works wherever the table itself can be shared and is released if
+        the writer dies.
+        """
+        conn = sqlite3.connect(str(self.lock_path), timeout=LOCK_TIMEOUT, isolation_level=None)
+        try:
+            conn.execute("BEGIN EXCLUSIVE")
+            yield
+        finally:
+            conn.close()
+
+    def _previous_rows(self, exclude: Set[str], symbols: Optional[List[str]]) -> List[tuple]:
+        """Rows of the current table for symbols not in `exclude` (limited to `symbols` if given)."""
+        conn = self._connect()
+        if conn is None:
+            return []
+        try:
+            rows = conn.execute(f"SELECT {', '.join(COLUMNS)} FROM predictions").fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not read the previous prediction table: {e}")
+            return []
+        finally:
+            conn.close()
+        keep = None if symbols is None else set(symbols)
+        return [
+            tuple(row) for row in rows
+            if row["symbol"] not in exclude and (keep is None or row["symbol"] in keep)
+        ]
+
+    def write(self, predictions: List[Dict[str, Any]], symbols: Optional[List[str]] = None) -> str:
+        """
+        Materialize a prediction run and swap it in.
+
+        Symbols without a prediction in this run keep their previous row,
+        so a failed prediction serves the last good one instead of none,
+        and a shard's write keeps the rows of the other shards.
+
+        Args:
+            predictions: Results of StockPredictor.predict_next_day
+            symbols: The whole universe (not just this shard); previous rows
+                are only carried forward for these symbols (all of them if None)
+
+        Returns:
+            Version of the new table
+        """
+        # Unique per writer: a crashed writer's leftover never collides with ours
+        tmp_path = self.path.with_name(f".{self.path.name}.{uuid.uuid4().hex}.tmp")
+        with self._write_lock():
+            # Versions are taken under the lock, so they increase in swap order
+            generated_at = datetime.utcnow()
+            version = generated_at.strftime("%Y%m%dT%H%M%S%fZ")
+            rows = [
+                (
+                    p["symbol"], version, p.get("as_of"), p["current_price"], p["predicted_price"],
+                    p["price_change"], p["percent_change"], p["direction"], p["lower_bound"],
+                    p["upper_bound"], p["interval_coverage"], p["interval_method"], p["downside_percent"],
+                    p["interval_width_percent"], json.dumps(p["forecast"]), p.get("backend"),
+                    p.get("model_version"), p.get("data_points"),
+                )
+                for p in predictions
+            ]
+            carried = self._previous_rows({p["symbol"] for p in predictions}, symbols)
+
+            try:
+                conn = sqlite3.connect(str(tmp_path))
+                try:
+                    conn.executescript(SCHEMA)
+                    conn.executemany(
+                        f"INSERT INTO predictions ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                        rows + carried,
+                    )
+                    conn.execute(
+                        "INSERT INTO build (version, generated_at, symbols, carried) VALUES (?, ?, ?, ?)",
+                        (version, generated_at.isoformat(), len(rows) + len(carried), len(carried)),
+                    )
+                    conn.commit()
+                finally:
+                    conn.close()
+                os.replace(tmp_path, self.path)
+            finally:
+                tmp_path.unlink(missing_ok=True)  # Left over only if the build failed
+
+        logger.info(f"✓ Materialized {len(rows)} predictions (version {version}) at {self.path}")
+        if carried:
+            logger.warning(
+                f"Kept previous predictions for {len(carried)} symbols without a new one: "
+                f"{sorted(row[0] for row in carried)}"
+            )
+        return version
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """Read-only connection to the current table, or None if none was written."""
+        if not self.path.exists():
+            return None
+        conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def get(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up one symbol's materialized prediction.
+
+        Returns:
+            Row as a dict (forecast decoded) or None if not in the table
+        """
+        conn = self._connect()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute("SELECT * FROM predictions WHERE symbol = ?", (symbol,)).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        result = dict(row)
+        result["forecast"] = json.loads(result["forecast"])
+        return result
+
+    def version(self) -> Optional[str]:
+        """Version of the table currently in place, or None."""
+        conn = self._connect()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute("SELECT version FROM build").fetchone()
+        finally:
+            conn.close()
+        return row["version"] if row else None
+
+
+if __name__ == "__main__":
+    store = PredictionStore()
+    print(f"Prediction table {store.path}: version {store.version()}")
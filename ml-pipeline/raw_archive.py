@@ -0,0 +1,249 @@
+"""
+Compressed raw response archive.
+
+Handles:
+- Storing raw API responses as compressed newline-delimited records
+  (gzip, or zstd when the zstandard package is installed)
+- Streaming the archive back into typed NumPy column arrays in chunks
+  with pandas' C parser, without building a Python object per record
+- Reconstructing the original response (and reading legacy .json files)
+
+File layout (one file per symbol):
+    line 1:  {"version": 1, "columns": [...], "records_key": "data", "meta": {...}}
+    line 2+: one CSV record per line, in column order (nested values as JSON)
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+import warnings
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from config import Config
+from log_setup import get_logger
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+logger = get_logger(__name__, "api_client.log")
+
+ARCHIVE_VERSION = 1
+RECORDS_KEY = "data"  # TODO: Match the list field of the historical endpoint response
+
+
+def _codec(path: Path) -> str:
+    """Compression codec implied by an archive path."""
+    return "zstd" if path.name.endswith(".zst") else "gzip"
+
+
+def _open_text(path: Path, mode: str, codec: str) -> io.TextIOBase:
+    """Open a compressed file as text ("r" or "w")."""
+    if codec == "zstd":
+        if not ZSTD_AVAILABLE:
+            raise ImportError("zstandard is required for .zst archives: pip install zstandard")
+        if mode == "w":
+            raw = zstandard.ZstdCompressor(level=Config.RAW_COMPRESSION_LEVEL).stream_writer(open(path, "wb"))
+        else:
+            raw = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"))
+        return io.TextIOWrapper(raw, encoding="utf-8")
+    return gzip.open(path, mode + "t", encoding="utf-8", compresslevel=Config.RAW_COMPRESSION_LEVEL)
+
+
+def write_archive(path: Path, response: Dict[str, Any]) -> None:
+    """
+    Write an API response to a compressed archive (atomically).
+
+    Responses without a list of record dicts under RECORDS_KEY are kept
+    whole in the header, so nothing is lost for unexpected structures.
+
+    Args:
+        path: Archive path (.csv.gz or .csv.zst)
+        response: Raw API response
+    """
+    records = response.get(RECORDS_KEY) if isinstance(response, dict) else None
+    has_records = isinstance(records, list) and all(isinstance(r, dict) for r in records)
+
+    columns: List[str] = []
+    if has_records:
+        seen = set()
+        for record in records:
+            for key in record:
+                if key not in seen:
+                    seen.add(key)
+                    columns.append(key)
+
+    header = {
+        "version": ARCHIVE_VERSION,
+        "columns": columns,
+        "records_key": RECORDS_KEY if has_records else None,
+        "meta": {k: v for k, v in response.items() if k != RECORDS_KEY} if has_records else response,
+    }
+
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with _open_text(tmp_path, "w", _codec(path)) as f:
+        f.write(json.dumps(header, separators=(",", ":")) + "\n")
+        if has_records:
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerows(
+                [json.dumps(v) if isinstance(v, (dict, list)) else v for v in (r.get(c) for c in columns)]
+                for r in records
+            )
+    os.replace(tmp_path, path)
+
+
+def read_header(path: Path) -> Dict[str, Any]:
+    """Read only the archive header."""
+    with _open_text(path, "r", _codec(path)) as f:
+        return json.loads(f.readline())
+
+
+def _iter_chunks(f: io.TextIOBase, columns: List[str], chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """Parse the record lines after the header in chunks of chunk_rows."""
+    if not columns:
+        return iter(())
+    return pd.read_csv(
+        f,
+        names=columns,
+        header=None,
+        chunksize=chunk_rows,
+        keep_default_na=False,
+        na_values=[""],
+    )
+
+
+def _to_array(values: pd.Series, kind: Optional[str]) -> tuple:
+    """
+    Convert one chunk of a column to a typed array.
+
+    The kind ("float", "datetime" or "object") is inferred from the first
+    chunk and enforced (with coercion to NaN/NaT) on later ones.
+
+    Returns:
+        (array, kind)
+    """
+    if kind in (None, "float"):
+        try:
+            return pd.to_numeric(values, errors="raise" if kind is None else "coerce").to_numpy(np.float64), "float"
+        except (TypeError, ValueError):
+            pass
+
+    if kind in (None, "datetime"):
+        try:
+            with warnings.catch_warnings():
+                # Free-text columns are probed too; their format warnings are noise
+                warnings.simplefilter("ignore", UserWarning)
+                parsed = pd.to_datetime(values, errors="raise" if kind is None else "coerce")
+            if parsed.dt.tz is not None:
+                # Keep exchange-local wall-clock time (bars align to the session)
+                parsed = parsed.dt.tz_localize(None)
+            return parsed.to_numpy(dtype="datetime64[ns]"), "datetime"
+        except (TypeError, ValueError, OverflowError):
+            pass
+
+    return values.to_numpy(dtype=object), "object"
+
+
+def read_columns(
+    path: Path,
+    chunk_rows: int = Config.RAW_PARSE_CHUNK_ROWS,
+) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Stream an archive into typed column arrays.
+
+    Numeric fields become float64, timestamp strings datetime64[ns] and
+    anything else object arrays. Memory is bounded by the chunk size plus
+    the output arrays.
+
+    Args:
+        path: Archive path
+        chunk_rows: Records parsed per chunk
+
+    Returns:
+        Dict of column name -> array, or None if the archive has no records
+    """
+    with _open_text(path, "r", _codec(path)) as f:
+        header = json.loads(f.readline())
+        if header.get("records_key") is None:
+            return None
+
+        columns = header["columns"]
+        kinds: Dict[str, Optional[str]] = {c: None for c in columns}
+        parts: Dict[str, List[np.ndarray]] = {c: [] for c in columns}
+        for chunk in _iter_chunks(f, columns, chunk_rows):
+            for name in columns:
+                array, kinds[name] = _to_array(chunk[name], kinds[name])
+                parts[name].append(array)
+
+    return {
+        c: np.concatenate(parts[c]) if parts[c] else np.array([], dtype=np.float64)
+        for c in columns
+    }
+
+
+def _column_values(values: pd.Series) -> List[Any]:
+    """Python values of one parsed column (NaN → None, nested JSON decoded)."""
+    if values.dtype.kind in "biu":
+        return values.tolist()
+    if values.dtype.kind == "f":
+        return [None if v != v else v for v in values.tolist()]
+
+    decoded = []
+    for v in values.tolist():
+        if v is None or v != v:
+            decoded.append(None)
+        elif isinstance(v, str) and v[:1] in ("[", "{"):
+            try:
+                decoded.append(json.loads(v))
+            except ValueError:
+                decoded.append(v)
+        else:
+            decoded.append(v)
+    return decoded
+
+
+def read_response(path: Path) -> Dict[str, Any]:
+    """
+    Rebuild the original API response from an archive.
+
+    Numbers, booleans, nulls and nested values are restored from their
+    text form; empty strings come back as None.
+    """
+    with _open_text(path, "r", _codec(path)) as f:
+        header = json.loads(f.readline())
+        if header.get("records_key") is None:
+            return header["meta"]
+
+        columns = header["columns"]
+        records = []
+        for chunk in _iter_chunks(f, columns, Config.RAW_PARSE_CHUNK_ROWS):
+            values = [_column_values(chunk[c]) for c in columns]
+            records.extend(dict(zip(columns, row)) for row in zip(*values))
+    return {**header["meta"], header["records_key"]: records}
+
+
+def columns_from_response(response: Dict[str, Any]) -> Optional[Dict[str, np.ndarray]]:
+    """Typed column arrays from an in-memory response (legacy .json files)."""
+    records = response.get(RECORDS_KEY) if isinstance(response, dict) else None
+    if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+        return None
+
+    columns: List[str] = []
+    for record in records:
+        columns.extend(k for k in record if k not in columns)
+    return {c: _to_array(pd.Series([r.get(c) for r in records]), None)[0] for c in columns}
+
+
+if __name__ == "__main__":
+    for symbol in Config.SYMBOLS:
+        path = Config.get_raw_data_path(symbol)
+        if path.exists():
+            print(f"{symbol}: {path.stat().st_size} bytes, columns {read_header(path)['columns']}")
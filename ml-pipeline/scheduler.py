@@ -0,0 +1,238 @@
+"""
+Streaming per-symbol stage scheduler.
+
+Handles:
+- Pushing each symbol through an ordered chain of stages
+  (collect → process → train) as soon as its previous stage finishes,
+  instead of waiting for every symbol at each phase boundary
+- Running I/O-bound and CPU-bound stages on separate bounded pools
+- Recording per-stage timings and failures
+- Skipping stages already completed by an earlier run (--resume)
+- Barrier stages that wait for every symbol to finish the stage before
+  them (e.g. training after universe-wide features are computed)
+"""
+
+import multiprocessing
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set
+
+from config import Config
+from log_setup import get_logger
+
+logger = get_logger(__name__, "pipeline.log")
+
+
+class Stage(NamedTuple):
+    """
+    One step of the per-symbol pipeline.
+
+    Attributes:
+        name: Stage name used in logs and results
+        func: Picklable callable taking a symbol and returning True on success
+        pool: "io" or "cpu"
+        barrier: Start only once every symbol has finished (or failed)
+            the stage before it
+    """
+
+    name: str
+    func: Callable[[str], bool]
+    pool: str
+    barrier: bool = False
+
+
+def _init_cpu_worker(num_threads: int) -> None:
+    """Limit TensorFlow threads so parallel stages don't oversubscribe the CPU."""
+    try:
+        import tensorflow as tf
+        tf.config.threading.set_intra_op_parallelism_threads(num_threads)
+        tf.config.threading.set_inter_op_parallelism_threads(num_threads)
+    except (ImportError, RuntimeError):
+        pass
+
+
+def _timed(func: Callable[[str], bool], symbol: str) -> Dict[str, Any]:
+    """Run a stage function and report its outcome and duration."""
+    start = time.perf_counter()
+    try:
+        ok = bool(func(symbol))
+        error = None
+    except Exception as e:
+        ok, error = False, str(e)
+    return {"ok": ok, "error": error, "seconds": time.perf_counter() - start}
+
+
+class StageScheduler:
+    """
+    Stream symbols through a chain of stages on bounded worker pools.
+
+    A symbol's next stage is submitted the moment its current stage
+    succeeds, so fetching symbol N overlaps processing/training of the
+    symbols fetched before it. A failed stage stops that symbol only.
+    Symbols reaching a barrier stage are held until no symbol is left in
+    an earlier stage; on_barrier then runs once and they are released
+    (if it raises, the barrier stage fails for every held symbol).
+
+    Pools:
+    - io: threads (network requests spend their time waiting)
+    - cpu: spawned processes (pandas/NumPy/TensorFlow work), each limited
+      to Config.PIPELINE_THREADS_PER_WORKER threads
+    """
+
+    def __init__(
+        self,
+        stages: List[Stage],
+        io_workers: int = Config.PIPELINE_IO_WORKERS,
+        cpu_workers: int = Config.PIPELINE_CPU_WORKERS,
+    ):
+        self.stages = stages
+        self.io_workers = io_workers
+        self.cpu_workers = cpu_workers
+
+    def _create_pools(self) -> Dict[str, Executor]:
+        """Create the I/O and CPU executors."""
+        return {
+            "io": ThreadPoolExecutor(max_workers=self.io_workers, thread_name_prefix="io"),
+            # Spawn (not fork) so workers don't inherit TensorFlow state from the parent
+            "cpu": ProcessPoolExecutor(
+                max_workers=self.cpu_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_cpu_worker,
+                initargs=(Config.PIPELINE_THREADS_PER_WORKER,),
+            ),
+        }
+
+    def run(
+        self,
+        symbols: List[str],
+        pools: Optional[Dict[str, Executor]] = None,
+        completed: Optional[Dict[str, Set[str]]] = None,
+        on_result: Optional[Callable[[str, str, Dict[str, Any]], None]] = None,
+        on_barrier: Optional[Callable[[str], None]] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Run every symbol through all stages.
+
+        Args:
+            symbols: Symbols to push through the pipeline
+            pools: Executors keyed by "io"/"cpu" (created and shut down here if None)
+            completed: Stages already done per symbol (skipped, e.g. when resuming)
+            on_result: Called as on_result(symbol, stage_name, outcome) after every
+                stage, from the coordinating thread
+            on_barrier: Called as on_barrier(stage_name) when a barrier stage
+                is released, before any symbol starts it; an exception fails
+                that stage for the held symbols
+
+        Returns:
+            Dict of symbol -> {"completed": [stage names], "failed_stage": name or None,
+            "error": message or None, "timings": {stage: seconds}}
+        """
+        own_pools = pools is None
+        pools = pools or self._create_pools()
+        completed = completed or {}
+        results = {
+            symbol: {"completed": [], "failed_stage": None, "error": None, "timings": {}}
+            for symbol in symbols
+        }
+        pending: Dict[Future, Any] = {}
+        held: Dict[int, List[str]] = {}  # Barrier stage index -> symbols waiting for it
+        released: Set[int] = set()
+
+        def submit(symbol: str, index: int) -> None:
+            # Skip stages finished by an earlier (interrupted) run
+            done = completed.get(symbol, set())
+            while index < len(self.stages) and self.stages[index].name in done:
+                results[symbol]["completed"].append(self.stages[index].name)
+                index += 1
+            if index == len(self.stages):
+                return
+            stage = self.stages[index]
+            if stage.barrier and index not in released:
+                held.setdefault(index, []).append(symbol)
+                return
+            future = pools[stage.pool].submit(_timed, stage.func, symbol)
+            pending[future] = (symbol, index)
+
+        def record(symbol: str, index: int, outcome: Dict[str, Any]) -> None:
+            stage = self.stages[index]
+            result = results[symbol]
+            result["timings"][stage.name] = outcome["seconds"]
+            if outcome["ok"]:
+                result["completed"].append(stage.name)
+                logger.info(f"✓ {symbol}: {stage.name} done in {outcome['seconds']:.1f}s")
+            else:
+                result["failed_stage"] = stage.name
+                result["error"] = outcome["error"]
+                logger.error(
+                    f"✗ {symbol}: {stage.name} failed"
+                    + (f" ({outcome['error']})" if outcome["error"] else "")
+                )
+            if on_result is not None:
+                on_result(symbol, stage.name, outcome)
+
+        def release_barriers() -> None:
+            # A barrier opens once no running stage comes before it
+            while held:
+                index = min(held)
+                if any(i < index for _, i in pending.values()):
+                    return
+                released.add(index)
+                name = self.stages[index].name
+                logger.info(f"Barrier reached: starting {name} for {len(held[index])} symbols")
+                if on_barrier is not None:
+                    try:
+                        on_barrier(name)
+                    except Exception as e:
+                        logger.error(f"Barrier before {name} failed: {e}", exc_info=True)
+                        for symbol in held.pop(index):
+                            record(symbol, index, {"ok": False, "error": f"barrier failed: {e}", "seconds": 0.0})
+                        continue
+                for symbol in held.pop(index):
+                    submit(symbol, index)
+
+        start = time.perf_counter()
+        try:
+            for symbol in symbols:
+                submit(symbol, 0)
+            release_barriers()
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    symbol, index = pending.pop(future)
+                    try:
+                        outcome = future.result()
+                    except Exception as e:  # Worker process died
+                        outcome = {"ok": False, "error": str(e), "seconds": 0.0}
+
+                    record(symbol, index, outcome)
+                    if outcome["ok"] and index + 1 < len(self.stages):
+                        submit(symbol, index + 1)
+                release_barriers()
+        finally:
+            if own_pools:
+                for pool in pools.values():
+                    pool.shutdown(wait=True, cancel_futures=True)
+
+        elapsed = time.perf_counter() - start
+        stage_totals = {
+            stage.name: sum(r["timings"].get(stage.name, 0.0) for r in results.values())
+            for stage in self.stages
+        }
+        logger.info(
+            f"Pipeline finished in {elapsed:.1f}s (stage totals: "
+            + ", ".join(f"{name} {seconds:.1f}s" for name, seconds in stage_totals.items())
+            + ")"
+        )
+        return results
+
+
+if __name__ == "__main__":
+    print(f"I/O workers: {Config.PIPELINE_IO_WORKERS}, CPU workers: {Config.PIPELINE_CPU_WORKERS}")
@@ -0,0 +1,230 @@
+"""
+Stateful one-step LSTM inference.
+
+Handles:
+- A NumPy forward pass of a trained StockPricePredictor that advances the
+  LSTM hidden/cell state by one timestep per bar, instead of re-running
+  the whole SEQUENCE_LENGTH window through TensorFlow
+- Per-symbol state kept in memory and persisted after every update, so a
+  restarted process continues from exactly the same state
+- Seeding the state from the latest window, and reseeding when the model
+  or a bar it already consumed changes
+"""
+
+import hashlib
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import Config
+from log_setup import get_logger
+
+logger = get_logger(__name__, "prediction.log")
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0.0),
+    "tanh": np.tanh,
+    "sigmoid": _sigmoid,
+}
+
+
+class LSTMStepper:
+    """
+    NumPy replica of the StockPricePredictor network, one timestep at a time.
+
+    Supports the layers model._build_model() produces: stacked LSTMs
+    (tanh/sigmoid, with bias), Dropout (identity at inference) and Dense.
+    The state is a float32 (lstm_layers, 2, units) array holding h and c
+    for every LSTM layer.
+    """
+
+    def __init__(self, keras_model: Any):
+        self.lstm: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        self.dense: List[Tuple[np.ndarray, np.ndarray, Any]] = []
+
+        for layer in keras_model.layers:
+            kind = type(layer).__name__
+            config = layer.get_config()
+            if kind == "LSTM":
+                if (config["activation"], config["recurrent_activation"]) != ("tanh", "sigmoid") or not config["use_bias"]:
+                    raise ValueError(f"Unsupported LSTM configuration in layer {layer.name}")
+                self.lstm.append(tuple(np.asarray(w, dtype=np.float32) for w in layer.get_weights()))
+            elif kind == "Dense":
+                if config["activation"] not in ACTIVATIONS:
+                    raise ValueError(f"Unsupported activation in layer {layer.name}: {config['activation']}")
+                kernel, bias = (np.asarray(w, dtype=np.float32) for w in layer.get_weights())
+                self.dense.append((kernel, bias, ACTIVATIONS[config["activation"]]))
+            elif kind not in ("Dropout", "InputLayer"):
+                raise ValueError(f"Unsupported layer for stateful inference: {kind}")
+
+        units = {recurrent.shape[0] for _, recurrent, _ in self.lstm}
+        if len(units) != 1:
+            raise ValueError("Stateful inference needs at least one LSTM layer, all of the same width")
+        self.units = units.pop()
+
+        # Identifies the weights a saved state was computed with
+        digest = hashlib.blake2b(digest_size=16)
+        for weights in [*self.lstm, *((kernel, bias) for kernel, bias, _ in self.dense)]:
+            for w in weights:
+                digest.update(w.tobytes())
+        self.fingerprint = digest.hexdigest()
+
+    def initial_state(self) -> np.ndarray:
+        """Zero state, as Keras uses at the start of every window."""
+        return np.zeros((len(self.lstm), 2, self.units), dtype=np.float32)
+
+    def advance(self, rows: np.ndarray, state: np.ndarray) -> np.ndarray:
+        """
+        Feed normalized feature rows through the LSTM stack, oldest first.
+
+        Args:
+            rows: (num_bars, num_features)
+            state: State before the first row (not modified)
+
+        Returns:
+            State after the last row
+        """
+        state = state.copy()
+        for x in np.asarray(rows, dtype=np.float32):
+            for layer, (kernel, recurrent, bias) in enumerate(self.lstm):
+                h, c = state[layer]
+                gates = x @ kernel + h @ recurrent + bias
+                i, f, g, o = np.split(gates, 4)  # Keras gate order
+                c = _sigmoid(f) * c + _sigmoid(i) * np.tanh(g)
+                h = _sigmoid(o) * np.tanh(c)
+                state[layer, 0], state[layer, 1] = h, c
+                x = h
+        return state
+
+    def output(self, state: np.ndarray) -> np.ndarray:
+        """Dense head applied to the last LSTM layer's hidden state (one value per horizon step)."""
+        out = state[-1, 0]
+        for kernel, bias, activation in self.dense:
+            out = activation(out @ kernel + bias)
+        return out.astype(np.float64)
+
+
+class StatefulLSTM:
+    """
+    Per-symbol LSTM state advanced one bar at a time.
+
+    The first prediction for a symbol runs its last `sequence_length` bars
+    from a zero state, which matches the windowed prediction. After that
+    every new bar costs a single timestep. The state, the last bar consumed
+    and the prediction are written to Config.get_lstm_state_path(symbol)
+    after every update.
+    """
+
+    def __init__(self):
+        self.steppers: Dict[str, Tuple[Any, LSTMStepper]] = {}
+        self.states: Dict[str, Dict[str, Any]] = {}
+
+    def _stepper(self, symbol: str, model: Any) -> LSTMStepper:
+        """NumPy copy of the model's weights, rebuilt when the model object changes."""
+        cached = self.steppers.get(symbol)
+        if cached is None or cached[0] is not model:
+            cached = (model, LSTMStepper(model.model))
+            self.steppers[symbol] = cached
+        return cached[1]
+
+    def _load(self, symbol: str) -> Optional[Dict[str, Any]]:
+        if symbol in self.states:
+            return self.states[symbol]
+        filepath = Config.get_lstm_state_path(symbol)
+        if not filepath.exists():
+            return None
+        try:
+            with np.load(filepath) as saved:
+                return {
+                    "state": saved["state"],
+                    "last_row": saved["last_row"],
+                    "last_timestamp": pd.Timestamp(str(saved["last_timestamp"])),
+                    "prediction": np.atleast_1d(saved["prediction"]),
+                    "fingerprint": str(saved["fingerprint"]),
+                }
+        except (OSError, KeyError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable LSTM state for {symbol}: {e}")
+            return None
+
+    def _save(self, symbol: str, saved: Dict[str, Any]) -> None:
+        """Keep the state in memory and write it atomically."""
+        self.states[symbol] = saved
+        filepath = Config.get_lstm_state_path(symbol)
+        tmp_path = filepath.with_name(f".{filepath.name}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                state=saved["state"],
+                last_row=saved["last_row"],
+                last_timestamp=np.str_(saved["last_timestamp"].isoformat()),
+                prediction=saved["prediction"],
+                fingerprint=np.str_(saved["fingerprint"]),
+            )
+        os.replace(tmp_path, filepath)
+
+    @staticmethod
+    def _resume_from(saved: Optional[Dict[str, Any]], fingerprint: str, timestamps: pd.Series, raw: np.ndarray) -> Optional[int]:
+        """Index of the first bar the saved state hasn't consumed, or None to reseed."""
+        if saved is None or saved["fingerprint"] != fingerprint:
+            return None
+        position = int(timestamps.searchsorted(saved["last_timestamp"]))
+        if position >= len(timestamps) or timestamps.iloc[position] != saved["last_timestamp"]:
+            return None
+        if not np.array_equal(raw[position], saved["last_row"], equal_nan=True):
+            logger.info("Consumed bar changed; reseeding LSTM state")
+            return None
+        return position + 1
+
+    def predict(self, symbol: str, model: Any, df: pd.DataFrame) -> Optional[np.ndarray]:
+        """
+        Advance the symbol's state over bars it hasn't seen and predict.
+
+        Args:
+            symbol: Stock symbol
+            model: Loaded StockPricePredictor
+            df: Timestamp plus the model's feature columns (unnormalized),
+                oldest first
+
+        Returns:
+            Predicted closes for the model's horizon, or None with fewer
+            than sequence_length bars
+        """
+        stepper = self._stepper(symbol, model)
+        timestamps = df["timestamp"].reset_index(drop=True)
+        raw = df.drop(columns="timestamp").to_numpy(dtype=np.float32)
+        rows = raw
+        if "scaler_mean" in model.metadata:
+            rows = (raw - np.array(model.metadata["scaler_mean"], dtype=np.float32)) / \
+                np.array(model.metadata["scaler_std"], dtype=np.float32)
+
+        saved = self._load(symbol)
+        start = self._resume_from(saved, stepper.fingerprint, timestamps, raw)
+        if start is None:
+            sequence_length = model.input_shape[0]
+            if len(rows) < sequence_length:
+                logger.warning(f"Insufficient data for {symbol}: {len(rows)} < {sequence_length}")
+                return None
+            state = stepper.advance(rows[-sequence_length:], stepper.initial_state())
+            logger.info("Seeded LSTM state for %s from the last %d bars", symbol, sequence_length)
+        elif start == len(rows):
+            return saved["prediction"]
+        else:
+            state = stepper.advance(rows[start:], saved["state"])
+
+        prediction = stepper.output(state)
+        self._save(symbol, {
+            "state": state,
+            "last_row": raw[-1],
+            "last_timestamp": pd.Timestamp(timestamps.iloc[-1]),
+            "prediction": prediction,
+            "fingerprint": stepper.fingerprint,
+        })
+        return prediction
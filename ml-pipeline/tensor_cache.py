@@ -0,0 +1,302 @@
+"""
+Memory-mapped training tensor cache.
+
+Handles:
+- Persisting the normalized float32 feature matrix and raw target vector
+  per symbol as .npy files with a small JSON header
+- Invalidating the cache when the processed CSV or the feature set changes
+- Building training windows as strided views over the memory map, so
+  sequences are never materialized and re-runs / parallel trainers share
+  the same pages through the OS cache
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import Config
+from log_setup import get_logger
+from data_processor import DataProcessor
+from features import FeatureStore, feature_key
+
+logger = get_logger(__name__, "data_processor.log")
+
+CACHE_VERSION = 2
+
+
+def sliding_windows(
+    features: np.ndarray,
+    target: np.ndarray,
+    sequence_length: int,
+    horizon: int = Config.FORECAST_HORIZON,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Build (X, y) training pairs as zero-copy views.
+
+    Equivalent to DataProcessor.create_sequences: X[i] is rows
+    i..i+sequence_length-1 and y[i] holds the targets at
+    i+sequence_length .. i+sequence_length+horizon-1.
+
+    Args:
+        features: (num_rows, num_features) matrix
+        target: (num_rows,) vector
+        sequence_length: Number of time steps to look back
+        horizon: Number of future steps to predict
+
+    Returns:
+        X view (num_sequences, sequence_length, num_features), y view (num_sequences, horizon)
+    """
+    num_sequences = max(0, len(features) - sequence_length - horizon + 1)
+    row_stride, col_stride = features.strides
+    X = np.lib.stride_tricks.as_strided(
+        features,
+        shape=(num_sequences, sequence_length, features.shape[1]),
+        strides=(row_stride, row_stride, col_stride),
+        writeable=False,
+    )
+    y = np.lib.stride_tricks.as_strided(
+        target[sequence_length:],
+        shape=(num_sequences, horizon),
+        strides=(target.strides[0], target.strides[0]),
+        writeable=False,
+    )
+    return X, y
+
+
+class TensorCache:
+    """
+    Per-symbol cache of normalized training tensors.
+
+    Layout (Config.CACHE_DIR):
+    - {symbol}_features.npy: float32 (num_rows, num_features), normalized
+    - {symbol}_target.npy: float32 (num_rows,), raw target values
+    - {symbol}_cache.json: columns, scaler params and source file stamp
+
+    Feature columns are read from the FeatureStore, so only the requested
+    features are computed.
+    """
+
+    def __init__(self, cache_dir: Path = Config.CACHE_DIR, store: Optional[FeatureStore] = None):
+        self.cache_dir = cache_dir
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.store = store or FeatureStore()
+
+    def _paths(self, symbol: str) -> Tuple[Path, Path, Path]:
+        """Get (features, target, header) paths for a symbol."""
+        return (
+            self.cache_dir / f"{symbol}_features.npy",
+            self.cache_dir / f"{symbol}_target.npy",
+            self.cache_dir / f"{symbol}_cache.json",
+        )
+
+    @staticmethod
+    def _source_stamp(symbol: str) -> Optional[Dict[str, int]]:
+        """Size and mtime of the processed CSV the cache is built from."""
+        source = Config.get_processed_data_path(symbol)
+        if not source.exists():
+            return None
+        stat = source.stat()
+        return {"source_size": stat.st_size, "source_mtime_ns": stat.st_mtime_ns}
+
+    def load_header(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Load the JSON header, or None if the cache is missing or stale."""
+        _, _, header_path = self._paths(symbol)
+        if not header_path.exists():
+            return None
+
+        try:
+            with open(header_path, "r") as f:
+                header = json.load(f)
+        except (json.JSONDecodeError, IOError):
+            return None
+
+        stamp = self._source_stamp(symbol)
+        if header.get("version") != CACHE_VERSION or (
+            stamp is not None and any(header.get(k) != v for k, v in stamp.items())
+        ):
+            logger.info(f"Tensor cache for {symbol} is stale")
+            return None
+        return header
+
+    def build(
+        self,
+        symbol: str,
+        df: pd.DataFrame,
+        target_col: str = "close",
+        features: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Normalize a feature DataFrame and write it to the cache.
+
+        Normalization statistics are computed over the rows that appear
+        in at least one input window (all but the last).
+
+        Args:
+            symbol: Stock symbol
+            df: DataFrame with timestamp, features and target
+            target_col: Column to predict
+            features: Input columns (default: every column except timestamp)
+
+        Returns:
+            Header dict
+        """
+        features_path, target_path, header_path = self._paths(symbol)
+
+        df = df.dropna().reset_index(drop=True)
+        feature_cols = list(features or [c for c in df.columns if c != "timestamp"])
+        values = df[feature_cols].to_numpy(dtype=np.float32)
+
+        window_rows = values[:-1] if len(values) > 1 else values
+        scaler_mean = window_rows.mean(axis=0)
+        scaler_std = window_rows.std(axis=0)
+        scaler_std[scaler_std == 0] = 1.0
+
+        # Write to temporary files and rename, so readers never see partial data
+        tmp_features = features_path.with_name(f".{features_path.name}.tmp")
+        normalized = np.lib.format.open_memmap(
+            tmp_features, mode="w+", dtype=np.float32, shape=values.shape
+        )
+        np.subtract(values, scaler_mean, out=normalized)
+        np.divide(normalized, scaler_std, out=normalized)
+        normalized.flush()
+        del normalized
+        os.replace(tmp_features, features_path)
+
+        tmp_target = target_path.with_name(f".{target_path.name}.tmp")
+        with open(tmp_target, "wb") as f:
+            np.save(f, df[target_col].to_numpy(dtype=np.float32))
+        os.replace(tmp_target, target_path)
+
+        header = {
+            "version": CACHE_VERSION,
+            "symbol": symbol,
+            "rows": int(len(df)),
+            "columns": feature_cols,
+            "feature_keys": [feature_key(c, symbol) for c in feature_cols] if features else None,
+            "target_col": target_col,
+            "dtype": "float32",
+            "scaler_mean": scaler_mean.tolist(),
+            "scaler_std": scaler_std.tolist(),
+            "first_timestamp": str(df["timestamp"].iloc[0]) if len(df) else None,
+            "last_timestamp": str(df["timestamp"].iloc[-1]) if len(df) else None,
+            **(self._source_stamp(symbol) or {}),
+        }
+        tmp_header = header_path.with_name(f".{header_path.name}.tmp")
+        with open(tmp_header, "w") as f:
+            json.dump(header, f, indent=2)
+        os.replace(tmp_header, header_path)
+
+        logger.info(f"✓ Cached {values.shape} tensor for {symbol} at {features_path}")
+        return header
+
+    def open(self, symbol: str) -> Optional[Tuple[np.ndarray, np.ndarray, Dict[str, Any]]]:
+        """
+        Memory-map a valid cache read-only.
+
+        Returns:
+            (features, target, header) or None if missing or stale
+        """
+        header = self.load_header(symbol)
+        if header is None:
+            return None
+
+        features_path, target_path, _ = self._paths(symbol)
+        features = np.load(features_path, mmap_mode="r")
+        target = np.load(target_path, mmap_mode="r")
+        return features, target, header
+
+    def open_or_build(
+        self,
+        symbol: str,
+        processor: DataProcessor,
+        target_col: str = "close",
+        features: Optional[List[str]] = None,
+    ) -> Optional[Tuple[np.ndarray, np.ndarray, Dict[str, Any]]]:
+        """
+        Memory-map the cache, rebuilding it from the feature store if needed.
+
+        The cache is rebuilt when the processed CSV, the target, the
+        feature list or any feature definition changed.
+
+        Args:
+            symbol: Stock symbol
+            processor: DataProcessor (kept for API compatibility)
+            target_col: Column to predict
+            features: Input features (default: Config.FEATURES)
+        """
+        features = list(features or Config.FEATURES)
+        cached = self.open(symbol)
+        if cached is not None:
+            header = cached[2]
+            if (
+                header.get("target_col") == target_col
+                and header.get("columns") == features
+                and header.get("feature_keys") == [feature_key(c, symbol) for c in features]
+            ):
+                return cached
+
+        requested = features if target_col in features else features + [target_col]
+        df = self.store.load(symbol, requested)
+        if df is None:
+            return None
+        self.build(symbol, df, target_col=target_col, features=features)
+        return self.open(symbol)
+
+    def training_splits(
+        self,
+        symbol: str,
+        processor: DataProcessor,
+        sequence_length: int = Config.SEQUENCE_LENGTH,
+        target_col: str = "close",
+        features: Optional[List[str]] = None,
+        horizon: int = Config.FORECAST_HORIZON,
+    ) -> Optional[Tuple[Tuple[np.ndarray, ...], Dict[str, Any]]]:
+        """
+        Chronological train/val/test splits as views over the memory map.
+
+        Sets processor.scaler_mean/scaler_std from the cache header so
+        they can be stored with the trained model.
+
+        Args:
+            symbol: Stock symbol
+            processor: DataProcessor (used for splitting)
+            sequence_length: Number of time steps to look back
+            target_col: Column to predict
+            features: Input features (default: Config.FEATURES)
+            horizon: Number of future steps to predict
+
+        Returns:
+            ((X_train, X_val, X_test, y_train, y_val, y_test), header) or None
+        """
+        cached = self.open_or_build(symbol, processor, target_col=target_col, features=features)
+        if cached is None:
+            return None
+
+        features, target, header = cached
+        X, y = sliding_windows(features, target, sequence_length, horizon)
+        if len(X) < Config.MIN_TRAINING_SEQUENCES:
+            logger.error(
+                f"Insufficient sequences for {symbol} ({len(X)} < {Config.MIN_TRAINING_SEQUENCES})"
+            )
+            return None
+
+        processor.scaler_mean = np.array(header["scaler_mean"], dtype=np.float32)
+        processor.scaler_std = np.array(header["scaler_std"], dtype=np.float32)
+
+        splits = processor.split_dataset(
+            X, y,
+            test_size=Config.TEST_SPLIT,
+            validation_size=Config.VALIDATION_SPLIT,
+        )
+        return splits, header
+
+
+if __name__ == "__main__":
+    cache = TensorCache()
+    for symbol in Config.SYMBOLS:
+        header = cache.load_header(symbol)
+        print(f"{symbol}: {'cached ' + str(header['rows']) + ' rows' if header else 'not cached'}")
@@ -100,7 +100,7 @@ try:
     X, y = processor.create_sequences(dummy_df_indicators, sequence_length=10)
     print(f"✓ Sequences created:")
     print(f"  - X shape: {X.shape} (samples, lookback days, features)")
-    print(f"  - y shape: {y.shape} (target prices)")
+    print(f"  - y shape: {y.shape} (samples, horizon target prices)")
     print(f"  - Number of sequences: {len(X)}")
     
     # Test normalization
@@ -109,6 +109,87 @@ try:
     print(f"  - Original X mean: {X.mean():.4f}, std: {X.std():.4f}")
     print(f"  - Normalized X mean: {X_normalized.mean():.4f}, std: {X_normalized.std():.4f}")
     
+    # Fine-tuning set: the recent window plus a replay of older windows, on the stored scale
+    long_df = processor.compute_technical_indicators(pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=200, freq='D'),
+        'open': np.random.uniform(100, 150, 200),
+        'high': np.random.uniform(105, 155, 200),
+        'low': np.random.uniform(95, 145, 200),
+        'close': np.random.uniform(100, 150, 200),
+        'volume': np.random.uniform(1e6, 5e6, 200),
+    }))
+    X_all, y_all = processor.create_sequences(
+        long_df.dropna().reset_index(drop=True), sequence_length=10, horizon=Config.FORECAST_HORIZON
+    )
+    processor.normalize_data(X_all, fit=True)  # Stands in for the trained model's scaler
+    scaler_mean = processor.scaler_mean.copy()
+    X_ft, y_ft = processor.prepare_finetune_data(
+        long_df, sequence_length=10, trained_through=str(long_df['timestamp'].iloc[-5])
+    )
+    window = Config.FINETUNE_WINDOW
+    replayed = min(Config.FINETUNE_REPLAY_SIZE, len(X_all) - window)
+    assert len(X_ft) == len(y_ft) == window + replayed
+    assert np.array_equal(processor.scaler_mean, scaler_mean)
+    assert np.allclose(X_ft[-window:], processor.normalize_data(X_all[-window:], fit=False))
+    assert np.allclose(y_ft[-window:], y_all[-window:])
+    assert all((y_all[:-window] == target).all(axis=1).any() for target in y_ft[:replayed])
+    assert processor.prepare_finetune_data(
+        long_df, sequence_length=10, trained_through=str(long_df['timestamp'].iloc[-1])
+    ) is None
+    print(f"✓ Fine-tuning set: {window} recent + {replayed} replayed windows")
+    
+    # Test data validation on a clean series with injected bad ticks
+    from validation import DataValidator
+    
+    days = pd.bdate_range('2024-01-01', periods=60)
+    close = 100 * np.exp(np.cumsum(np.random.normal(0, 0.01, 60)))
+    bad_df = pd.DataFrame({
+        'timestamp': days, 'open': close, 'high': close * 1.01,
+        'low': close * 0.99, 'close': close, 'volume': 1e6,
+    })
+    bad_df.loc[5, 'close'] = 0                              # impossible price
+    bad_df.loc[10, 'high'] = bad_df.loc[10, 'low'] * 0.5    # high below low
+    bad_df.loc[20, ['high', 'close']] = close[20] * 50      # bad tick
+    bad_df = pd.concat([bad_df, bad_df.iloc[[30]]])         # duplicate bar
+    clean_df, report = DataValidator().validate(bad_df, 'TEST')
+    assert (report['invalid_values'], report['ohlc_repaired'], report['spikes'], report['duplicates']) == (1, 1, 1, 1)
+    assert len(clean_df) == 58 and (clean_df['high'] >= clean_df['low']).all()
+    print(f"✓ Data validation masked {report['rows_in'] - report['rows_out']} rows, "
+          f"repaired {report['ohlc_repaired']}, missing bars {report['missing_bars']}")
+    
+    # Hourly source bars start at the session open (09:15), not on the hour
+    hourly = pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-02 09:15', periods=7, freq='1h'),
+        'open': 100.0, 'high': 101.0, 'low': 99.0, 'close': 100.0, 'volume': 1e3,
+    })
+    _, hourly_report = DataValidator(interval='1h').validate(hourly, 'TEST')
+    assert hourly_report['off_calendar'] == 0 and hourly_report['rows_out'] == 7
+    print(f"✓ Hourly bars from {Config.MARKET_OPEN} match the trading calendar")
+    
+    # Resampling with reduceat matches pandas resample (empty buckets dropped)
+    from bars import resample_bars, window_to_bars
+    
+    minutes = pd.date_range('2024-01-02 09:15', periods=75, freq='5min')
+    minutes = minutes.append(minutes + pd.Timedelta('1D'))
+    minute_bars = pd.DataFrame({
+        'timestamp': minutes,
+        'open': np.random.uniform(100, 110, 150), 'high': np.random.uniform(110, 120, 150),
+        'low': np.random.uniform(90, 100, 150), 'close': np.random.uniform(100, 110, 150),
+        'volume': np.random.uniform(1e3, 1e4, 150),
+    })
+    resampled = resample_bars(minute_bars, '1h', offset='15min')
+    expected_bars = (
+        minute_bars.set_index('timestamp')
+        .resample('1h', offset='15min')
+        .agg({'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'})
+        .dropna()
+        .reset_index()
+    )
+    assert np.array_equal(resampled['timestamp'].to_numpy(), expected_bars['timestamp'].to_numpy())
+    assert np.allclose(resampled[['open', 'high', 'low', 'close', 'volume']].to_numpy(), expected_bars[['open', 'high', 'low', 'close', 'volume']].to_numpy())
+    assert (window_to_bars(20, '5min'), window_to_bars('30min', '5min'), window_to_bars('1min', '5min')) == (20, 6, 1)
+    print(f"✓ OHLCV resampling matches pandas ({len(minute_bars)} 5min bars → {len(resampled)} hourly bars)")
+    
 except ImportError as e:
     print(f"⚠ Pandas/NumPy not installed: {e}")
     print("  Install with: pip install pandas numpy")
@@ -144,8 +225,73 @@ try:
     
     print(f"✓ JSON I/O working correctly")
     
+    # Test compressed raw archive round trip
+    from raw_archive import read_columns, read_response, write_archive
+    
+    response = {"symbol": "TEST", "data": [
+        {"timestamp": f"2024-01-{d:02d}T09:15:00", "open": 100.0 + d, "close": 101.0 + d, "volume": 1000 * d}
+        for d in range(1, 11)
+    ]}
+    archive = Config.LOGS_DIR / "test_raw.csv.gz"
+    write_archive(archive, response)
+    columns = read_columns(archive, chunk_rows=3)
+    
+    assert read_response(archive) == response
+    assert columns["close"].dtype == np.float64 and columns["close"][-1] == 111.0
+    assert columns["timestamp"].dtype.kind == "M"
+    print(f"✓ Raw archive round trip working ({archive.stat().st_size} bytes compressed)")
+    
+    # Hot-path messages are rate limited before a log record is created
+    from log_setup import HotPathLogger, get_logger
+    hot_logger = HotPathLogger(get_logger("test_pipeline", "pipeline.log"), interval=60)
+    for i in range(5):
+        hot_logger.info("Hot-path message %d", i)
+    assert hot_logger.sites["Hot-path message %d"][1] == 4
+    print("✓ Hot-path logging rate limited (4 of 5 messages dropped)")
+    
+    # Materialized prediction table: a reader opened before a swap keeps the old table
+    import sqlite3
+    from prediction_store import PredictionStore
+    
+    row = {
+        "symbol": "TEST", "current_price": 100.0, "predicted_price": 101.0, "price_change": 1.0,
+        "percent_change": 1.0, "direction": "UP", "lower_bound": 99.0, "upper_bound": 103.0,
+        "interval_coverage": 0.9, "interval_method": "conformal", "downside_percent": -1.0,
+        "interval_width_percent": 4.0, "forecast": [{"step": 1, "predicted_price": 101.0}],
+    }
+    prediction_store = PredictionStore(Config.LOGS_DIR / "test_predictions.sqlite")
+    old_version = prediction_store.write([row, {**row, "symbol": "KEPT"}])
+    old_reader = sqlite3.connect(prediction_store.path)
+    new_version = prediction_store.write([{**row, "predicted_price": 99.0, "direction": "DOWN"}])
+    
+    assert old_reader.execute("SELECT version FROM predictions WHERE symbol = 'TEST'").fetchone()[0] == old_version
+    assert prediction_store.get("TEST")["version"] == new_version == prediction_store.version()
+    assert prediction_store.get("TEST")["direction"] == "DOWN" and prediction_store.get("MISSING") is None
+    # A symbol missing from the new run keeps its previous row (unless it left the universe)
+    assert prediction_store.get("KEPT")["version"] == old_version
+    prediction_store.write([row], symbols=["TEST"])
+    assert prediction_store.get("KEPT") is None
+    print("✓ Prediction table swapped atomically (old readers unaffected, failed symbols kept)")
+    
+    # Concurrent shard writers each add their own symbols and keep everyone else's
+    from concurrent.futures import ThreadPoolExecutor
+    shard_universe = [f"SHARD{i}" for i in range(8)]
+    with ThreadPoolExecutor(8) as pool:
+        versions = list(pool.map(
+            lambda symbol: prediction_store.write([{**row, "symbol": symbol}], symbols=shard_universe),
+            shard_universe,
+        ))
+    assert all(prediction_store.get(symbol) is not None for symbol in shard_universe)
+    assert prediction_store.version() == max(versions) and prediction_store.get("TEST") is None
+    assert not list(prediction_store.path.parent.glob(f".{prediction_store.path.name}.*.tmp"))
+    print("✓ Concurrent shard writes serialized; every shard's rows kept")
+    
     # Cleanup
+    old_reader.close()
+    prediction_store.path.unlink()
+    prediction_store.lock_path.unlink()
     test_file.unlink()
+    archive.unlink()
     
 except Exception as e:
     print(f"✗ File operations error: {e}")
@@ -188,6 +334,576 @@ try:
 except Exception as e:
     print(f"✗ CLI error: {e}")
 
+# Test 7: Tensor Cache
+print("\n[TEST 7] Memory-Mapped Tensor Cache")
+print("-" * 60)
+try:
+    from tensor_cache import TensorCache, sliding_windows
+    
+    cache = TensorCache()
+    cache.build("TEST_CACHE", dummy_df_indicators)
+    features, target, header = cache.open("TEST_CACHE")
+    X_view, y_view = sliding_windows(features, target, 10)
+    
+    # Views must match create_sequences + normalization exactly
+    X_ref, y_ref = processor.create_sequences(
+        dummy_df_indicators.dropna().reset_index(drop=True), sequence_length=10
+    )
+    X_ref = (X_ref - np.array(header["scaler_mean"], dtype=np.float32)) / \
+        np.array(header["scaler_std"], dtype=np.float32)
+    assert X_view.shape == X_ref.shape, f"{X_view.shape} != {X_ref.shape}"
+    assert np.allclose(X_view, X_ref) and np.allclose(y_view, y_ref)
+    print(f"✓ Strided windows match create_sequences: {X_view.shape}")
+    
+    # Multi-horizon targets: y[i] holds the next 3 closes after window i
+    _, y_multi = sliding_windows(features, target, 10, horizon=3)
+    _, y_multi_ref = processor.create_sequences(
+        dummy_df_indicators.dropna().reset_index(drop=True), sequence_length=10, horizon=3
+    )
+    assert y_multi.shape == y_multi_ref.shape == (len(X_view) - 2, 3)
+    assert np.allclose(y_multi, y_multi_ref) and np.allclose(y_multi[1:, 0], y_multi[:-1, 1])
+    print(f"✓ Multi-horizon targets match: {y_multi.shape}")
+    print(f"  - Memory-mapped: {isinstance(features, np.memmap)}")
+    
+    # Cleanup
+    del features, target, X_view, y_view, y_multi
+    for path in Config.CACHE_DIR.glob("TEST_CACHE_*"):
+        path.unlink()
+    
+except Exception as e:
+    print(f"✗ Tensor cache error: {e}")
+    sys.exit(1)
+
+# Test 8: Feature Store
+print("\n[TEST 8] Feature Store")
+print("-" * 60)
+try:
+    from features import BASE_COLUMNS, FeatureStore
+    
+    dummy_df[["timestamp"] + BASE_COLUMNS].to_csv(Config.get_processed_data_path("TEST_STORE"), index=False)
+    store = FeatureStore()
+    stored = store.load("TEST_STORE", ["sma_5", "rsi_14"])
+    
+    # Lazily computed columns must match the in-memory computation
+    assert list(stored.columns) == ["timestamp", "sma_5", "rsi_14"]
+    assert np.allclose(stored["sma_5"], dummy_df_indicators["sma_5"], equal_nan=True)
+    assert np.allclose(stored["rsi_14"], dummy_df_indicators["rsi_14"], equal_nan=True)
+    assert len(store.load("TEST_STORE", ["sma_5"], as_of=dates[19])) == 20
+    print(f"✓ Lazy features match compute_technical_indicators ({len(stored)} rows)")
+    
+    # Cross-sectional features over a (bars, symbols) panel recover a known beta
+    from cross_section import market_breadth, rolling_beta
+    
+    market = np.random.normal(0, 0.01, 200)
+    panel_returns = np.column_stack([1.5 * market, 0.5 * market])
+    sectors = np.zeros(2, dtype=int)
+    beta = rolling_beta(panel_returns, market, sectors, 60)
+    assert np.isnan(beta[58]).all() and np.allclose(beta[59:], [1.5, 0.5])
+    assert np.allclose(market_breadth(panel_returns, market, sectors, None)[:, 0], market > 0)
+    print(f"✓ Cross-sectional beta and breadth computed over the panel")
+    
+    # Rolling correlation: bar-by-bar updates match a from-scratch computation
+    from correlation import RollingCorrelation
+    
+    returns = np.random.normal(0, 0.01, (120, 4))
+    returns[[10, 70, 100], 2] = np.nan
+    rolling = RollingCorrelation(4, 30, refresh_bars=1000)
+    for row in returns:
+        rolling.push(row[None, :])
+    expected = pd.DataFrame(returns[-30:]).corr().to_numpy()
+    assert np.allclose(rolling.correlation(), expected)
+    print(f"✓ Incremental rolling correlation matches a full recomputation")
+    
+    # Cleanup
+    store.invalidate("TEST_STORE")
+    Config.get_processed_data_path("TEST_STORE").unlink()
+    
+except Exception as e:
+    print(f"✗ Feature store error: {e}")
+    sys.exit(1)
+
+# Test 9: Pipeline orchestration
+print("\n[TEST 9] Pipeline Orchestration")
+print("-" * 60)
+try:
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from scheduler import Stage, StageScheduler
+    
+    # Barrier stage: no symbol starts "train" before every symbol is processed
+    events = []
+    
+    def process_stage(symbol):
+        time.sleep(0.05 if symbol == "SLOW" else 0.0)
+        events.append(("process", symbol))
+        return True
+    
+    def train_stage(symbol):
+        events.append(("train", symbol))
+        return True
+    
+    barriers = []
+    with ThreadPoolExecutor(2) as pool:
+        results = StageScheduler([
+            Stage("process", process_stage, "io"),
+            Stage("train", train_stage, "cpu", barrier=True),
+        ]).run(["FAST", "SLOW"], pools={"io": pool, "cpu": pool}, on_barrier=barriers.append)
+    assert barriers == ["train"]
+    assert [stage for stage, _ in events] == ["process", "process", "train", "train"]
+    assert all(r["completed"] == ["process", "train"] for r in results.values())
+    print("✓ Barrier stage waits for every symbol's previous stage")
+    
+    # A failing barrier fails the held symbols' stage instead of the whole run
+    def broken_barrier(stage):
+        raise RuntimeError("no index")
+    
+    events.clear()
+    outcomes = []
+    with ThreadPoolExecutor(2) as pool:
+        results = StageScheduler([
+            Stage("process", process_stage, "io"),
+            Stage("train", train_stage, "cpu", barrier=True),
+        ]).run(
+            ["FAST", "SLOW"], pools={"io": pool, "cpu": pool}, on_barrier=broken_barrier,
+            on_result=lambda symbol, stage, outcome: outcomes.append((symbol, stage, outcome["ok"])),
+        )
+    assert [stage for stage, _ in events] == ["process", "process"]
+    assert all(r["failed_stage"] == "train" and "no index" in r["error"] for r in results.values())
+    assert sorted(outcomes) == [("FAST", "process", True), ("FAST", "train", False),
+                                ("SLOW", "process", True), ("SLOW", "train", False)]
+    print("✓ Failed barrier fails only the held stage")
+    
+    # A failing stage stops only its symbol; completed stages are skipped
+    def flaky_stage(symbol):
+        if symbol == "BAD":
+            raise RuntimeError("boom")
+        return True
+    
+    with ThreadPoolExecutor(2) as pool:
+        results = StageScheduler([
+            Stage("process", flaky_stage, "io"),
+            Stage("train", train_stage, "cpu"),
+        ]).run(["GOOD", "BAD", "DONE"], pools={"io": pool, "cpu": pool}, completed={"DONE": {"process"}})
+    assert results["BAD"]["failed_stage"] == "process" and results["BAD"]["error"] == "boom"
+    assert results["BAD"]["completed"] == [] and "train" not in results["BAD"]["timings"]
+    assert results["GOOD"]["completed"] == results["DONE"]["completed"] == ["process", "train"]
+    assert "process" not in results["DONE"]["timings"]
+    print("✓ Failed stage stops only its symbol; completed stages skipped on resume")
+    
+    # Universe shards are disjoint, cover every symbol and keep priority order
+    from universe import load_symbols, load_universe, parse_shard
+    
+    universe_path = Config.LOGS_DIR / "test_universe.csv"
+    pd.DataFrame({
+        "symbol": [f"SYM{i}" for i in range(20)] + ["SYM3", " "],
+        "sector": "IT",
+        "priority": list(np.random.permutation(20) + 1) + [99, 1],
+    }).to_csv(universe_path, index=False)
+    universe = load_universe(universe_path)
+    ordered = universe["symbol"].tolist()
+    assert len(ordered) == 20 and universe["priority"].is_monotonic_increasing
+    
+    shards = [load_symbols(i, 4, universe_path) for i in range(4)]
+    assert sorted(sum(shards, [])) == sorted(ordered)
+    assert all(shard == [s for s in ordered if s in shard] for shard in shards)
+    assert parse_shard("1/4") == (1, 4)
+    for bad_spec in ("4/4", "1-4"):
+        try:
+            parse_shard(bad_spec)
+            raise AssertionError(f"shard spec {bad_spec} accepted")
+        except ValueError:
+            pass
+    print(f"✓ Universe shards disjoint and priority-ordered ({[len(shard) for shard in shards]} symbols)")
+    universe_path.unlink()
+    
+    # Run journal: completed stages, resume selection and progress of an interrupted run
+    from journal import RunJournal
+    
+    journal_path = Config.LOGS_DIR / "test_journal.sqlite"
+    journal_path.unlink(missing_ok=True)
+    journal = RunJournal(journal_path)
+    finished_run = journal.start_run(["A", "B"], ["collect", "train"])
+    journal.finish_run(finished_run, "completed")
+    run_id = journal.start_run(["A", "B", "C"], ["collect", "train"])
+    for symbol, stage, ok in [("A", "collect", True), ("A", "train", True), ("B", "collect", True), ("B", "train", False)]:
+        journal.record_stage(run_id, symbol, stage, ok=ok, seconds=1.0, error=None if ok else "boom")
+    journal.finish_run(run_id, "interrupted")
+    
+    assert journal.latest_run(unfinished_only=True)["run_id"] == run_id
+    assert journal.latest_run(unfinished_only=True)["symbols"] == ["A", "B", "C"]
+    assert journal.completed_stages(run_id) == {"A": {"collect", "train"}, "B": {"collect"}}
+    progress_line = journal.format_progress(run_id)
+    assert "[interrupted]: 33% done - collect 2/3, train 1/3 (1 failed) - ETA" in progress_line
+    journal.record_stage(run_id, "B", "train", ok=True)  # A retry replaces the failure
+    assert journal.completed_stages(run_id)["B"] == {"collect", "train"}
+    print(f"✓ Run journal tracks resumable stages ({progress_line})")
+    journal.close()
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{journal_path}{suffix}").unlink(missing_ok=True)
+    
+    # Work queue: an expired lease is reclaimed and the stale owner can't complete
+    from workqueue import LeaseKeeper, WorkQueue, _project_path
+    
+    queue_path = Config.LOGS_DIR / "test_queue.sqlite"
+    queue_path.unlink(missing_ok=True)
+    job_input = Config.LOGS_DIR / "test_queue_input.txt"
+    job_input.write_text("bars")
+    work_queue = WorkQueue(queue_path)
+    job_id = work_queue.enqueue("batch", "TEST", {"backends": ["ridge"]}, [job_input], max_attempts=2)
+    
+    assert work_queue.claim("w1", lease_seconds=0.05)["job_id"] == job_id
+    assert work_queue.claim("w2") is None
+    time.sleep(0.1)
+    reclaimed = work_queue.claim("w2", lease_seconds=60)
+    assert reclaimed["job_id"] == job_id and reclaimed["attempts"] == 2
+    assert not work_queue.complete(job_id, "w1", []) and not work_queue.heartbeat(job_id, "w1")
+    
+    Config.QUEUE_HEARTBEAT_INTERVAL, heartbeat_interval = 0.01, Config.QUEUE_HEARTBEAT_INTERVAL
+    try:
+        with LeaseKeeper(queue_path, job_id, "w2") as keeper:
+            time.sleep(0.05)
+    finally:
+        Config.QUEUE_HEARTBEAT_INTERVAL = heartbeat_interval
+    assert not keeper.lost.is_set()
+    assert work_queue.complete(job_id, "w2", [job_input])
+    assert work_queue.fetch_files(job_id, "output") == [job_input.resolve()]
+    
+    # A failed attempt is retried until max_attempts, then the job is failed
+    retry_id = work_queue.enqueue("batch", "RETRY", {}, max_attempts=2)
+    work_queue.fail(work_queue.claim("w1")["job_id"], "w1", "boom")
+    assert work_queue.stats("batch")["queued"] == 1
+    work_queue.fail(work_queue.claim("w1")["job_id"], "w1", "boom")
+    assert work_queue.batch_jobs("batch")[1] == {
+        "job_id": retry_id, "symbol": "RETRY", "status": "failed", "attempts": 2, "worker": "w1", "error": "boom",
+    }
+    try:
+        _project_path("../outside.txt")
+        raise AssertionError("path outside the project accepted")
+    except ValueError:
+        pass
+    print("✓ Work queue leases expire, retry up to max_attempts and reject stale completions")
+    
+    # The coordinator collects finished jobs and fails exhausted leases with no worker left
+    from main import collect_batch
+    
+    stuck_id = work_queue.enqueue("collect", "STUCK", {}, max_attempts=1)
+    done_id = work_queue.enqueue("collect", "DONE", {}, [job_input])
+    assert work_queue.claim("w1", lease_seconds=0.01)["job_id"] == stuck_id
+    assert work_queue.claim("w2")["job_id"] == done_id
+    assert work_queue.complete(done_id, "w2", [job_input])
+    time.sleep(0.05)
+    final = {job["symbol"]: job for job in collect_batch(work_queue, "collect", poll_interval=0.01)}
+    assert final["DONE"]["status"] == "done"
+    assert final["STUCK"]["status"] == "failed" and final["STUCK"]["error"] == "lease expired"
+    print("✓ Coordinator stops once every job is done or failed")
+    
+    # Cleanup
+    work_queue.close()
+    queue_path.unlink()
+    job_input.unlink()
+    
+except Exception as e:
+    print(f"✗ Pipeline orchestration error: {e}")
+    sys.exit(1)
+
+# Test 10: Model backends
+print("\n[TEST 10] Model Backends")
+print("-" * 60)
+try:
+    from backends import (
+        SKLEARN_AVAILABLE, GradientBoostingBackend, RidgeBackend, load_backend,
+        load_selection, regression_metrics, update_selection,
+    )
+    
+    # Linear targets: ridge should beat the tree ensemble on validation
+    rng = np.random.default_rng(0)
+    X_windows = rng.standard_normal((300, 10, 3)).astype(np.float32)
+    coefficients = rng.standard_normal((30, 2))
+    y_windows = X_windows.reshape(300, -1) @ coefficients + 0.01 * rng.standard_normal((300, 2))
+    X_fit, y_fit, X_check, y_check = X_windows[:240], y_windows[:240], X_windows[240:], y_windows[240:]
+    
+    backend_classes = [RidgeBackend] + ([GradientBoostingBackend] if SKLEARN_AVAILABLE else [])
+    scores = {}
+    for backend_class in backend_classes:
+        backend = backend_class(X_windows.shape[1:])
+        backend.train(X_fit, y_fit, X_check, y_check, symbol="TEST_BACKEND")
+        backend.save("TEST_BACKEND")
+        scores[backend.name] = regression_metrics(y_check, backend.predict(X_check))["rmse"]
+        
+        # Save → load → predict gives the same predictions
+        reloaded = backend_class.load("TEST_BACKEND")
+        assert np.allclose(reloaded.predict(X_check), backend.predict(X_check))
+        assert reloaded.metadata["horizon"] == 2
+    
+    assert update_selection("TEST_BACKEND", scores) == min(scores, key=scores.get) == "ridge"
+    assert isinstance(load_backend("TEST_BACKEND"), RidgeBackend)
+    # Scores of backends not retrained are kept; a better new score takes over
+    assert update_selection("TEST_BACKEND", {"lstm": scores["ridge"] / 2}) == "lstm"
+    assert set(load_selection("TEST_BACKEND")["scores"]) == set(scores) | {"lstm"}
+    print(f"✓ Backends round-trip through save/load; lowest val RMSE selected "
+          f"({', '.join(f'{name} {rmse:.4f}' for name, rmse in scores.items())})")
+    if not SKLEARN_AVAILABLE:
+        print("⚠ scikit-learn not installed - gbm backend not tested")
+    
+    # Cleanup
+    for path in Config.MODELS_DIR.glob("TEST_BACKEND*"):
+        path.unlink()
+    
+except Exception as e:
+    print(f"✗ Model backend error: {e}")
+    sys.exit(1)
+
+# Test 11: Live mode
+print("\n[TEST 11] Live Mode")
+print("-" * 60)
+try:
+    from backends import RidgeBackend
+    from features import BASE_COLUMNS, FeatureStore, uses_symbol
+    from live import RingBuffer, SymbolStream
+    
+    # Ring buffer keeps the newest rows in order and pops the newest
+    ring = RingBuffer(3, 1)
+    for value in range(5):
+        ring.append(np.array([value]))
+    assert ring.view()[:, 0].tolist() == [2, 3, 4]
+    assert ring.pop()[0] == 4 and ring.view()[:, 0].tolist() == [2, 3] and len(ring) == 2
+    print("✓ Ring buffer wraps and pops in order")
+    
+    # Rows built tick by tick match the feature store's rows for the same bars
+    rng = np.random.default_rng(1)
+    n_bars = 300
+    live_close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_bars)))
+    live_open = live_close * (1 + rng.normal(0, 0.005, n_bars))
+    live_df = pd.DataFrame({
+        "timestamp": pd.date_range("2024-01-01", periods=n_bars, freq="D"),
+        "open": live_open,
+        "high": np.maximum(live_open, live_close) * 1.01,
+        "low": np.minimum(live_open, live_close) * 0.99,
+        "close": live_close,
+        "volume": rng.uniform(1e5, 1e6, n_bars).round(),
+    })
+    live_df.to_csv(Config.get_processed_data_path("TEST_LIVE"), index=False)
+    live_columns = [c for c in Config.FEATURES if not uses_symbol(c)]
+    store = FeatureStore()
+    expected = store.load("TEST_LIVE", live_columns)[live_columns].to_numpy()
+    
+    live_model = RidgeBackend((Config.SEQUENCE_LENGTH, len(live_columns)))
+    X_live = rng.standard_normal((100, Config.SEQUENCE_LENGTH, len(live_columns))).astype(np.float32)
+    live_model.train(X_live[:80], X_live[:80, -1, :2], X_live[80:], X_live[80:, -1, :2], symbol="TEST_LIVE")
+    stream = SymbolStream("TEST_LIVE", live_model, live_columns)
+    seeded = 250
+    stream.seed(store.load("TEST_LIVE", live_columns, as_of=live_df["timestamp"].iloc[seeded - 1]))
+    assert len(stream.bars) == Config.LIVE_HISTORY_BARS < seeded
+    
+    # Ticks for the last seeded bar reopen it; later bars roll over
+    for i in range(seeded - 1, n_bars):
+        bar = live_df.iloc[i]
+        for minutes, price in enumerate(bar[["open", "high", "low", "close"]]):
+            stream.on_tick(float(price), float(bar["volume"]), bar["timestamp"] + pd.Timedelta(minutes=minutes))
+        assert np.allclose(stream._feature_row(), expected[i], rtol=1e-5), live_df["timestamp"].iloc[i]
+    assert np.allclose(stream.features.view(), expected[n_bars - 1 - Config.SEQUENCE_LENGTH:n_bars - 1], rtol=1e-5)
+    result = stream.predict()
+    assert result["current_price"] == live_close[-1] and np.isfinite(result["predicted_price"])
+    print(f"✓ Live rows match feature store rows over {n_bars - seeded + 1} bars of ticks")
+    
+    # Cleanup
+    store.invalidate("TEST_LIVE")
+    Config.get_processed_data_path("TEST_LIVE").unlink()
+    
+except Exception as e:
+    print(f"✗ Live mode error: {e}")
+    sys.exit(1)
+
+# Test 12: Model training and inference
+print("\n[TEST 12] Model Training & Inference")
+print("-" * 60)
+try:
+    from model import TENSORFLOW_AVAILABLE, StockPricePredictor
+    
+    # Split-conformal half-width: the ⌈(n+1)·coverage⌉-th smallest residual
+    from backends import conformal_quantile
+    residuals = np.arange(1, 20, dtype=np.float32)
+    assert conformal_quantile(residuals, 0.9) == 18.0
+    assert conformal_quantile(residuals[:5], 0.9) == np.inf
+    print("✓ Conformal quantile lookup working")
+    
+    # All metrics from one prediction array; the reference price for each
+    # window is the previous window's first target
+    from backends import reference_prices, regression_metrics
+    y_true = np.array([[10.0, 11.0], [11.0, 12.0], [12.0, 11.0], [11.0, 10.0]])
+    y_pred = np.array([[10.0, 11.0], [11.5, 12.0], [11.0, 11.0], [11.5, 10.0]])
+    metrics = regression_metrics(y_true, y_pred, reference=reference_prices(y_true))
+    assert np.allclose(metrics["horizon_mae"], [0.5, 0.0])
+    assert np.isclose(metrics["mse"], np.mean((y_pred - y_true) ** 2))
+    assert np.isclose(metrics["directional_accuracy"], 5 / 6)
+    print("✓ Single-pass evaluation metrics working")
+    
+    # Tuning: successive halving keeps the best 1/eta per rung; Hyperband brackets
+    from tuning import HyperparameterSearch, load_best_hyperparams
+    search = HyperparameterSearch("TEST_TUNE", max_workers=1)
+    search.min_epochs, search.max_epochs, search.eta = 1, 9, 3
+    rungs = []
+    
+    def fake_rung(executor, trials, epochs):
+        rungs.append((sorted(t["trial_id"] for t in trials), epochs))
+        for t in trials:
+            t["epochs"], t["budget"], t["val_loss"] = epochs, epochs, float(t["trial_id"])
+    
+    search._run_rung = fake_rung
+    search._successive_halving(None, 9, 1)
+    assert rungs == [(list(range(9)), 1), ([0, 1, 2], 3), ([0], 9)]
+    assert search.hyperband_brackets() == [(9, 1.0), (5, 3.0), (3, 9.0)]
+    search.max_epochs = 243
+    assert len(search.hyperband_brackets()) == 6
+    search.save_results(search.trials[0], "sha")
+    assert load_best_hyperparams("TEST_TUNE") == search.trials[0]["hyperparams"]
+    assert load_best_hyperparams("NEVER_TUNED") == {}
+    print("✓ Successive halving rungs and Hyperband brackets working")
+    Config.get_tuning_results_path("TEST_TUNE").unlink()
+    search.weights_dir.rmdir()
+    
+    if TENSORFLOW_AVAILABLE:
+        model = StockPricePredictor(input_shape=(10, 20))
+        
+        # MC dropout: one batched call gives a spread per window
+        distribution = model.predict_distribution(np.random.rand(3, 10, 20), samples=16)
+        assert all(distribution[k].shape == (3, model.horizon) for k in ("mean", "std", "lower", "upper"))
+        assert (distribution["std"] > 0).all() and (distribution["lower"] <= distribution["upper"]).all()
+        print(f"✓ MC dropout interval: ±{distribution['std'].mean():.4f} (16 passes in one call)")
+        
+        # Stateful inference: stepping the window from a zero state matches Keras
+        from stateful import LSTMStepper
+        stepper = LSTMStepper(model.model)
+        window = np.random.rand(1, 10, 20).astype(np.float32)
+        stepped = stepper.output(stepper.advance(window[0], stepper.initial_state()))
+        assert np.abs(stepped - model.predict(window)[0]).max() < 1e-4
+        print("✓ One-step LSTM inference matches the windowed prediction")
+        
+        # Sequence training: every target is scored by exactly one chunk
+        windows = np.lib.stride_tricks.sliding_window_view(np.random.rand(200, 20), (10, 20))[:, 0]
+        batches = model._sequence_batches(windows, np.random.rand(len(windows)), shuffle=True)
+        batches.on_epoch_end()
+        scored = sum(float((batches[i][2] > 0).sum()) for i in range(len(batches)))
+        assert scored == len(windows)
+        print(f"✓ Sequence training chunks score each of {len(windows)} targets once")
+        
+        # XLA inference profile: traced fixed-signature function, same predictions
+        profile, Config.EXECUTION_PROFILE = Config.EXECUTION_PROFILE, "xla_inference"
+        compiled = StockPricePredictor(input_shape=(10, 20))
+        Config.EXECUTION_PROFILE = profile
+        compiled.model.set_weights(model.model.get_weights())
+        batch = np.random.rand(300, 10, 20).astype(np.float32)
+        assert np.abs(compiled.predict(batch) - model.predict(batch)).max() < 1e-4
+        assert np.abs(compiled.predict(batch[:1]) - model.predict(batch[:1])).max() < 1e-4
+        print("✓ XLA inference profile matches model.predict")
+        
+        # Best weights: snapshot in memory, written in the background, restored at the end
+        from model import BestWeightsCheckpoint
+        checkpoint_file = Config.LOGS_DIR / "test_best.weights.npz"
+        best = model.model.get_weights()
+        checkpoint = BestWeightsCheckpoint(checkpoint_file, every=1)
+        checkpoint.set_model(model.model)
+        checkpoint.on_epoch_end(0, {"val_loss": 1.0})
+        model.model.set_weights([w + 1 for w in best])
+        checkpoint.on_epoch_end(1, {"val_loss": 2.0})
+        checkpoint.on_train_end()
+        assert all(np.array_equal(a, b) for a, b in zip(model.model.get_weights(), best))
+        with np.load(checkpoint_file) as saved:
+            assert int(saved["epoch"]) == 0 and len(saved.files) == len(best) + 2
+        checkpoint_file.unlink()
+        print("✓ Best-weight checkpoint restored and written atomically")
+        
+        # Optimizer state (step count, Adam moments) survives a save/restore, as between tuning rungs
+        model.model.fit(np.random.rand(32, 10, 20), np.random.rand(32, model.horizon), epochs=1, verbose=0)
+        optimizer_file = Config.LOGS_DIR / "test.optimizer.npz"
+        model.save_optimizer_state(optimizer_file)
+        resumed = StockPricePredictor(input_shape=(10, 20))
+        assert resumed.restore_optimizer_state(optimizer_file)
+        assert int(resumed.model.optimizer.iterations) == int(model.model.optimizer.iterations) > 0
+        assert all(np.array_equal(a, b) for a, b in zip(resumed.model.optimizer.variables, model.model.optimizer.variables))
+        optimizer_file.unlink()
+        print("✓ Optimizer state restored for resumed training")
+        
+        # Sequence-trained models save the sequence optimizer and refuse to fine-tune
+        seq_model = StockPricePredictor(input_shape=(10, 20))
+        seq_model.metadata["training_mode"] = "sequence"
+        seq_model.training_model().fit(model._sequence_batches(windows, np.random.rand(len(windows))), epochs=1, verbose=0)
+        seq_model.save(name="TEST_SEQ")
+        try:
+            seq_loaded = StockPricePredictor.load("TEST_SEQ")
+            assert int(seq_loaded.training_model().optimizer.iterations) == int(seq_model.sequence_model.optimizer.iterations) > 0
+            try:
+                seq_loaded.fine_tune(np.random.rand(8, 10, 20), np.random.rand(8, seq_loaded.horizon), symbol="TEST_SEQ")
+                assert False, "sequence-trained model was fine-tuned"
+            except ValueError:
+                pass
+            
+            # Files from different saves (crash between renames) are rejected
+            seq_model.save_optimizer_state(Config.MODELS_DIR / "TEST_SEQ.optimizer.npz")
+            assert StockPricePredictor.load("TEST_SEQ") is None
+        finally:
+            for path in Config.MODELS_DIR.glob("TEST_SEQ.*"):
+                path.unlink()
+        print("✓ Sequence-trained models keep their optimizer and are not fine-tuned")
+        print("✓ Model files from different saves are not loaded together")
+
+        # Fine-tuning: bars after trained_through are learned once, then the model is up to date
+        from backends import calibrate_intervals, predict_interval
+        from features import BASE_COLUMNS, FeatureStore, uses_symbol
+        from main import fine_tune_models
+        ft_bars = pd.DataFrame({
+            "timestamp": pd.date_range("2024-01-01", periods=120, freq="D"),
+            **{c: np.random.uniform(100, 150, 120) for c in BASE_COLUMNS},
+        })
+        ft_bars.to_csv(Config.get_processed_data_path("TEST_FT"), index=False)
+        ft_columns = [c for c in Config.FEATURES if not uses_symbol(c)]
+        ft_model = StockPricePredictor(input_shape=(10, len(ft_columns)))
+        ft_model.metadata.update({
+            "feature_columns": ft_columns,
+            "scaler_mean": [100.0] * len(ft_columns),
+            "scaler_std": [50.0] * len(ft_columns),
+            "trained_through": str(ft_bars["timestamp"].iloc[-10]),
+            "backend": "lstm",
+        })
+        calibrate_intervals(ft_model, "TEST_FT", np.ones((20, ft_model.horizon)), np.zeros((20, ft_model.horizon)))
+        ft_model.save(name="TEST_FT")
+        symbols, Config.SYMBOLS = Config.SYMBOLS, ["TEST_FT"]
+        try:
+            assert fine_tune_models()
+            tuned = StockPricePredictor.load("TEST_FT")
+            assert tuned.metadata["fine_tune_count"] == 1 and int(tuned.model.optimizer.iterations) > 0
+            assert tuned.metadata["trained_through"] == str(ft_bars["timestamp"].iloc[-1])
+            # The pre-update residuals are dropped: intervals fall back to MC dropout
+            assert "conformal" not in tuned.metadata
+            assert not Config.get_residuals_path("TEST_FT", "lstm").exists()
+            assert predict_interval(tuned, np.random.rand(2, 10, len(ft_columns)))["method"] == "distribution"
+            assert fine_tune_models()  # Up to date: no second fine-tune
+            assert StockPricePredictor.load("TEST_FT").metadata["fine_tune_count"] == 1
+            with open(Config.get_model_selection_path("TEST_FT"), "w") as f:
+                json.dump({"symbol": "TEST_FT", "backend": "ridge", "scores": {"ridge": 1.0}}, f)
+            ft_bars.iloc[-1:].assign(timestamp=ft_bars["timestamp"].iloc[-1] + pd.Timedelta(days=1)).to_csv(
+                Config.get_processed_data_path("TEST_FT"), mode="a", header=False, index=False
+            )
+            FeatureStore().invalidate("TEST_FT")
+            assert fine_tune_models()  # Served by ridge: new bars are not fine-tuned into the LSTM
+            assert StockPricePredictor.load("TEST_FT").metadata["fine_tune_count"] == 1
+            Config.SYMBOLS = ["TEST_FT_MISSING"]
+            assert not fine_tune_models()
+        finally:
+            Config.SYMBOLS = symbols
+            FeatureStore().invalidate("TEST_FT")
+            Config.get_processed_data_path("TEST_FT").unlink()
+            Config.get_model_selection_path("TEST_FT").unlink(missing_ok=True)
+            for path in Config.MODELS_DIR.glob("TEST_FT.*"):
+                path.unlink()
+        print("✓ Fine-tuning updates a saved model once per batch of new bars")
+    else:
+        print("⚠ TensorFlow not installed - skipping model training and inference checks")
+    
+except Exception as e:
+    print(f"✗ Model training error: {e}")
+    sys.exit(1)
+
 # Summary
 print("\n" + "=" * 60)
 print("TEST SUMMARY")
@@ -0,0 +1,317 @@
+"""
+Hyperparameter search module.
+
+Handles:
+- Sampling model configurations from Config.TUNING_SEARCH_SPACE
+- Successive halving: train every trial for a few epochs, keep the best 1/eta
+- Hyperband: several successive halving brackets with different budgets
+- Running trials in parallel worker processes
+- Saving the best configuration for train_models() to pick up
+"""
+
+import json
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import Config
+from log_setup import get_logger
+
+logger = get_logger(__name__, "tuning.log")
+
+
+def _init_worker(num_threads: int) -> None:
+    """Limit TensorFlow threads so parallel trials don't oversubscribe the CPU."""
+    try:
+        import tensorflow as tf
+        tf.config.threading.set_intra_op_parallelism_threads(num_threads)
+        tf.config.threading.set_inter_op_parallelism_threads(num_threads)
+    except (ImportError, RuntimeError):
+        pass
+
+
+def _run_trial(task: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Train one trial up to its rung budget (runs in a worker process).
+
+    Weights and optimizer state (step count, learning rate, Adam
+    moments) are stored between rungs, so a promoted trial continues the
+    training that earned the promotion instead of restarting the
+    optimizer.
+
+    Args:
+        task: Dict with symbol, trial_id, hyperparams, initial_epoch,
+            epochs, weights_path and optimizer_path
+
+    Returns:
+        Dict with trial_id, epochs (trained so far, fewer than the budget
+        if early stopping ended the rung) and val_loss (inf on failure)
+    """
+    from data_processor import DataProcessor
+    from model import StockPricePredictor
+    from tensor_cache import TensorCache
+
+    trial_id = task["trial_id"]
+    hyperparams = task["hyperparams"]
+    result = {"trial_id": trial_id, "epochs": task["initial_epoch"], "val_loss": math.inf}
+
+    try:
+        # Workers memory-map the same cache files, so they share pages
+        dataset = TensorCache().training_splits(
+            task["symbol"],
+            DataProcessor(),
+            sequence_length=int(hyperparams["sequence_length"]),
+        )
+        if dataset is None:
+            return result
+        X_train, X_val, _, y_train, y_val, _ = dataset[0]
+
+        model = StockPricePredictor(X_train.shape[1:], hyperparams=hyperparams, horizon=y_train.shape[1])
+        optimizer_path = Path(task["optimizer_path"])
+        if task["initial_epoch"] > 0:
+            model.model.load_weights(task["weights_path"])
+            if not model.restore_optimizer_state(optimizer_path, model.training_model()):
+                logger.warning(f"Trial {trial_id}: no optimizer state to resume, starting it fresh")
+
+        train_results = model.train(
+            X_train, y_train,
+            X_val, y_val,
+            symbol=task["symbol"],
+            epochs=task["epochs"],
+            initial_epoch=task["initial_epoch"],
+            save_checkpoints=False,
+        )
+        model.model.save_weights(task["weights_path"])
+        model.save_optimizer_state(optimizer_path, model.training_model())
+        result["epochs"] = task["initial_epoch"] + train_results["epochs"]
+
+        val_loss = train_results["best_val_loss"]
+        if np.isfinite(val_loss):
+            result["val_loss"] = float(val_loss)
+    except Exception as e:
+        logger.error(f"Trial {trial_id} failed: {e}", exc_info=True)
+
+    return result
+
+
+class HyperparameterSearch:
+    """
+    Successive halving / Hyperband search over LSTM hyperparameters.
+
+    Strategy:
+    - Sample n configurations and train each for r epochs
+    - Keep the best n/eta (by validation loss) and train them up to r*eta
+    - Repeat until one trial reaches Config.TUNING_MAX_EPOCHS
+    - Hyperband runs several such brackets trading n against r
+    """
+
+    def __init__(
+        self,
+        symbol: str,
+        search_space: Optional[Dict[str, Any]] = None,
+        max_workers: int = Config.TUNING_WORKERS,
+        seed: int = Config.TUNING_SEED,
+    ):
+        self.symbol = symbol
+        self.search_space = search_space or Config.TUNING_SEARCH_SPACE
+        self.max_workers = max_workers
+        self.rng = np.random.default_rng(seed)
+        self.min_epochs = Config.TUNING_MIN_EPOCHS
+        self.max_epochs = Config.TUNING_MAX_EPOCHS
+        self.eta = Config.TUNING_REDUCTION_FACTOR
+        self.trials: List[Dict[str, Any]] = []
+        self.weights_dir = Config.TUNING_DIR / symbol
+        self.weights_dir.mkdir(parents=True, exist_ok=True)
+
+    def sample_hyperparams(self) -> Dict[str, Any]:
+        """Sample one configuration from the search space."""
+        sample = {}
+        for name, space in self.search_space.items():
+            if isinstance(space, tuple):
+                low, high = space
+                sample[name] = float(math.exp(self.rng.uniform(math.log(low), math.log(high))))
+            else:
+                sample[name] = space[self.rng.integers(len(space))]
+                if isinstance(sample[name], np.generic):
+                    sample[name] = sample[name].item()
+        return sample
+
+    def _new_trial(self) -> Dict[str, Any]:
+        """Register a freshly sampled trial."""
+        trial_id = len(self.trials)
+        trial = {
+            "trial_id": trial_id,
+            "hyperparams": self.sample_hyperparams(),
+            "epochs": 0,
+            "budget": 0,
+            "val_loss": math.inf,
+            "weights_path": str(self.weights_dir / f"trial_{trial_id:03d}.weights.h5"),
+            "optimizer_path": str(self.weights_dir / f"trial_{trial_id:03d}.optimizer.npz"),
+        }
+        self.trials.append(trial)
+        return trial
+
+    def _run_rung(
+        self,
+        executor: ProcessPoolExecutor,
+        trials: List[Dict[str, Any]],
+        epochs: int,
+    ) -> None:
+        """Train every trial in the rung up to `epochs` in parallel."""
+        tasks = [
+            {
+                "symbol": self.symbol,
+                "trial_id": t["trial_id"],
+                "hyperparams": t["hyperparams"],
+                "initial_epoch": t["epochs"],
+                "epochs": epochs,
+                "weights_path": t["weights_path"],
+                "optimizer_path": t["optimizer_path"],
+            }
+            for t in trials
+        ]
+        for result in executor.map(_run_trial, tasks):
+            trial = self.trials[result["trial_id"]]
+            trial["epochs"] = result["epochs"]
+            trial["budget"] = epochs
+            trial["val_loss"] = result["val_loss"]
+            logger.info(
+                f"  Trial {trial['trial_id']:03d} @ {trial['epochs']}/{epochs} epochs: "
+                f"val_loss={trial['val_loss']:.6f} {trial['hyperparams']}"
+            )
+
+    def _successive_halving(
+        self,
+        executor: ProcessPoolExecutor,
+        num_trials: int,
+        min_epochs: float,
+    ) -> None:
+        """
+        Run one successive halving bracket.
+
+        Args:
+            executor: Worker pool
+            num_trials: Configurations sampled for the first rung
+            min_epochs: Budget of the first rung
+        """
+        trials = [self._new_trial() for _ in range(num_trials)]
+        epochs = min_epochs
+
+        while trials:
+            budget = min(self.max_epochs, max(self.min_epochs, int(round(epochs))))
+            logger.info(f"Rung: {len(trials)} trials x {budget} epochs")
+            self._run_rung(executor, trials, budget)
+
+            if budget >= self.max_epochs or len(trials) == 1:
+                break
+
+            trials.sort(key=lambda t: t["val_loss"])
+            trials = [t for t in trials[:max(1, len(trials) // self.eta)] if np.isfinite(t["val_loss"])]
+            epochs *= self.eta
+
+    def hyperband_brackets(self) -> List[Tuple[int, float]]:
+        """
+        Hyperband brackets, most exploratory first.
+
+        Returns:
+            List of (trials sampled, first-rung epochs) per bracket
+        """
+        # Small epsilon: math.log(243, 3) is 4.999...
+        s_max = int(math.log(self.max_epochs / self.min_epochs, self.eta) + 1e-9)
+        return [
+            (int(math.ceil((s_max + 1) / (s + 1) * self.eta ** s)), self.max_epochs * self.eta ** -s)
+            for s in range(s_max, -1, -1)
+        ]
+
+    def run(self, strategy: str = Config.TUNING_STRATEGY) -> Optional[Dict[str, Any]]:
+        """
+        Run the search.
+
+        Args:
+            strategy: "hyperband" or "sha"
+
+        Returns:
+            Best trial dict or None if every trial failed
+        """
+        logger.info(f"Starting {strategy} search for {self.symbol} ({self.max_workers} workers)")
+
+        # Build the tensor cache once up front instead of racing in every worker
+        from data_processor import DataProcessor
+        from tensor_cache import TensorCache
+        if TensorCache().open_or_build(self.symbol, DataProcessor()) is None:
+            logger.error(f"No processed data for {self.symbol}")
+            return None
+
+        # Spawn (not fork) so workers don't inherit TensorFlow state from the parent
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(Config.TUNING_THREADS_PER_WORKER,),
+        ) as executor:
+            if strategy == "sha":
+                self._successive_halving(executor, Config.TUNING_NUM_TRIALS, self.min_epochs)
+            elif strategy == "hyperband":
+                for s, (num_trials, min_epochs) in enumerate(self.hyperband_brackets()):
+                    logger.info(f"Hyperband bracket {s}: {num_trials} trials from {min_epochs:.1f} epochs")
+                    self._successive_halving(executor, num_trials, min_epochs)
+            else:
+                raise ValueError(f"Unknown tuning strategy: {strategy}")
+
+        finished = [t for t in self.trials if np.isfinite(t["val_loss"])]
+        if not finished:
+            logger.error(f"All tuning trials failed for {self.symbol}")
+            return None
+
+        # Prefer trials promoted to the largest budget (even if early stopping
+        # ended them sooner), then the lowest loss
+        best = min(finished, key=lambda t: (-t["budget"], t["val_loss"]))
+        self.save_results(best, strategy)
+        logger.info(f"✓ Best trial {best['trial_id']:03d}: val_loss={best['val_loss']:.6f}")
+        logger.info(f"  Hyperparameters: {best['hyperparams']}")
+        return best
+
+    def save_results(self, best: Dict[str, Any], strategy: str) -> None:
+        """Save all trials and the best configuration to JSON."""
+        results = {
+            "symbol": self.symbol,
+            "strategy": strategy,
+            "best": best,
+            "trials": [{**t, "val_loss": t["val_loss"] if np.isfinite(t["val_loss"]) else None}
+                       for t in self.trials],
+        }
+        filepath = Config.get_tuning_results_path(self.symbol)
+        with open(filepath, "w") as f:
+            json.dump(results, f, indent=2)
+        logger.info(f"✓ Saved tuning results to {filepath}")
+
+
+def load_best_hyperparams(symbol: str) -> Dict[str, Any]:
+    """
+    Load the best hyperparameters found by a previous search.
+
+    Args:
+        symbol: Stock symbol
+
+    Returns:
+        Hyperparameter dict, empty if the symbol was never tuned
+    """
+    filepath = Config.get_tuning_results_path(symbol)
+    if not filepath.exists():
+        return {}
+
+    try:
+        with open(filepath, "r") as f:
+            return json.load(f)["best"]["hyperparams"]
+    except (json.JSONDecodeError, IOError, KeyError) as e:
+        logger.error(f"Failed to load tuning results for {symbol}: {e}")
+        return {}
+
+
+if __name__ == "__main__":
+    print("Tuning module loaded. Run with: python main.py --tune [SYMBOL ...]")
@@ -0,0 +1,142 @@
+"""
+Symbol universe module.
+
+Handles:
+- Loading the tradable universe (symbol, sector, exchange, priority)
+  from a CSV or Parquet file
+- Priority ordering, so the most-traded symbols are collected, trained
+  and predicted first (priority 1 comes first)
+- Deterministic hash sharding, so N processes or hosts each take a
+  stable, disjoint slice of the universe
+"""
+
+import hashlib
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import pandas as pd
+
+from config import Config
+from log_setup import get_logger
+
+logger = get_logger(__name__, "pipeline.log")
+
+UNIVERSE_COLUMNS = ["symbol", "sector", "exchange", "priority"]
+
+# Fallback universe, captured before main.py narrows Config.SYMBOLS to a shard
+CONFIGURED_SYMBOLS = list(Config.SYMBOLS)
+
+
+def shard_of(symbol: str, shard_count: int) -> int:
+    """
+    Shard a symbol belongs to.
+
+    Uses a stable hash (not Python's per-process salted hash()), so
+    every host computes the same assignment.
+
+    Args:
+        symbol: Stock symbol
+        shard_count: Number of shards
+
+    Returns:
+        Shard index in [0, shard_count)
+    """
+    digest = hashlib.blake2b(symbol.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % shard_count
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """
+    Parse an "INDEX/COUNT" shard spec (e.g. "0/4").
+
+    Raises:
+        ValueError: If the spec is malformed or out of range
+    """
+    try:
+        index, count = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{spec}', expected INDEX/COUNT (e.g. 0/4)")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Invalid shard '{spec}': index must be in [0, {count})")
+    return index, count
+
+
+def load_universe(path: Optional[Path] = None) -> pd.DataFrame:
+    """
+    Load the universe ordered by priority.
+
+    Missing sector/exchange/priority columns are filled with defaults
+    (unknown sector, NSE, lowest priority). Falls back to the configured
+    Config.SYMBOLS (the whole list, even in a sharded run) when the file
+    doesn't exist.
+
+    Args:
+        path: CSV or Parquet file (default: Config.UNIVERSE_PATH)
+
+    Returns:
+        DataFrame with columns symbol, sector, exchange, priority
+    """
+    path = Path(path or Config.UNIVERSE_PATH)
+
+    if not path.exists():
+        logger.info(f"No universe file at {path}; using Config.SYMBOLS")
+        df = pd.DataFrame({"symbol": CONFIGURED_SYMBOLS})
+    elif path.suffix.lower() in (".parquet", ".pq"):
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path, dtype={"symbol": str, "sector": str, "exchange": str})
+
+    if "symbol" not in df.columns:
+        raise ValueError(f"Universe file {path} has no 'symbol' column")
+
+    df = df.assign(symbol=df["symbol"].str.strip())
+    df = df[df["symbol"].notna() & (df["symbol"] != "")]
+    if "sector" not in df.columns:
+        df["sector"] = "Unknown"
+    if "exchange" not in df.columns:
+        df["exchange"] = "NSE"
+    # Without priorities the file order is kept
+    if "priority" not in df.columns:
+        df["priority"] = range(1, len(df) + 1)
+    df["priority"] = pd.to_numeric(df["priority"], errors="coerce").fillna(float("inf"))
+
+    df = (
+        df[UNIVERSE_COLUMNS]
+        .drop_duplicates("symbol", keep="first")
+        .sort_values(["priority", "symbol"], kind="stable")
+        .reset_index(drop=True)
+    )
+    return df
+
+
+def load_symbols(
+    shard_index: int = Config.SHARD_INDEX,
+    shard_count: int = Config.SHARD_COUNT,
+    path: Optional[Path] = None,
+) -> List[str]:
+    """
+    Symbols in this shard, highest priority first.
+
+    Args:
+        shard_index: Slice to return (0-based)
+        shard_count: Total number of slices
+        path: Universe file (default: Config.UNIVERSE_PATH)
+
+    Returns:
+        Ordered list of symbols
+    """
+    universe = load_universe(path)
+    if shard_count > 1:
+        shards = universe["symbol"].map(lambda s: shard_of(s, shard_count))
+        universe = universe[shards == shard_index]
+
+    symbols = universe["symbol"].tolist()
+    logger.info(
+        f"Universe: {len(symbols)} symbols"
+        + (f" (shard {shard_index}/{shard_count})" if shard_count > 1 else "")
+    )
+    return symbols
+
+
+if __name__ == "__main__":
+    print(load_universe().to_string(index=False))
@@ -0,0 +1,282 @@
+"""
+Data quality validation module.
+
+Handles:
+- Duplicate timestamps (the last reported bar wins)
+- Non-positive / missing prices and negative volume (rows masked)
+- OHLC consistency (high/low repaired to bracket open and close)
+- Price spikes by robust z-score of the deviation from a rolling median
+  (rows masked)
+- Bars outside, and gaps against, the exchange trading calendar
+- Per-symbol quality reports
+
+All checks run as column operations over the whole panel (all symbols
+stacked), grouped by symbol where needed; there are no per-row loops.
+"""
+
+import json
+import os
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import Config
+from log_setup import get_logger
+
+logger = get_logger(__name__, "data_processor.log")
+
+PRICE_COLS = ["open", "high", "low", "close"]
+
+# Robust z-score scale: MAD * 1.4826 estimates the standard deviation
+MAD_SCALE = 1.4826
+
+
+def trading_calendar(
+    start: pd.Timestamp,
+    end: pd.Timestamp,
+    interval: str = Config.SOURCE_INTERVAL,
+) -> np.ndarray:
+    """
+    Expected bar start times between two timestamps.
+
+    Trading days are weekdays minus Config.MARKET_HOLIDAYS; intraday bars
+    run from Config.MARKET_OPEN up to (not including) Config.MARKET_CLOSE.
+
+    Args:
+        start: First timestamp
+        end: Last timestamp
+        interval: Bar interval ("1D" or intraday like "5min")
+
+    Returns:
+        Sorted datetime64[ns] array of bar starts
+    """
+    days = pd.bdate_range(
+        pd.Timestamp(start).normalize(),
+        pd.Timestamp(end).normalize(),
+        freq="C",
+        holidays=Config.MARKET_HOLIDAYS,
+    ).to_numpy(dtype="datetime64[ns]")
+
+    step = pd.Timedelta(interval)
+    if step >= pd.Timedelta("1D"):
+        return days
+
+    session_open = pd.Timedelta(Config.MARKET_OPEN + ":00")
+    session_close = pd.Timedelta(Config.MARKET_CLOSE + ":00")
+    offsets = np.arange(session_open.value, session_close.value, step.value).astype("timedelta64[ns]")
+    return (days[:, None] + offsets[None, :]).ravel()
+
+
+class DataValidator:
+    """
+    Vectorized quality checks and repairs for OHLCV panels.
+
+    Process:
+    1. Drop duplicate (symbol, timestamp) rows
+    2. Mask rows with missing/non-positive prices or negative volume
+    3. Repair high/low so they bracket open and close
+    4. Mask spikes (robust z-score vs. a centered rolling median)
+    5. Mask bars off the trading calendar and measure calendar gaps
+    6. Summarize everything per symbol
+    """
+
+    def __init__(
+        self,
+        interval: str = Config.SOURCE_INTERVAL,
+        spike_window: int = Config.VALIDATION_SPIKE_WINDOW,
+        spike_z: float = Config.VALIDATION_SPIKE_Z,
+        spike_min_move: float = Config.VALIDATION_SPIKE_MIN_MOVE,
+    ):
+        self.interval = interval
+        self.spike_window = spike_window
+        self.spike_z = spike_z
+        self.spike_min_move = spike_min_move
+
+    def validate_panel(self, panel: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, Dict[str, Any]]]:
+        """
+        Validate and repair a multi-symbol panel.
+
+        Args:
+            panel: DataFrame with symbol, timestamp, open, high, low, close, volume
+
+        Returns:
+            (clean panel sorted by symbol and timestamp, {symbol: report})
+        """
+        df = panel.copy()
+        df["timestamp"] = pd.to_datetime(df["timestamp"])
+        df = df.sort_values(["symbol", "timestamp"], kind="stable").reset_index(drop=True)
+        rows_in = df.groupby("symbol", sort=False).size()
+
+        # 1. Duplicates: keep the last reported bar for a timestamp
+        duplicate = df.duplicated(["symbol", "timestamp"], keep="last").to_numpy()
+
+        # 2. Impossible values
+        prices = df[PRICE_COLS].to_numpy(dtype=np.float64)
+        volume = df["volume"].to_numpy(dtype=np.float64)
+        invalid = ~np.all(prices > 0, axis=1) | (volume < 0)
+
+        # 3. OHLC consistency: widen high/low to bracket open and close
+        top = np.fmax(prices[:, 0], prices[:, 3])
+        bottom = np.fmin(prices[:, 0], prices[:, 3])
+        inconsistent = (prices[:, 1] < top) | (prices[:, 2] > bottom) | (prices[:, 1] < prices[:, 2])
+        repaired = inconsistent & ~invalid
+        df["high"] = np.where(repaired, np.fmax(np.fmax(prices[:, 1], prices[:, 2]), top), prices[:, 1])
+        df["low"] = np.where(repaired, np.fmin(np.fmin(prices[:, 1], prices[:, 2]), bottom), prices[:, 2])
+
+        # 4. Spikes, computed on rows that survived the checks above
+        usable = ~(duplicate | invalid)
+        spike = np.zeros(len(df), dtype=bool)
+        spike[usable] = self._spikes(df.loc[usable, ["symbol", "close"]])
+
+        # 5. Trading calendar
+        off_calendar, gaps = self._calendar_checks(df.loc[usable & ~spike, ["symbol", "timestamp"]])
+        off_mask = np.zeros(len(df), dtype=bool)
+        off_mask[np.flatnonzero(usable & ~spike)[off_calendar]] = True
+
+        keep = usable & ~spike & ~off_mask
+        flags = pd.DataFrame({
+            "symbol": df["symbol"],
+            "duplicates": duplicate,
+            "invalid_values": invalid & ~duplicate,
+            "ohlc_repaired": repaired & keep,
+            "spikes": spike,
+            "off_calendar": off_mask,
+            "rows_out": keep,
+        })
+        counts = flags.groupby("symbol", sort=False).sum()
+
+        reports = {}
+        for symbol in rows_in.index:
+            report = {"symbol": symbol, "interval": self.interval, "rows_in": int(rows_in[symbol])}
+            report.update({k: int(v) for k, v in counts.loc[symbol].items()})
+            report.update(gaps.get(symbol, {"missing_bars": 0, "max_gap_bars": 0}))
+            report["masked_pct"] = round(100.0 * (1 - report["rows_out"] / max(report["rows_in"], 1)), 3)
+            reports[symbol] = report
+
+        return df[keep].reset_index(drop=True), reports
+
+    def _spikes(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Flag closes far from their neighbourhood.
+
+        deviation = log(close / centered rolling median of close)
+        robust z  = deviation / (MAD_SCALE * rolling median |deviation|)
+
+        A bar is a spike when |z| > spike_z and the move exceeds
+        spike_min_move (so flat, near-zero-MAD stretches don't trigger).
+        """
+        if df.empty:
+            return np.zeros(0, dtype=bool)
+
+        log_close = np.log(df["close"].to_numpy(dtype=np.float64))
+        grouped = pd.Series(log_close, index=df.index).groupby(df["symbol"].to_numpy(), sort=False)
+        center = grouped.rolling(self.spike_window, center=True, min_periods=1).median()
+        deviation = log_close - center.droplevel(0).reindex(df.index).to_numpy()
+
+        abs_dev = pd.Series(np.abs(deviation), index=df.index).groupby(df["symbol"].to_numpy(), sort=False)
+        mad = abs_dev.rolling(self.spike_window, center=True, min_periods=1).median()
+        mad = mad.droplevel(0).reindex(df.index).to_numpy()
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = np.abs(deviation) / (MAD_SCALE * mad)
+        return (np.nan_to_num(z, nan=0.0, posinf=np.inf) > self.spike_z) & (np.abs(deviation) > self.spike_min_move)
+
+    def _calendar_checks(self, df: pd.DataFrame) -> Tuple[np.ndarray, Dict[str, Dict[str, int]]]:
+        """
+        Compare bars with the trading calendar.
+
+        Returns:
+            (off-calendar flags aligned with df rows, {symbol: {missing_bars, max_gap_bars}})
+        """
+        if df.empty:
+            return np.zeros(0, dtype=bool), {}
+
+        step = pd.Timedelta(self.interval)
+        timestamps = pd.DatetimeIndex(df["timestamp"])
+        if step >= pd.Timedelta("1D"):
+            bars = timestamps.normalize()
+        else:
+            # Buckets anchored at the session open, like trading_calendar's slots
+            offset = pd.Timedelta(Config.MARKET_OPEN + ":00")
+            bars = (timestamps - offset).floor(step) + offset
+        bars = bars.to_numpy(dtype="datetime64[ns]")
+
+        calendar = trading_calendar(bars.min(), bars.max(), self.interval)
+        position = np.searchsorted(calendar, bars)
+        on_calendar = (position < len(calendar)) & (calendar[np.minimum(position, len(calendar) - 1)] == bars)
+
+        # Calendar slots covered per symbol vs. slots between its first and last bar
+        symbols = df["symbol"].to_numpy()
+        stats = pd.DataFrame({
+            "symbol": symbols,
+            "position": np.where(on_calendar, position, np.nan),
+        })
+        stats["gap"] = stats.groupby("symbol", sort=False)["position"].diff() - 1
+        summary = stats.groupby("symbol", sort=False).agg(
+            first=("position", "min"),
+            last=("position", "max"),
+            present=("position", "nunique"),
+            max_gap=("gap", "max"),
+        )
+        expected = summary["last"] - summary["first"] + 1
+        missing = (expected - summary["present"]).fillna(0)
+
+        gaps = {
+            symbol: {
+                "missing_bars": int(missing[symbol]),
+                "max_gap_bars": int(np.nan_to_num(summary.loc[symbol, "max_gap"])),
+            }
+            for symbol in summary.index
+        }
+        return ~on_calendar, gaps
+
+    def validate(self, df: pd.DataFrame, symbol: str) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """
+        Validate a single symbol's OHLCV frame.
+
+        Args:
+            df: DataFrame with timestamp, open, high, low, close, volume
+            symbol: Stock symbol
+
+        Returns:
+            (clean DataFrame without the symbol column, report)
+        """
+        clean, reports = self.validate_panel(df.assign(symbol=symbol))
+        return clean.drop(columns="symbol"), reports[symbol]
+
+    @staticmethod
+    def save_report(report: Dict[str, Any]) -> None:
+        """Write a symbol's quality report to Config.get_quality_report_path."""
+        filepath = Config.get_quality_report_path(report["symbol"])
+        tmp_path = filepath.with_name(f".{filepath.name}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(report, f, indent=2)
+        os.replace(tmp_path, filepath)
+
+        masked = report["rows_in"] - report["rows_out"]
+        if masked or report["ohlc_repaired"] or report["missing_bars"]:
+            logger.warning(
+                f"Quality {report['symbol']}: masked {masked}/{report['rows_in']} rows "
+                f"(dup {report['duplicates']}, invalid {report['invalid_values']}, "
+                f"spikes {report['spikes']}, off-calendar {report['off_calendar']}), "
+                f"repaired {report['ohlc_repaired']}, missing {report['missing_bars']} bars "
+                f"(max gap {report['max_gap_bars']})"
+            )
+        else:
+            logger.info(f"✓ Quality {report['symbol']}: {report['rows_out']} clean rows")
+
+
+def load_quality_report(symbol: str) -> Optional[Dict[str, Any]]:
+    """Load the last quality report for a symbol, or None."""
+    filepath = Config.get_quality_report_path(symbol)
+    if not filepath.exists():
+        return None
+    with open(filepath, "r") as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    for symbol in Config.SYMBOLS:
+        report = load_quality_report(symbol)
+        print(f"{symbol}: {report if report else 'no report'}")
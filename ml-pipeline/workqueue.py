@@ -0,0 +1,364 @@
+"""
+SQLite work queue for distributed training.
+
+Handles:
+- Enqueuing per-symbol training jobs together with their input files
+- Claiming jobs with time-limited leases (one worker per job)
+- Lease heartbeats for long trainings; expired leases are reclaimed
+- Automatic retries up to Config.QUEUE_MAX_ATTEMPTS
+- Publishing trained model files back through the queue
+
+The queue is a single SQLite file, so it needs no broker: put it on
+storage every node can reach (Config.QUEUE_PATH / PIPELINE_QUEUE_PATH).
+Input and output files travel inside the database, so workers don't
+need the coordinator's data or models directories.
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from config import Config
+from log_setup import get_logger
+
+logger = get_logger(__name__, "pipeline.log")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    batch_id TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    worker TEXT,
+    lease_expires REAL,
+    error TEXT,
+    enqueued_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, job_id);
+CREATE TABLE IF NOT EXISTS job_files (
+    job_id INTEGER NOT NULL REFERENCES jobs(job_id),
+    direction TEXT NOT NULL,
+    name TEXT NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (job_id, direction, name)
+);
+"""
+
+
+def default_worker_id() -> str:
+    """Host and process id, e.g. "node7:12345"."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _relative_name(path: Path) -> str:
+    """Path relative to the project root, as stored in the queue."""
+    return Path(path).resolve().relative_to(Config.PROJECT_ROOT.resolve()).as_posix()
+
+
+def _project_path(name: str) -> Path:
+    """Resolve a stored file name under the project root (rejects escapes)."""
+    path = (Config.PROJECT_ROOT / name).resolve()
+    if Config.PROJECT_ROOT.resolve() not in path.parents:
+        raise ValueError(f"Refusing to write outside the project: {name}")
+    return path
+
+
+class WorkQueue:
+    """
+    Job queue stored in a SQLite database.
+
+    Job status: "queued" → "leased" → "done" | "failed".
+    A leased job whose lease expires (worker crashed or stalled) is
+    claimable again; a failed attempt is re-queued until max_attempts.
+
+    Connections are not shared between threads: create one WorkQueue
+    per thread.
+    """
+
+    def __init__(self, path: Path = Config.QUEUE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit mode with explicit BEGIN IMMEDIATE for claims.
+        # The default rollback journal is kept (WAL doesn't work on network filesystems).
+        self.conn = sqlite3.connect(str(self.path), timeout=60, isolation_level=None)
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.conn.close()
+
+    def enqueue(
+        self,
+        batch_id: str,
+        symbol: str,
+        payload: Dict[str, Any],
+        input_files: Optional[List[Path]] = None,
+        max_attempts: int = Config.QUEUE_MAX_ATTEMPTS,
+    ) -> int:
+        """
+        Add a job with its input files.
+
+        Args:
+            batch_id: Groups the jobs of one coordinator run
+            symbol: Stock symbol
+            payload: JSON-serializable job arguments
+            input_files: Files (under the project root) the worker needs
+            max_attempts: Attempts before the job is marked failed
+
+        Returns:
+            Job id
+        """
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = self.conn.execute(
+                "INSERT INTO jobs (batch_id, symbol, payload, status, max_attempts, enqueued_at, updated_at) "
+                "VALUES (?, ?, ?, 'queued', ?, ?, ?)",
+                (batch_id, symbol, json.dumps(payload), max_attempts, now, now),
+            )
+            job_id = cursor.lastrowid
+            for path in input_files or []:
+                self._put_file(job_id, "input", path)
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return job_id
+
+    def _put_file(self, job_id: int, direction: str, path: Path) -> None:
+        self.conn.execute(
+            "INSERT OR REPLACE INTO job_files (job_id, direction, name, data) VALUES (?, ?, ?, ?)",
+            (job_id, direction, _relative_name(path), Path(path).read_bytes()),
+        )
+
+    def claim(
+        self,
+        worker_id: str,
+        lease_seconds: float = Config.QUEUE_LEASE_SECONDS,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Lease the oldest available job.
+
+        Queued jobs and jobs with an expired lease are available. An
+        expired job that has used up its attempts is marked failed.
+
+        Args:
+            worker_id: Identifier recorded on the job
+            lease_seconds: Lease length (extend with heartbeat())
+
+        Returns:
+            Job dict (job_id, batch_id, symbol, payload, attempts) or None
+        """
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._fail_expired(now)
+            row = self.conn.execute(
+                "SELECT job_id, batch_id, symbol, payload, attempts FROM jobs "
+                "WHERE status = 'queued' OR (status = 'leased' AND lease_expires < ?) "
+                "ORDER BY job_id LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                self.conn.execute("COMMIT")
+                return None
+
+            job_id, batch_id, symbol, payload, attempts = row
+            self.conn.execute(
+                "UPDATE jobs SET status = 'leased', worker = ?, attempts = ?, lease_expires = ?, "
+                "updated_at = ? WHERE job_id = ?",
+                (worker_id, attempts + 1, now + lease_seconds, now, job_id),
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+        return {
+            "job_id": job_id,
+            "batch_id": batch_id,
+            "symbol": symbol,
+            "payload": json.loads(payload),
+            "attempts": attempts + 1,
+        }
+
+    def _fail_expired(self, now: float) -> int:
+        """Mark expired leases with no attempts left as failed; returns the count."""
+        cursor = self.conn.execute(
+            "UPDATE jobs SET status = 'failed', error = 'lease expired', updated_at = ? "
+            "WHERE status = 'leased' AND lease_expires < ? AND attempts >= max_attempts",
+            (now, now),
+        )
+        return cursor.rowcount
+
+    def expire_leases(self) -> int:
+        """
+        Fail expired jobs that have used up their attempts.
+
+        claim() does the same, but a coordinator calls this so those jobs
+        fail even when no worker is left to claim anything.
+
+        Returns:
+            Number of jobs marked failed
+        """
+        return self._fail_expired(time.time())
+
+    def heartbeat(
+        self,
+        job_id: int,
+        worker_id: str,
+        lease_seconds: float = Config.QUEUE_LEASE_SECONDS,
+    ) -> bool:
+        """
+        Extend a lease.
+
+        Returns:
+            False if the job is no longer leased to this worker
+        """
+        now = time.time()
+        cursor = self.conn.execute(
+            "UPDATE jobs SET lease_expires = ?, updated_at = ? "
+            "WHERE job_id = ? AND worker = ? AND status = 'leased'",
+            (now + lease_seconds, now, job_id, worker_id),
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: int, worker_id: str, output_files: List[Path]) -> bool:
+        """
+        Publish a job's output files and mark it done.
+
+        Returns:
+            False if the lease was lost (another worker owns the job now)
+        """
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            owner = self.conn.execute(
+                "SELECT worker, status FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+            if owner != (worker_id, "leased"):
+                self.conn.execute("ROLLBACK")
+                return False
+
+            self.conn.execute("DELETE FROM job_files WHERE job_id = ? AND direction = 'output'", (job_id,))
+            for path in output_files:
+                self._put_file(job_id, "output", path)
+            self.conn.execute(
+                "UPDATE jobs SET status = 'done', error = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE job_id = ?",
+                (time.time(), job_id),
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return True
+
+    def fail(self, job_id: int, worker_id: str, error: str) -> None:
+        """Record a failed attempt; re-queue the job unless it is out of attempts."""
+        self.conn.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END, "
+            "error = ?, lease_expires = NULL, updated_at = ? "
+            "WHERE job_id = ? AND worker = ? AND status = 'leased'",
+            (error, time.time(), job_id, worker_id),
+        )
+
+    def fetch_files(self, job_id: int, direction: str) -> List[Path]:
+        """
+        Write a job's input or output files under the project root.
+
+        Returns:
+            Paths written
+        """
+        written = []
+        rows = self.conn.execute(
+            "SELECT name, data FROM job_files WHERE job_id = ? AND direction = ?",
+            (job_id, direction),
+        )
+        for name, data in rows:
+            path = _project_path(name)
+            # Leave identical files untouched so their mtime-keyed caches stay valid
+            if path.exists() and path.stat().st_size == len(data) and path.read_bytes() == data:
+                written.append(path)
+                continue
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f".{path.name}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+            written.append(path)
+        return written
+
+    def batch_jobs(self, batch_id: str) -> List[Dict[str, Any]]:
+        """Get the status of every job in a batch."""
+        rows = self.conn.execute(
+            "SELECT job_id, symbol, status, attempts, worker, error FROM jobs WHERE batch_id = ? ORDER BY job_id",
+            (batch_id,),
+        )
+        keys = ("job_id", "symbol", "status", "attempts", "worker", "error")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def stats(self, batch_id: Optional[str] = None) -> Dict[str, int]:
+        """Count jobs by status (optionally for one batch)."""
+        query = "SELECT status, COUNT(*) FROM jobs"
+        params: tuple = ()
+        if batch_id is not None:
+            query += " WHERE batch_id = ?"
+            params = (batch_id,)
+        counts = {"queued": 0, "leased": 0, "done": 0, "failed": 0}
+        counts.update(dict(self.conn.execute(query + " GROUP BY status", params).fetchall()))
+        return counts
+
+
+def new_batch_id() -> str:
+    """Unique id for a coordinator run."""
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+class LeaseKeeper:
+    """
+    Background heartbeat for a claimed job.
+
+    Renews the lease every Config.QUEUE_HEARTBEAT_INTERVAL seconds on
+    its own connection while the job runs. Use as a context manager.
+    """
+
+    def __init__(self, queue_path: Path, job_id: int, worker_id: str):
+        self.queue_path = queue_path
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.lost = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        queue = WorkQueue(self.queue_path)
+        try:
+            while not self._stop.wait(Config.QUEUE_HEARTBEAT_INTERVAL):
+                if not queue.heartbeat(self.job_id, self.worker_id):
+                    logger.warning(f"Lost lease on job {self.job_id}")
+                    self.lost.set()
+                    return
+        finally:
+            queue.close()
+
+    def __enter__(self) -> "LeaseKeeper":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+if __name__ == "__main__":
+    queue = WorkQueue()
+    print(f"Queue {queue.path}: {queue.stats()}")